@@ -7,6 +7,7 @@ import glfw
 import glm
 import math
 import imgui
+import time
 
 import numpy as np
 import freetype as ft
@@ -1063,6 +1064,96 @@ class Font:
             glTranslatef(0.0, -self.maxCharHeight, 0.0)
             dx = 0.0
 
+class OBJParser:
+    def __init__(self):
+        self.numBytes = 0
+        self.parseTime = 0.0
+        self.throughput = 0.0
+
+    def GetNumBytes(self):
+        return self.numBytes
+
+    def GetParseTime(self):
+        return self.parseTime
+
+    def GetThroughput(self):
+        return self.throughput
+
+    def Parse(self, modelPath):
+        startTime = time.perf_counter()
+
+        with open(modelPath, mode = 'rb') as fin:
+            data = fin.read()
+
+        vertices, indices = self._ParseBuffer(np.frombuffer(data, dtype = np.uint8))
+
+        self.numBytes = len(data)
+        self.parseTime = time.perf_counter() - startTime
+
+        if self.parseTime > 0.0:
+            self.throughput = self.numBytes / (1024.0 * 1024.0) / self.parseTime
+
+        return vertices, indices
+
+    def _ParseBuffer(self, buffer):
+        bufferSize = len(buffer)
+
+        if bufferSize == 0:
+            return np.zeros(0, dtype = np.float32), np.zeros(0, dtype = np.uint32)
+
+        newLines = np.flatnonzero(buffer == ord('\n'))
+
+        lineStarts = np.concatenate(([0], newLines + 1))
+        lineEnds = np.concatenate((newLines + 1, [bufferSize]))
+
+        validLines = lineStarts < bufferSize
+        lineStarts = lineStarts[validLines]
+        lineEnds = lineEnds[validLines]
+
+        firstChars = buffer[lineStarts]
+        secondChars = buffer[np.minimum(lineStarts + 1, bufferSize - 1)]
+
+        keywordLines = (lineEnds - lineStarts >= 2) & ((secondChars == ord(' ')) | (secondChars == ord('\t')))
+
+        vertexLines = keywordLines & (firstChars == ord('v'))
+        faceLines = keywordLines & (firstChars == ord('f'))
+
+        vertexText = self._SelectLines(buffer, lineStarts[vertexLines], lineEnds[vertexLines])
+        vertexText[vertexText == ord('v')] = ord(' ')
+
+        vertices = np.fromstring(vertexText.tobytes(), dtype = np.float64, sep = ' ')
+
+        numVertexLines = np.count_nonzero(vertexLines)
+
+        if numVertexLines > 0 and vertices.size > numVertexLines * 3 and vertices.size % numVertexLines == 0:
+            vertices = vertices.reshape(numVertexLines, -1)[:, 0 : 3].ravel()
+
+        faceText = self._SelectLines(buffer, lineStarts[faceLines], lineEnds[faceLines])
+        faceText[faceText == ord('f')] = ord(' ')
+
+        slashes = faceText == ord('/')
+
+        if slashes.any() == True:
+            slashCounts = np.cumsum(slashes, dtype = np.int32)
+            tokenStartSlashCounts = np.maximum.accumulate(np.where(faceText <= ord(' '), slashCounts, 0))
+
+            faceText = faceText[slashCounts == tokenStartSlashCounts]
+
+        indices = np.fromstring(faceText.tobytes(), dtype = np.int32, sep = ' ') - 1
+
+        return vertices.astype(np.float32), indices.astype(np.uint32)
+
+    def _SelectLines(self, buffer, lineStarts, lineEnds):
+        if len(lineStarts) == 0:
+            return np.zeros(0, dtype = np.uint8)
+
+        runBreaks = np.flatnonzero(lineStarts[1 : ] != lineEnds[ : -1]) + 1
+
+        runStarts = lineStarts[np.concatenate(([0], runBreaks))]
+        runEnds = lineEnds[np.concatenate((runBreaks - 1, [len(lineEnds) - 1]))]
+
+        return np.concatenate([buffer[runStarts[i] : runEnds[i]] for i in range(len(runStarts))])
+
 class Model:
     def __init__(self, modelPath):
         self.vertices = []
@@ -1078,6 +1169,9 @@ class Model:
         self.numNoUseVertices = 0
         self.numFaces = 0
 
+        self.parseTime = 0.0
+        self.parseThroughput = 0.0
+
         self._Initialize(modelPath)
 
     def GetVertices(self):
@@ -1095,21 +1189,19 @@ class Model:
     def GetNumVertices(self):
         return self.numVertices
 
+    def GetParseTime(self):
+        return self.parseTime
+
+    def GetParseThroughput(self):
+        return self.parseThroughput
+
     def _Initialize(self, modelPath):
-        with open(modelPath, mode = 'r') as fin:
-            for line in fin:
-                cl = line.split()
-
-                if len(cl) == 0:
-                    continue
-                elif cl[0] in ['#']:
-                    continue
-                elif cl[0] == 'v':
-                    for v in cl[1 : len(cl)]:
-                        self.vertices.append(float(v))
-                elif cl[0] == 'f':
-                    for i in cl[1 : len(cl)]:
-                        self.indices.append(int(i) - 1)
+        parser = OBJParser()
+
+        self.vertices, self.indices = parser.Parse(modelPath)
+
+        self.parseTime = parser.GetParseTime()
+        self.parseThroughput = parser.GetThroughput()
 
         self.numVertices = int(len(self.vertices) / 3)
         self.numFaces = int(len(self.indices) / 3)
@@ -1534,6 +1626,8 @@ class TestProgram:
                         imgui.tree_pop()
                     imgui.end_tab_item()
                 if imgui.begin_tab_item('Test').selected:
+                    imgui.text('OBJ Parse : {0: 0.3f} s ({1: 0.2f} MB/s)'.format(self.models[0].GetParseTime(), self.models[0].GetParseThroughput()))
+                    imgui.separator()
                     imgui.text('glPolygonOffset.(factor,units)')
                     values = [self.imguiTest['factor'], self.imguiTest['units']]
                     _, values = imgui.slider_float2(' ', *values, min_value = -10.0, max_value = 10.0, format = '%0.2f')
@@ -13,7 +13,15 @@ import freetype as ft
 import math
 import random
 import os
+import sys
 import time
+import hashlib
+import json
+import multiprocessing
+import tempfile
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
 
 
 class Index:
@@ -29,10 +37,42 @@ class Index:
 
     SHADER_DEFAULT = 0
     SHADER_SIMPLE_USE_UNIFORMCOLOR = 1
+    SHADER_WIREFRAME = 2
 
     SHADER_CODE_DEFAULT = 0
 
     SHADER_FRAGMENT_CODE_SIMPLE_USE_UNIFORMCOLOR = 101
+    SHADER_FRAGMENT_CODE_WIREFRAME = 102
+
+    SHADER_GEOMETRY_CODE_WIREFRAME = 201
+
+    NORMAL_WEIGHTING_UNIFORM = 0
+    NORMAL_WEIGHTING_AREA = 1
+    NORMAL_WEIGHTING_ANGLE = 2
+
+    VERTEX_POSITION_FLOAT = 0
+    VERTEX_POSITION_HALF_FLOAT = 1
+    VERTEX_POSITION_QUANTIZED = 2
+
+    UNIFORM_BLOCK_BINDING_CAMERA = 0
+
+    CAMERA_PASS_SCENE = 0
+    CAMERA_PASS_COORD_AXES = 1
+    CAMERA_PASS_GUI = 2
+
+    RENDER_PASS_OPAQUE = 0
+    RENDER_PASS_OVERLAY = 1
+
+    RASTER_STATE_CULL_BACK = 0
+    RASTER_STATE_CULL_FRONT = 1
+    RASTER_STATE_TWO_SIDED = 2
+    RASTER_STATE_POINTS = 3
+    RASTER_STATE_LINES = 4
+
+    COMMAND_USE_PROGRAM = 0
+    COMMAND_SET_RASTER_STATE = 1
+    COMMAND_BIND_VERTEX_ARRAY = 2
+    COMMAND_DRAW = 3
 
 class SceneManager:
     def __init__(self, view3D):
@@ -80,7 +120,25 @@ class SceneManager:
 
         self.coordAxesViewMat = glm.mat4()
 
-        self.modelMat = glm.mat4()        
+        # std140 block of prjMat and viewMat, one aligned slot per camera pass.
+        self.cameraUBO = None
+        self.cameraBlockSize = 128
+        self.cameraBlockStride = self.cameraBlockSize
+        self.numCameraPasses = 3
+        self.cameraBlockDirty = True
+        self.numCameraBlockUploads = 0
+        self.cameraBlockUploadTime = 0.0
+
+        self.modelMat = np.identity(4, dtype = np.float32)
+
+        # The 3D pass renders into sceneFBO, later frames blit it back while the scene is unchanged.
+        self.sceneFBO = None
+        self.sceneColorTexture = None
+        self.sceneDepthRBO = None
+        self.sceneCacheDirty = True
+        self.sceneCached = False
+        self.numSceneRedraws = 0
+        self.numSceneCacheHits = 0
 
         self.objects = []
         self.smallFont = None
@@ -89,6 +147,13 @@ class SceneManager:
 
         self.deltaTime = 0.0
         self.dirty = True
+        self.viewVersion = 0
+
+        self.numUniformUploads = 0
+        self.uniformUploadTime = 0.0
+        self.numMat4Uploads = 0
+        self.mat4UploadTime = 0.0
+        self.mat4CopyTime = 0.0
 
         self.colors = {}
 
@@ -98,12 +163,12 @@ class SceneManager:
         self.specificProgramInfo = True
         self.specificProgramArgs = []
 
-        self.controlFPS = False
-        self.FPS = 30
-        self.oneFrameTime = 1.0 / self.FPS
-        self.deltaTime = 0.0
-        self.elapsedTime = 0.0        
-        self.enableRender = True
+        self.framePacer = FramePacer()
+
+        # On-demand rendering sleeps in glfw.wait_events_timeout until something needs a new frame.
+        self.onDemandRender = False
+        self.numRedrawFrames = 0
+        self.idleTimeout = 0.5
 
         self.pause = False
         self.debug = False
@@ -118,6 +183,7 @@ class SceneManager:
         self.drawingStuffVAO = None
         self.drawingStuffVBO = None
         self.drawingStuffEBO = None
+        self.drawingStuffIndexTypes = []
         
         self._Initialize()        
 
@@ -130,6 +196,7 @@ class SceneManager:
         self.aspect = self.displaySize[0] / self.displaySize[1]
 
         self.dirty = True   
+        self.sceneCacheDirty = True
 
     def GetCamera(self):
         return self.camera
@@ -143,6 +210,10 @@ class SceneManager:
     def SetView3D(self, view3D):
         self.view3D = view3D
 
+        self.cameraBlockDirty = True
+        self.viewVersion += 1
+        self.sceneCacheDirty = True
+
         if self.view3D == False:
             self.drawAxes = False
 
@@ -190,6 +261,80 @@ class SceneManager:
     def GetScreenPos(self):
         return self.screenPos
 
+    def GetDeltaTime(self):
+        return self.deltaTime
+
+    def GetViewVersion(self):
+        return self.viewVersion
+
+    def GetSceneCached(self):
+        return self.sceneCached
+
+    def GetNumSceneRedraws(self):
+        return self.numSceneRedraws
+
+    def GetNumSceneCacheHits(self):
+        return self.numSceneCacheHits
+
+    def SetSceneCacheDirty(self):
+        self.sceneCacheDirty = True
+
+    def GetFramePacer(self):
+        return self.framePacer
+
+    def GetOnDemandRender(self):
+        return self.onDemandRender
+
+    def SetOnDemandRender(self, onDemandRender):
+        self.onDemandRender = onDemandRender
+
+        self.RequestRedraw()
+
+    def GetIdleTimeout(self):
+        return self.idleTimeout
+
+    # imgui needs a few frames to settle after an input event (hover, active widget, released buttons).
+    def RequestRedraw(self, numFrames = 3):
+        self.numRedrawFrames = max(self.numRedrawFrames, numFrames)
+
+    def NeedsRedraw(self):
+        if self.onDemandRender == False:
+            return True
+
+        if self.dirty == True or self.numRedrawFrames > 0:
+            return True
+
+        for key in [glfw.KEY_W, glfw.KEY_S, glfw.KEY_A, glfw.KEY_D, glfw.KEY_Q, glfw.KEY_E, glfw.KEY_LEFT, glfw.KEY_RIGHT, glfw.KEY_UP, glfw.KEY_DOWN]:
+            if gInputManager.GetKeyState(key) == True:
+                return True
+
+        if self.enableCameraSailing == True:
+            return True
+
+        for i in range(len(self.objects)):
+            if self.objects[i].GetNeedsRedraw() == True:
+                return True
+
+        return False
+
+    def GetNumCameraBlockUploads(self):
+        return self.numCameraBlockUploads
+
+    def GetNumUniformUploads(self):
+        return self.numUniformUploads
+
+    def GetUniformUploadTime(self):
+        return self.uniformUploadTime
+
+    def GetNumMat4Uploads(self):
+        return self.numMat4Uploads
+
+    def GetMat4UploadTime(self):
+        return self.mat4UploadTime
+
+    def GetMat4CopyTime(self):
+        return self.mat4CopyTime
+
     def GetImguiSize(self, index):
         return self.imguiSize[index]
 
@@ -247,24 +392,35 @@ class SceneManager:
         glEnable(GL_CULL_FACE)
         glCullFace(GL_BACK)
 
+        self._InitializeCameraBlock()
+
+        self._InitializeSceneFramebuffer()
+
         self.drawingStuffVAO = glGenVertexArrays(self.numDrawingStuff)
         self.drawingStuffVBO = glGenBuffers(self.numDrawingStuff)
         self.drawingStuffEBO = glGenBuffers(self.numDrawingStuff)
 
+        vertexFormat = VertexFormat()
+        vertexFormat.AddAttribute(0, 3, GL_FLOAT)
+        vertexFormat.AddAttribute(1, 4, GL_UNSIGNED_BYTE, True)
+
+        self.drawingStuffIndexTypes.clear()
+
         for i in range(self.numDrawingStuff):
+            vertices = vertexFormat.Pack(self.drawingStuffVerticesList[i], self.numVertexComponents)
+            indices, indexType = vertexFormat.PackIndices(self.drawingStuffIndicesList[i], int(len(self.drawingStuffVerticesList[i]) / self.numVertexComponents))
+
+            self.drawingStuffIndexTypes.append(indexType)
+
             glBindVertexArray(self.drawingStuffVAO[i])
 
             glBindBuffer(GL_ARRAY_BUFFER, self.drawingStuffVBO[i])
-            glBufferData(GL_ARRAY_BUFFER, self.drawingStuffVerticesList[i].nbytes, self.drawingStuffVerticesList[i], GL_STATIC_DRAW)
+            glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
 
             glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.drawingStuffEBO[i])
-            glBufferData(GL_ELEMENT_ARRAY_BUFFER, self.drawingStuffIndicesList[i].nbytes, self.drawingStuffIndicesList[i], GL_STATIC_DRAW)
-
-            glEnableVertexAttribArray(0)
-            glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, self.drawingStuffVerticesList[i].itemsize * self.numVertexComponents, ctypes.c_void_p(0))
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
 
-            glEnableVertexAttribArray(1)
-            glVertexAttribPointer(1, 4, GL_FLOAT, GL_FALSE, self.drawingStuffVerticesList[i].itemsize * self.numVertexComponents, ctypes.c_void_p(self.drawingStuffVerticesList[i].itemsize * 3))
+            vertexFormat.Setup()
 
         glBindVertexArray(0)
         glBindBuffer(GL_ARRAY_BUFFER, 0)        
@@ -293,6 +449,9 @@ class SceneManager:
     def ClearSpecificProgramArgs(self):
         self.specificProgramArgs.clear()
 
+    def GetNumSpecificProgramArgs(self):
+        return len(self.specificProgramArgs)
+
     def WriteLog(self, text):
         self.logFile.write('[' + time.strftime('%Y.%m.%d : %H.%M.%S') + ']' + ' ')
         self.logFile.write(text)
@@ -338,6 +497,8 @@ class SceneManager:
         elif gInputManager.GetKeyState(glfw.KEY_B) == True:
             self.debug = not self.debug
             self._InitializeLog()
+            for i in range(len(self.shaders)):
+                self.shaders[i].SetProfileUniforms(self.debug)
             gInputManager.SetKeyState(glfw.KEY_B, False)        
         elif gInputManager.GetKeyState(glfw.KEY_F) == True:
             self.specificProgramInfo = not self.specificProgramInfo
@@ -368,6 +529,9 @@ class SceneManager:
             if self.view3D == False:
                 self.drawAxes = False
             gInputManager.SetKeyState(glfw.KEY_X, False)
+        elif gInputManager.GetKeyState(glfw.KEY_O) == True:
+            self.SetOnDemandRender(not self.onDemandRender)
+            gInputManager.SetKeyState(glfw.KEY_O, False)
 
         if gInputManager.GetKeyState(glfw.KEY_LEFT) == True:
             for i in range(numObjects):
@@ -383,7 +547,13 @@ class SceneManager:
                 self.objects[i].UpdateAboutKeyInput(glfw.KEY_DOWN)            
 
     def UpdateAboutMouseInput(self):
-        pass    
+        numObjects = len(self.objects)
+
+        if gInputManager.GetMouseButtonPress(glfw.MOUSE_BUTTON_LEFT) == True:
+            for i in range(numObjects):
+                self.objects[i].UpdateAboutMouseInput(glfw.MOUSE_BUTTON_LEFT, gInputManager.GetLastMousePosOnClick())
+
+            gInputManager.SetMouseButtonPress(glfw.MOUSE_BUTTON_LEFT, False)
 
     def Update(self, deltaTime):
         self.deltaTime = deltaTime
@@ -391,14 +561,6 @@ class SceneManager:
         #if gSceneManager.GetDebug() == True:
         #    self.WriteLog('deltaTime : {0}'.format(self.deltaTime))        
 
-        if self.controlFPS == True:
-            self.elapsedTime += self.deltaTime
-
-            if self.elapsedTime < self.oneFrameTime:                
-                return        
-        
-        self.enableRender = True        
-
         self.UpdateAboutKeyInput()
 
         self.UpdateAboutMouseInput()
@@ -412,68 +574,97 @@ class SceneManager:
         numObjects = len(self.objects)
 
         for i in range(numObjects):
-            if self.controlFPS == True:
-                self.objects[i].Update(self.elapsedTime)
-            else:
-                self.objects[i].Update(deltaTime)        
+            self.objects[i].Update(deltaTime)        
 
         if self.dirty == False:
             return  
 
         self.view3DMat = self.camera.GetViewMat()
         self.coordAxesViewMat = self.camera.GetViewMat()
+
+        self.cameraBlockDirty = True
+        self.viewVersion += 1
+        self.sceneCacheDirty = True
         
         self.dirty = False        
 
     def PostUpdate(self, deltaTime):
+        if gInputManager.GetKeyState(glfw.KEY_7) == True:
+            if self.framePacer.GetSwapInterval() == 0:
+                self.framePacer.SetSwapInterval(1)
+            else:
+                self.framePacer.SetSwapInterval(0)
+
+            gInputManager.SetKeyState(glfw.KEY_7, False)
+
         if gInputManager.GetKeyState(glfw.KEY_8) == True:
-            if self.controlFPS == True:
-                self.FPS -= 5
-                if self.FPS <= 0:
-                    self.FPS = 1
+            if self.framePacer.GetEnable() == True:
+                targetFPS = self.framePacer.GetTargetFPS() - 5
+                if targetFPS <= 0:
+                    targetFPS = 1
 
-                self.oneFrameTime = 1.0 / self.FPS
-                self.elapsedTime = 0.0
-                self.enableRender = False
+                self.framePacer.SetTargetFPS(targetFPS)
 
             gInputManager.SetKeyState(glfw.KEY_8, False)
 
         if gInputManager.GetKeyState(glfw.KEY_9) == True:
-            if self.controlFPS == True:
-                self.FPS = int(self.FPS / 5) * 5 + 5
-                if self.FPS > 100:
-                    self.FPS = 100
+            if self.framePacer.GetEnable() == True:
+                targetFPS = int(self.framePacer.GetTargetFPS() / 5) * 5 + 5
+                if targetFPS > 100:
+                    targetFPS = 100
 
-                self.oneFrameTime = 1.0 / self.FPS
-                self.elapsedTime = 0.0
-                self.enableRender = False        
+                self.framePacer.SetTargetFPS(targetFPS)
 
             gInputManager.SetKeyState(glfw.KEY_9, False)        
 
         if gInputManager.GetKeyState(glfw.KEY_0) == True:
-            self.controlFPS = not self.controlFPS
-
-            if self.controlFPS == True:
-                self.elapsedTime = 0.0        
-                self.enableRender = False
+            self.framePacer.SetEnable(not self.framePacer.GetEnable())
 
             gInputManager.SetKeyState(glfw.KEY_0, False)
 
-        if self.enableRender == True:
-            self.elapsedTime = 0.0
-            self.enableRender = False
+        if self.numRedrawFrames > 0:
+            self.numRedrawFrames -= 1
         
+    def BindCameraPass(self, cameraPass):
+        glBindBufferRange(GL_UNIFORM_BUFFER, Index.UNIFORM_BLOCK_BINDING_CAMERA, self.cameraUBO, cameraPass * self.cameraBlockStride, self.cameraBlockSize)
+
     def Draw(self):
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
 
-        glViewport(self.screenPos[0][0], self.screenPos[0][1], self.screenSize[0], self.screenSize[1])
+        gGLStateCache.Reset()
 
-        self._DrawObjects()
+        self._UploadCameraBlock()
+
+        self._DrawScene()
 
         glViewport(0, 0, self.displaySize[0], self.displaySize[1])
 
+        self._DrawObjectsOverlay()
+
         self._DrawGUI()
 
+        self._UpdateUniformStats()
+
+    def _UpdateUniformStats(self):
+        self.numUniformUploads = self.numCameraBlockUploads
+        self.uniformUploadTime = self.cameraBlockUploadTime
+
+        self.numMat4Uploads = 0
+        self.mat4UploadTime = 0.0
+        self.mat4CopyTime = 0.0
+
+        self.numCameraBlockUploads = 0
+        self.cameraBlockUploadTime = 0.0
+
+        for i in range(len(self.shaders)):
+            self.numUniformUploads += self.shaders[i].GetNumUniformUploads()
+            self.uniformUploadTime += self.shaders[i].GetUniformUploadTime()
+            self.numMat4Uploads += self.shaders[i].GetNumMat4Uploads()
+            self.mat4UploadTime += self.shaders[i].GetMat4UploadTime()
+            self.mat4CopyTime += self.shaders[i].GetMat4CopyTime()
+
+            self.shaders[i].ResetUniformStats()
+
     def Finish(self):
         if self.debug == True or self.startLog == True:
             self.WriteLog('LOG End')
@@ -626,58 +817,164 @@ class SceneManager:
 
         self._InitializeColors()
 
-    def _DrawCoordAxes(self):
-        if self.view3D == False or self.drawAxes == False:
+    def _InitializeCameraBlock(self):
+        alignment = int(glGetIntegerv(GL_UNIFORM_BUFFER_OFFSET_ALIGNMENT))
+
+        self.cameraBlockStride = int((self.cameraBlockSize + alignment - 1) / alignment) * alignment
+
+        self.cameraUBO = glGenBuffers(1)
+
+        glBindBuffer(GL_UNIFORM_BUFFER, self.cameraUBO)
+        glBufferData(GL_UNIFORM_BUFFER, self.cameraBlockStride * self.numCameraPasses, None, GL_DYNAMIC_DRAW)
+        glBindBuffer(GL_UNIFORM_BUFFER, 0)
+
+        self.cameraBlockDirty = True
+
+    def _InitializeSceneFramebuffer(self):
+        self.sceneColorTexture = glGenTextures(1)
+
+        glBindTexture(GL_TEXTURE_2D, self.sceneColorTexture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, self.screenSize[0], self.screenSize[1], 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+        self.sceneDepthRBO = glGenRenderbuffers(1)
+
+        glBindRenderbuffer(GL_RENDERBUFFER, self.sceneDepthRBO)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH24_STENCIL8, self.screenSize[0], self.screenSize[1])
+        glBindRenderbuffer(GL_RENDERBUFFER, 0)
+
+        self.sceneFBO = glGenFramebuffers(1)
+
+        glBindFramebuffer(GL_FRAMEBUFFER, self.sceneFBO)
+        glFramebufferTexture2D(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, self.sceneColorTexture, 0)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_STENCIL_ATTACHMENT, GL_RENDERBUFFER, self.sceneDepthRBO)
+
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError('Incomplete scene framebuffer')
+
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+
+        self.sceneCacheDirty = True
+
+    def _UploadCameraBlock(self):
+        if self.cameraBlockDirty == False:
             return
 
-        coordAxesViewportSize = [40, 40]
+        startTime = time.perf_counter()
 
-        glViewport(self.screenPos[1][0] - coordAxesViewportSize[0] - 10, self.screenPos[1][1] - coordAxesViewportSize[1] - 10, coordAxesViewportSize[0], coordAxesViewportSize[1])
+        if self.view3D == True:
+            scenePrjMat = self.perspectivePrjMat
+            sceneViewMat = self.view3DMat
+        else:
+            scenePrjMat = self.orthoPrjMat
+            sceneViewMat = self.view2DMat
 
         self.coordAxesViewMat[3].x = 0.0
         self.coordAxesViewMat[3].y = 0.0
         self.coordAxesViewMat[3].z = -2.0
 
+        passMats = []
+        passMats.append((scenePrjMat, sceneViewMat))
+        passMats.append((self.perspectivePrjMat, self.coordAxesViewMat))
+        passMats.append((self.GUIPrjMat, self.view2DMat))
+
+        blockData = np.zeros((self.numCameraPasses, int(self.cameraBlockStride / 4)), dtype = np.float32)
+
+        for i in range(self.numCameraPasses):
+            prjMat, viewMat = passMats[i]
+
+            # std140 lays a mat4 out as four vec4 columns.
+            blockData[i, 0 : 16] = np.array(prjMat, dtype = np.float32).T.ravel()
+            blockData[i, 16 : 32] = np.array(viewMat, dtype = np.float32).T.ravel()
+
+        glBindBuffer(GL_UNIFORM_BUFFER, self.cameraUBO)
+        glBufferSubData(GL_UNIFORM_BUFFER, 0, blockData.nbytes, blockData)
+        glBindBuffer(GL_UNIFORM_BUFFER, 0)
+
+        self.numCameraBlockUploads += 1
+        self.cameraBlockUploadTime += time.perf_counter() - startTime
+
+        self.cameraBlockDirty = False
+
+    def _DrawCoordAxes(self):
+        if self.view3D == False or self.drawAxes == False:
+            return
+
+        coordAxesViewportSize = [40, 40]
+
+        glViewport(self.screenPos[1][0] - coordAxesViewportSize[0] - 10, self.screenPos[1][1] - coordAxesViewportSize[1] - 10, coordAxesViewportSize[0], coordAxesViewportSize[1])
+
         self.shaders[Index.SHADER_DEFAULT].Use()
-        
-        self.shaders[Index.SHADER_DEFAULT].SetMat4('prjMat', self.perspectivePrjMat)
-        self.shaders[Index.SHADER_DEFAULT].SetMat4('viewMat', self.coordAxesViewMat)
 
-        glLineWidth(2.0)
+        self.BindCameraPass(Index.CAMERA_PASS_COORD_AXES)
 
-        glBindVertexArray(self.drawingStuffVAO[0])
-        glDrawElements(GL_LINES, len(self.drawingStuffIndicesList[0]), GL_UNSIGNED_INT, None)
+        gGLStateCache.LineWidth(2.0)
 
-        glBindVertexArray(0)
+        gGLStateCache.BindVertexArray(self.drawingStuffVAO[0])
+        glDrawElements(GL_LINES, len(self.drawingStuffIndicesList[0]), self.drawingStuffIndexTypes[0], None)
+
+        gGLStateCache.BindVertexArray(0)
 
         glViewport(0, 0, self.displaySize[0], self.displaySize[1])
 
-    def _DrawObjects(self):
-        numObjects = len(self.objects)
+    def _NeedsSceneRedraw(self):
+        if self.sceneCacheDirty == True:
+            return True
 
-        if self.view3D == True:
-            prjMat = self.perspectivePrjMat
-            viewMat = self.view3DMat            
+        for i in range(len(self.objects)):
+            if self.objects[i].GetNeedsSceneRedraw() == True:
+                return True
+
+        return False
+
+    def _DrawScene(self):
+        if self._NeedsSceneRedraw() == True:
+            glBindFramebuffer(GL_FRAMEBUFFER, self.sceneFBO)
+
+            glViewport(0, 0, self.screenSize[0], self.screenSize[1])
+
+            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+
+            self._DrawObjects()
+
+            glBindFramebuffer(GL_FRAMEBUFFER, 0)
+
+            self.numSceneRedraws += 1
+            self.sceneCacheDirty = False
+            self.sceneCached = False
         else:
-            prjMat = self.orthoPrjMat
-            viewMat = self.view2DMat
+            self.numSceneCacheHits += 1
+            self.sceneCached = True
 
-        for i in range(len(self.shaders)):
-            self.shaders[i].Use()            
-            self.shaders[i].SetMat4('prjMat', prjMat)
-            self.shaders[i].SetMat4('viewMat', viewMat)
+        # Overlays are drawn without depth test, so only the color needs to come back.
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, self.sceneFBO)
+        glBlitFramebuffer(0, 0, self.screenSize[0], self.screenSize[1], self.screenPos[0][0], self.screenPos[0][1], self.screenPos[1][0], self.screenPos[1][1], GL_COLOR_BUFFER_BIT, GL_NEAREST)
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, 0)
+
+    def _DrawObjects(self):
+        numObjects = len(self.objects)
 
         for i in range(numObjects):
+            self.BindCameraPass(Index.CAMERA_PASS_SCENE)
+
             self.objects[i].Draw()
 
+    def _DrawObjectsOverlay(self):
+        numObjects = len(self.objects)
+
+        for i in range(numObjects):
+            self.objects[i].DrawOverlay()
+
     def _DrawGUI(self):
-        glPushAttrib(GL_COLOR_BUFFER_BIT | GL_ENABLE_BIT | GL_LINE_BIT)
+        gGLStateCache.PushState()
 
-        glEnable(GL_BLEND)
+        gGLStateCache.Enable(GL_BLEND)
 
-        glDisable(GL_DEPTH_TEST)
+        gGLStateCache.Disable(GL_DEPTH_TEST)
 
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        gGLStateCache.BlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
 
         self.shaders[Index.SHADER_DEFAULT].Use()
 
@@ -687,7 +984,7 @@ class SceneManager:
 
         self._DrawProgramInfoArea()        
 
-        glUseProgram(0)
+        gGLStateCache.UseProgram(0)
 
         glMatrixMode(GL_PROJECTION)
         glPushMatrix()
@@ -697,9 +994,9 @@ class SceneManager:
 
         glMatrixMode(GL_MODELVIEW)
 
-        glEnable(GL_TEXTURE_2D)
+        gGLStateCache.Enable(GL_TEXTURE_2D)
 
-        glDisable(GL_CULL_FACE)
+        gGLStateCache.Disable(GL_CULL_FACE)
 
         self._DrawProgramInfo()
 
@@ -708,7 +1005,7 @@ class SceneManager:
         glMatrixMode(GL_PROJECTION)
         glPopMatrix()
 
-        glPopAttrib()
+        gGLStateCache.PopState()
        
     def _DrawProgramInfoArea(self):
         if self.programInfo == False:
@@ -716,15 +1013,14 @@ class SceneManager:
 
         self.shaders[Index.SHADER_DEFAULT].Use()
 
-        self.shaders[Index.SHADER_DEFAULT].SetMat4('prjMat', self.GUIPrjMat)
-        self.shaders[Index.SHADER_DEFAULT].SetMat4('viewMat', self.view2DMat)       
+        self.BindCameraPass(Index.CAMERA_PASS_GUI)
         
-        glLineWidth(1.0)
+        gGLStateCache.LineWidth(1.0)
                 
-        glBindVertexArray(self.drawingStuffVAO[1])
-        glDrawElements(GL_LINES, len(self.drawingStuffIndicesList[1]), GL_UNSIGNED_INT, None)        
+        gGLStateCache.BindVertexArray(self.drawingStuffVAO[1])
+        glDrawElements(GL_LINES, len(self.drawingStuffIndicesList[1]), self.drawingStuffIndexTypes[1], None)        
 
-        glBindVertexArray(0)        
+        gGLStateCache.BindVertexArray(0)        
        
     def _DrawProgramInfo(self):
         if self.programInfo == False:
@@ -746,21 +1042,27 @@ class SceneManager:
         infoTextIndex = 0
         infoFPSText = ". FPS"
 
-        if self.controlFPS == True:
+        if self.framePacer.GetEnable() == True:
             infoFPSText += ".On(8, 9; 0)"
         else:
             infoFPSText += ".Off(0)"
 
+        if self.framePacer.GetSwapInterval() > 0:
+            infoFPSText += ".VSync(7)"
+
+        if self.onDemandRender == True:
+            infoFPSText += ".OnDemand(O)"
+
         infoText.append(infoFPSText + ' : {0: 0.2f}'.format(0.0))
+
+        # The history average is steadier than 1 / deltaTime of a single frame.
+        averageFrameTime = self.framePacer.GetAverageFrameTime()
         
-        if self.controlFPS == True:
-            if self.elapsedTime != 0.0:
-                infoText[infoTextIndex] = infoFPSText + " : {0: 0.2f} ({1})".format(1.0 / self.elapsedTime, self.FPS)
-                #print('.FPS: {0: 0.2f} ({1})'.format(1.0 / self.elapsedTime, self.FPS))
-        else:
-            if self.deltaTime != 0.0:
-                infoText[infoTextIndex] = infoFPSText + " : {0: 0.2f}".format(1.0 / self.deltaTime)
-                #print('.FPS: {0: 0.2f}'.format(1.0 / deltaTime))            
+        if averageFrameTime != 0.0:
+            if self.framePacer.GetEnable() == True:
+                infoText[infoTextIndex] = infoFPSText + " : {0: 0.2f} ({1})".format(1.0 / averageFrameTime, self.framePacer.GetTargetFPS())
+            else:
+                infoText[infoTextIndex] = infoFPSText + " : {0: 0.2f}".format(1.0 / averageFrameTime)
 
         infoText.append('. ViewMode(V) : ')
         infoTextIndex += 1
@@ -879,11 +1181,140 @@ class SceneManager:
 
         glPopMatrix()
 
+class FramePacer:
+    def __init__(self):
+        self.enable = False
+        self.targetFPS = 30
+        self.targetFrameTime = 1.0 / self.targetFPS
+
+        self.swapInterval = 1
+        self.swapIntervalDirty = True
+
+        # time.sleep may overshoot by a scheduler tick, so the last spinTime seconds are busy-waited.
+        self.spinTime = 0.002
+
+        self.deadline = 0.0
+        self.lastFrameEndTime = 0.0
+        self.lastFrameTime = 0.0
+        self.lastWaitTime = 0.0
+
+        self.numHistoryFrames = 120
+        self.frameTimes = np.zeros(self.numHistoryFrames, dtype = np.float64)
+        self.historyIndex = 0
+        self.numFrameTimes = 0
+        self.skipFrameTime = True
+
+        self.Reset()
+
+    def GetEnable(self):
+        return self.enable
+
+    def SetEnable(self, enable):
+        self.enable = enable
+
+        self.Reset()
+
+    def GetTargetFPS(self):
+        return self.targetFPS
+
+    def SetTargetFPS(self, targetFPS):
+        self.targetFPS = targetFPS
+        self.targetFrameTime = 1.0 / self.targetFPS
+
+        self.Reset()
+
+    def GetSwapInterval(self):
+        return self.swapInterval
+
+    def SetSwapInterval(self, swapInterval):
+        self.swapInterval = swapInterval
+        self.swapIntervalDirty = True
+
+    def GetLastFrameTime(self):
+        return self.lastFrameTime
+
+    def GetLastWaitTime(self):
+        return self.lastWaitTime
+
+    def GetFrameTimes(self):
+        if self.numFrameTimes < self.numHistoryFrames:
+            return self.frameTimes[0 : self.numFrameTimes]
+
+        return np.roll(self.frameTimes, -self.historyIndex)
+
+    def GetAverageFrameTime(self):
+        if self.numFrameTimes == 0:
+            return 0.0
+
+        return float(np.mean(self.frameTimes[0 : self.numFrameTimes]))
+
+    def GetMaxFrameTime(self):
+        if self.numFrameTimes == 0:
+            return 0.0
+
+        return float(np.max(self.frameTimes[0 : self.numFrameTimes]))
+
+    def Reset(self):
+        currentTime = time.perf_counter()
+
+        self.deadline = currentTime + self.targetFrameTime
+        self.lastFrameEndTime = currentTime
+
+        # The first interval after a reset starts mid-frame, so it is kept out of the history.
+        self.skipFrameTime = True
+
+    def ApplySwapInterval(self):
+        if self.swapIntervalDirty == False:
+            return
+
+        glfw.swap_interval(self.swapInterval)
+
+        self.swapIntervalDirty = False
+
+    def Wait(self):
+        self.lastWaitTime = 0.0
+
+        if self.enable == True:
+            waitStartTime = time.perf_counter()
+
+            sleepTime = self.deadline - waitStartTime - self.spinTime
+
+            if sleepTime > 0.0:
+                time.sleep(sleepTime)
+
+            while time.perf_counter() < self.deadline:
+                pass
+
+            currentTime = time.perf_counter()
+
+            self.lastWaitTime = currentTime - waitStartTime
+
+            # A frame that ran long restarts the schedule instead of bursting to catch up.
+            if currentTime - self.deadline > self.targetFrameTime:
+                self.deadline = currentTime
+
+            self.deadline += self.targetFrameTime
+        else:
+            currentTime = time.perf_counter()
+
+        self.lastFrameTime = currentTime - self.lastFrameEndTime
+        self.lastFrameEndTime = currentTime
+
+        if self.skipFrameTime == True:
+            self.skipFrameTime = False
+        else:
+            self.frameTimes[self.historyIndex] = self.lastFrameTime
+            self.historyIndex = (self.historyIndex + 1) % self.numHistoryFrames
+            self.numFrameTimes = min(self.numFrameTimes + 1, self.numHistoryFrames)
+
+        return self.lastFrameTime
+
 class InputManager:
     def __init__(self):
         self.mouseEntered = False
 
         self.mouseButtonClick = [False, False, False]
+        self.mouseButtonPress = [False, False, False]
         self.lastMousePos = [-1, -1]
         self.lastMousePosOnClick = [-1, -1]
 
@@ -901,6 +1332,12 @@ class InputManager:
     def SetMouseButtonClick(self, key, value):
         self.mouseButtonClick[key] = value
 
+    def GetMouseButtonPress(self, key):
+        return self.mouseButtonPress[key]
+
+    def SetMouseButtonPress(self, key, value):
+        self.mouseButtonPress[key] = value
+
     def GetLastMousePos(self):
         return self.lastMousePos
 
@@ -987,376 +1424,2783 @@ class Camera:
         self.cameraRight = glm.normalize(glm.cross(self.cameraWorldUp, self.cameraFront))
         self.cameraUp = glm.normalize(glm.cross(self.cameraFront, self.cameraRight))
 
-class ShaderFactory:
-    def __init__(self):
-        self.vertexShaderCode = {}
-        self.fragmentShaderCode = {}
+class TransformTable:
+    def __init__(self, capacity = 16):
+        self.numItems = 0
 
-        self._Initialize()
+        self.positions = np.zeros((capacity, 3), dtype = np.float64)
+        self.rotations = np.zeros((capacity, 3), dtype = np.float64)
+        self.scales = np.ones(capacity, dtype = np.float64)
+        self.dirties = np.zeros(capacity, dtype = np.bool_)
 
-    def CreateShader(self, vertexShaderCodeIndex, fragmentShaderCodeIndex):
-        return Shader(self.vertexShaderCode[vertexShaderCodeIndex], self.fragmentShaderCode[fragmentShaderCodeIndex])
+        # Items recomputed since the last ResetChanges, GetModelMat may recompute before Update runs.
+        self.changes = np.zeros(capacity, dtype = np.bool_)
 
-    def _Initialize(self):
-        vertexDefaultShaderCode = """
+        self.modelMats = np.zeros((capacity, 4, 4), dtype = np.float32)
 
-        # version 330 core
+        # glm copies of modelMats, built on first use and dropped when the item is marked dirty.
+        self.glmModelMats = [None] * capacity
 
-        layout(location = 0) in vec3 aPos;
-        layout(location = 1) in vec4 aColor;
+    def GetNumItems(self):
+        return self.numItems
 
-        out vec4 color;
+    def GetPositions(self):
+        return self.positions[ : self.numItems]
 
-        uniform mat4 prjMat;
-        uniform mat4 viewMat;
-        uniform mat4 modelMat;
+    def GetRotations(self):
+        return self.rotations[ : self.numItems]
 
-        void main()
-        {
-            gl_Position = prjMat * viewMat * modelMat * vec4(aPos, 1.0);
+    def GetScales(self):
+        return self.scales[ : self.numItems]
 
-            color = aColor;
-        }
+    # Column-major (N, 4, 4), each matrix is laid out the way glUniformMatrix4fv expects with GL_FALSE.
+    def GetModelMats(self):
+        return self.modelMats[ : self.numItems]
 
-        """
+    def GetModelMat(self, i):
+        if self.dirties[i] == True:
+            self.Update()
 
-        fragmentDefaultShaderCode = """
+        if self.glmModelMats[i] == None:
+            self.glmModelMats[i] = glm.mat4(*self.modelMats[i].ravel())
 
-        # version 330 core
+        return self.glmModelMats[i]
 
-        in vec4 color;
+    def Add(self, position = [0.0, 0.0, 0.0], rotation = [0.0, 0.0, 0.0], scale = 1.0):
+        if self.numItems == len(self.scales):
+            self._Reserve(len(self.scales) * 2)
 
-        out vec4 fragColor;        
+        i = self.numItems
 
-        void main()
-        {
-            fragColor = color;            
-        }
+        self.positions[i] = position
+        self.rotations[i] = rotation
+        self.scales[i] = scale
 
-        """
+        self.MarkDirty(i)
 
-        fragmentSimpleUseUniformColorShaderCode = """
+        self.numItems += 1
 
-        # version 330 core
+        return Transform(self, i)
 
-        in vec4 color;
+    def Clear(self):
+        self.changes[ : self.numItems] = False
 
-        out vec4 fragColor;
+        self.numItems = 0
 
-        uniform vec4 uniformColor;
-        uniform bool useUniformColor;
+    def MarkDirty(self, i):
+        self.dirties[i] = True
+        self.glmModelMats[i] = None
 
-        void main()
-        {
-            if (useUniformColor)
-            {
-                fragColor = uniformColor;
-            }
-            else
-            {
-                fragColor = color;
-            }
-        }
+    def GetChangedItems(self):
+        return np.flatnonzero(self.changes[ : self.numItems])
 
+    def ResetChanges(self):
+        self.changes[ : self.numItems] = False
 
-        """
+    def Update(self):
+        dirtyItems = np.flatnonzero(self.dirties[ : self.numItems])
 
-        self.vertexShaderCode[Index.SHADER_CODE_DEFAULT] = vertexDefaultShaderCode
-        
-        self.fragmentShaderCode[Index.SHADER_CODE_DEFAULT] = fragmentDefaultShaderCode
-        self.fragmentShaderCode[Index.SHADER_FRAGMENT_CODE_SIMPLE_USE_UNIFORMCOLOR] = fragmentSimpleUseUniformColorShaderCode
+        if len(dirtyItems) == 0:
+            return 0
 
-class Shader:
-    def __init__(self, vertexShaderCode, fragmentShaderCode):
-        self.program = None
+        self.modelMats[dirtyItems] = self._ComputeModelMats(self.positions[dirtyItems], self.rotations[dirtyItems], self.scales[dirtyItems])
+        self.dirties[dirtyItems] = False
+        self.changes[dirtyItems] = True
 
-        self._Initialize(vertexShaderCode, fragmentShaderCode)        
+        return len(dirtyItems)
 
-    def Use(self):
-        glUseProgram(self.program)
+    def _Reserve(self, capacity):
+        self.positions = self._Resize(self.positions, capacity, 0.0)
+        self.rotations = self._Resize(self.rotations, capacity, 0.0)
+        self.scales = self._Resize(self.scales, capacity, 1.0)
+        self.dirties = self._Resize(self.dirties, capacity, False)
+        self.changes = self._Resize(self.changes, capacity, False)
+        self.modelMats = self._Resize(self.modelMats, capacity, 0.0)
 
-    def SetBool(self, name, value):
-        loc = glGetUniformLocation(self.program, name)
-        
-        glUniform1i(loc, value)
+        self.glmModelMats.extend([None] * (capacity - len(self.glmModelMats)))
 
-    def SetFloat(self, name, value):
-        loc = glGetUniformLocation(self.program, name)
-        
-        glUniform1f(loc, value)
+    def _Resize(self, array, capacity, fillValue):
+        resized = np.full((capacity, ) + array.shape[1 : ], fillValue, dtype = array.dtype)
+        resized[ : self.numItems] = array[ : self.numItems]
 
-    def SetVec2(self, name, x, y):
-        loc = glGetUniformLocation(self.program, name)
-        
-        glUniform2f(loc, x, y)
+        return resized
 
-    def SetVec3(self, name, x, y, z):
-        loc = glGetUniformLocation(self.program, name)
-        
-        glUniform3f(loc, x, y, z)
+    def _ComputeModelMats(self, positions, rotations, scales):
+        radians = np.radians(rotations)
 
-    def SetVec4(self, name, x, y, z, w):
-        loc = glGetUniformLocation(self.program, name)
-        
-        glUniform4f(loc, x, y, z, w)
+        cosines = np.cos(radians)
+        sines = np.sin(radians)
 
-    def SetMat4(self, name, value):
-        loc = glGetUniformLocation(self.program, name)
+        cx, cy, cz = cosines[:, 0], cosines[:, 1], cosines[:, 2]
+        sx, sy, sz = sines[:, 0], sines[:, 1], sines[:, 2]
 
-        value = np.array(value, dtype = np.float32)
-        glUniformMatrix4fv(loc, 1, GL_TRUE, value)
+        # rotZ * rotY * rotX written out, scaled per column.
+        rotMats = np.empty((len(scales), 3, 3), dtype = np.float64)
 
-    def _Initialize(self, vertexShaderCode, fragmentShaderCode):
-        vertexShader = compileShader(vertexShaderCode, GL_VERTEX_SHADER)
-        fragmentShader = compileShader(fragmentShaderCode, GL_FRAGMENT_SHADER)
+        rotMats[:, 0, 0] = cz * cy
+        rotMats[:, 0, 1] = cz * sy * sx - sz * cx
+        rotMats[:, 0, 2] = cz * sy * cx + sz * sx
+        rotMats[:, 1, 0] = sz * cy
+        rotMats[:, 1, 1] = sz * sy * sx + cz * cx
+        rotMats[:, 1, 2] = sz * sy * cx - cz * sx
+        rotMats[:, 2, 0] = -sy
+        rotMats[:, 2, 1] = cy * sx
+        rotMats[:, 2, 2] = cy * cx
 
-        self.program = compileProgram(vertexShader, fragmentShader)
+        modelMats = np.zeros((len(scales), 4, 4), dtype = np.float32)
 
-class Font:
-    def __init__(self, fontPath, size):
-        self.face = ft.Face(fontPath)
-        self.face.set_char_size(size << 6)
+        modelMats[:, : 3, : 3] = np.swapaxes(rotMats * scales[:, None, None], 1, 2)
+        modelMats[:, 3, : 3] = positions
+        modelMats[:, 3, 3] = 1.0
 
-        self.charsSize = (6, 16)
-        self.charsAdvanceX = []
+        return modelMats
 
-        self.maxCharHeight = 0
-        self.charStartOffset = 32
-        self.listOffset = -1
-        self.texId = -1
+class Transform:
+    def __init__(self, transformTable, index):
+        self.transformTable = transformTable
+        self.index = index
 
-        numChars = self.charsSize[0] * self.charsSize[1]
+    def GetIndex(self):
+        return self.index
 
-        self.charsAdvanceX = [0 for i in range(numChars)]
+    def GetPosition(self):
+        return self.transformTable.positions[self.index].tolist()
 
-        advanceX, ascender, descender = 0, 0, 0
+    def GetRotation(self):
+        return self.transformTable.rotations[self.index].tolist()
+
+    def GetScale(self):
+        return float(self.transformTable.scales[self.index])
+
+    def GetDirty(self):
+        return bool(self.transformTable.dirties[self.index])
+
+    def GetModelMat(self):
+        return self.transformTable.GetModelMat(self.index)
+
+    def SetPosition(self, position):
+        if np.array_equal(self.transformTable.positions[self.index], position) == False:
+            self.transformTable.positions[self.index] = position
+            self.transformTable.MarkDirty(self.index)
+
+    def SetRotation(self, rotation):
+        if np.array_equal(self.transformTable.rotations[self.index], rotation) == False:
+            self.transformTable.rotations[self.index] = rotation
+            self.transformTable.MarkDirty(self.index)
+
+    def SetScale(self, scale):
+        if self.transformTable.scales[self.index] != scale:
+            self.transformTable.scales[self.index] = scale
+            self.transformTable.MarkDirty(self.index)
+
+class Frustum:
+    def __init__(self):
+        self.planes = np.zeros((6, 4), dtype = np.float64)
+
+    def GetPlanes(self):
+        return self.planes
+
+    def Update(self, prjViewMat):
+        rows = np.array(prjViewMat, dtype = np.float64)
+
+        # Gribb-Hartmann: left, right, bottom, top, near, far
+        self.planes[0] = rows[3] + rows[0]
+        self.planes[1] = rows[3] - rows[0]
+        self.planes[2] = rows[3] + rows[1]
+        self.planes[3] = rows[3] - rows[1]
+        self.planes[4] = rows[3] + rows[2]
+        self.planes[5] = rows[3] - rows[2]
+
+        self.planes /= np.linalg.norm(self.planes[:, 0 : 3], axis = 1, keepdims = True)
+
+    def TestSphere(self, center, radius):
+        return bool(np.all(self.planes[:, 0 : 3] @ center + self.planes[:, 3] >= -radius))
+
+    def TestBox(self, center, extents):
+        return bool(np.all(self.planes[:, 0 : 3] @ center + self.planes[:, 3] >= -(np.abs(self.planes[:, 0 : 3]) @ extents)))
+
+    def TransformBox(self, boundingBox, modelMat):
+        mat = np.array(modelMat, dtype = np.float64)
+
+        center = (boundingBox[0 : 3] + boundingBox[3 : 6]) * 0.5
+        extents = (boundingBox[3 : 6] - boundingBox[0 : 3]) * 0.5
+
+        return mat[0 : 3, 0 : 3] @ center + mat[0 : 3, 3], np.abs(mat[0 : 3, 0 : 3]) @ extents
+
+class BoundingVolumeHierarchy:
+    def __init__(self, leafSize = 1):
+        self.leafSize = leafSize
+
+        self.numItems = 0
+        self.numLeaves = 0
+        self.numLevels = 0
+
+        self.itemSlots = np.zeros(0, dtype = np.int64)
+        self.slotItems = np.zeros(0, dtype = np.int64)
+        self.slotMins = np.zeros((0, 3), dtype = np.float64)
+        self.slotMaxs = np.zeros((0, 3), dtype = np.float64)
+
+        self.nodeMins = np.zeros((0, 3), dtype = np.float64)
+        self.nodeMaxs = np.zeros((0, 3), dtype = np.float64)
+
+        self.buildTime = 0.0
+        self.refitTime = 0.0
+        self.numVisitedNodes = 0
+
+    def GetNumItems(self):
+        return self.numItems
+
+    def GetNumNodes(self):
+        return len(self.nodeMins)
+
+    def GetBuildTime(self):
+        return self.buildTime
+
+    def GetRefitTime(self):
+        return self.refitTime
+
+    def GetNumVisitedNodes(self):
+        return self.numVisitedNodes
+
+    def GetNodeData(self):
+        nodeData = {}
+
+        # Node boxes are widened by one float32 ulp so that the stored tree stays conservative.
+        nodeData['SlotItems'] = self.slotItems.astype(np.int32)
+        nodeData['NodeMins'] = np.nextafter(self.nodeMins.astype(np.float32), np.float32(-np.inf))
+        nodeData['NodeMaxs'] = np.nextafter(self.nodeMaxs.astype(np.float32), np.float32(np.inf))
+
+        return nodeData
+
+    def SetNodeData(self, nodeData):
+        self.slotItems = nodeData['SlotItems']
+        self.nodeMins = nodeData['NodeMins']
+        self.nodeMaxs = nodeData['NodeMaxs']
+
+        self.numLeaves = int((len(self.nodeMins) + 1) / 2)
+        self.numLevels = self.numLeaves.bit_length()
+        self.numItems = int(np.count_nonzero(self.slotItems >= 0))
+
+        # Without the item boxes the tree can be queried but not refitted.
+        self.itemSlots = None
+        self.slotMins = None
+        self.slotMaxs = None
+
+    def Build(self, boxMins, boxMaxs):
+        startTime = time.perf_counter()
+
+        boxMins = np.asarray(boxMins, dtype = np.float64).reshape(-1, 3)
+        boxMaxs = np.asarray(boxMaxs, dtype = np.float64).reshape(-1, 3)
+
+        self.numItems = len(boxMins)
+        self.numLeaves = 1
+
+        while self.numLeaves * self.leafSize < self.numItems:
+            self.numLeaves *= 2
+
+        self.numLevels = self.numLeaves.bit_length()
+
+        # Items are laid out along a Morton curve so that neighbouring leaves stay spatially close.
+        itemOrder = np.argsort(self._ComputeMortonCodes((boxMins + boxMaxs) * 0.5), kind = 'stable')
+
+        numSlots = self.numLeaves * self.leafSize
+
+        self.slotItems = np.full(numSlots, -1, dtype = np.int64)
+        self.slotItems[0 : self.numItems] = itemOrder
+
+        self.itemSlots = np.zeros(self.numItems, dtype = np.int64)
+        self.itemSlots[itemOrder] = np.arange(self.numItems, dtype = np.int64)
+
+        self.slotMins = np.full((numSlots, 3), np.inf, dtype = np.float64)
+        self.slotMaxs = np.full((numSlots, 3), -np.inf, dtype = np.float64)
+
+        self.slotMins[0 : self.numItems] = boxMins[itemOrder]
+        self.slotMaxs[0 : self.numItems] = boxMaxs[itemOrder]
+
+        self.nodeMins = np.empty((self.numLeaves * 2 - 1, 3), dtype = np.float64)
+        self.nodeMaxs = np.empty((self.numLeaves * 2 - 1, 3), dtype = np.float64)
+
+        self.nodeMins[self.numLeaves - 1 : ] = self.slotMins.reshape(self.numLeaves, self.leafSize, 3).min(axis = 1)
+        self.nodeMaxs[self.numLeaves - 1 : ] = self.slotMaxs.reshape(self.numLeaves, self.leafSize, 3).max(axis = 1)
+
+        levelSize = self.numLeaves
+
+        while levelSize > 1:
+            levelSize //= 2
+
+            nodes = np.arange(levelSize - 1, levelSize * 2 - 1)
+
+            self.nodeMins[nodes] = np.minimum(self.nodeMins[nodes * 2 + 1], self.nodeMins[nodes * 2 + 2])
+            self.nodeMaxs[nodes] = np.maximum(self.nodeMaxs[nodes * 2 + 1], self.nodeMaxs[nodes * 2 + 2])
+
+        self.buildTime = time.perf_counter() - startTime
+
+    def Refit(self, items, boxMins, boxMaxs):
+        startTime = time.perf_counter()
+
+        slots = self.itemSlots[np.asarray(items, dtype = np.int64)]
+
+        self.slotMins[slots] = np.asarray(boxMins, dtype = np.float64).reshape(-1, 3)
+        self.slotMaxs[slots] = np.asarray(boxMaxs, dtype = np.float64).reshape(-1, 3)
+
+        leaves = np.unique(slots // self.leafSize)
+
+        nodes = leaves + self.numLeaves - 1
+
+        self.nodeMins[nodes] = self.slotMins.reshape(self.numLeaves, self.leafSize, 3)[leaves].min(axis = 1)
+        self.nodeMaxs[nodes] = self.slotMaxs.reshape(self.numLeaves, self.leafSize, 3)[leaves].max(axis = 1)
+
+        while len(nodes) > 0 and nodes[0] > 0:
+            nodes = np.unique((nodes - 1) // 2)
+
+            self.nodeMins[nodes] = np.minimum(self.nodeMins[nodes * 2 + 1], self.nodeMins[nodes * 2 + 2])
+            self.nodeMaxs[nodes] = np.maximum(self.nodeMaxs[nodes * 2 + 1], self.nodeMaxs[nodes * 2 + 2])
+
+        self.refitTime = time.perf_counter() - startTime
+
+    def QueryFrustum(self, planes):
+        planeNormals = planes[:, 0 : 3].T
+        absPlaneNormals = np.abs(planeNormals)
+        planeOffsets = planes[:, 3]
+
+        def TestBoxes(mins, maxs):
+            centers = (mins + maxs) * 0.5
+            extents = (maxs - mins) * 0.5
+
+            return np.all(centers @ planeNormals + planeOffsets >= -(extents @ absPlaneNormals), axis = 1)
+
+        return self._Traverse(TestBoxes)
+
+    def QueryOverlap(self, boxMin, boxMax):
+        boxMin = np.asarray(boxMin, dtype = np.float64)
+        boxMax = np.asarray(boxMax, dtype = np.float64)
+
+        def TestBoxes(mins, maxs):
+            return np.all((mins <= boxMax) & (maxs >= boxMin), axis = 1)
+
+        return self._Traverse(TestBoxes)
+
+    def QueryRay(self, origin, direction, maxDistance = np.inf):
+        origin = np.asarray(origin, dtype = np.float64)
+        direction = np.asarray(direction, dtype = np.float64)
+
+        invDirection = 1.0 / np.where(np.abs(direction) > 1e-30, direction, 1e-30)
+
+        def TestBoxes(mins, maxs):
+            return self._IntersectRayBoxes(origin, invDirection, mins, maxs, maxDistance)[0]
+
+        items, slots = self._Traverse(TestBoxes, True)
+
+        if self.slotMins is not None:
+            _, entryDistances = self._IntersectRayBoxes(origin, invDirection, self.slotMins[slots], self.slotMaxs[slots], maxDistance)
+        else:
+            leafNodes = slots // self.leafSize + self.numLeaves - 1
+
+            _, entryDistances = self._IntersectRayBoxes(origin, invDirection, self.nodeMins[leafNodes], self.nodeMaxs[leafNodes], maxDistance)
+
+        order = np.argsort(entryDistances, kind = 'stable')
+
+        return items[order], entryDistances[order]
+
+    def _Traverse(self, testBoxes, returnSlots = False):
+        self.numVisitedNodes = 0
+
+        if self.numItems == 0:
+            if returnSlots == True:
+                return np.zeros(0, dtype = np.int64), np.zeros(0, dtype = np.int64)
+
+            return np.zeros(0, dtype = np.int64)
+
+        nodes = np.zeros(1, dtype = np.int64)
+
+        with np.errstate(invalid = 'ignore'):
+            for level in range(self.numLevels):
+                self.numVisitedNodes += len(nodes)
+
+                nodes = nodes[testBoxes(self.nodeMins[nodes], self.nodeMaxs[nodes])]
+
+                if len(nodes) == 0 or level == self.numLevels - 1:
+                    break
+
+                nodes = np.stack((nodes * 2 + 1, nodes * 2 + 2), axis = 1).reshape(-1)
+
+            slots = ((nodes - (self.numLeaves - 1))[:, np.newaxis] * self.leafSize + np.arange(self.leafSize)).reshape(-1)
+            slots = slots[self.slotItems[slots] >= 0]
+
+            if self.leafSize > 1 and self.slotMins is not None:
+                slots = slots[testBoxes(self.slotMins[slots], self.slotMaxs[slots])]
+
+        if returnSlots == True:
+            return self.slotItems[slots], slots
+
+        return self.slotItems[slots]
+
+    def _IntersectRayBoxes(self, origin, invDirection, mins, maxs, maxDistance):
+        distances0 = (mins - origin) * invDirection
+        distances1 = (maxs - origin) * invDirection
+
+        entryDistances = np.max(np.minimum(distances0, distances1), axis = 1)
+        exitDistances = np.min(np.maximum(distances0, distances1), axis = 1)
+
+        # Padding leaves have inverted boxes, which would otherwise pass the slab test.
+        hits = (exitDistances >= np.maximum(entryDistances, 0.0)) & (entryDistances <= maxDistance) & np.all(mins <= maxs, axis = 1)
+
+        return hits, entryDistances
+
+    def _ComputeMortonCodes(self, centers):
+        if len(centers) == 0:
+            return np.zeros(0, dtype = np.uint64)
+
+        minCenter = centers.min(axis = 0)
+        extent = np.maximum(centers.max(axis = 0) - minCenter, 1e-30)
+
+        cells = np.clip((centers - minCenter) / extent * 1023.0, 0.0, 1023.0).astype(np.uint64)
+
+        mortonCodes = np.zeros(len(centers), dtype = np.uint64)
+
+        for axis in range(3):
+            bits = cells[:, axis]
+            bits = (bits | (bits << np.uint64(16))) & np.uint64(0x030000FF)
+            bits = (bits | (bits << np.uint64(8))) & np.uint64(0x0300F00F)
+            bits = (bits | (bits << np.uint64(4))) & np.uint64(0x030C30C3)
+            bits = (bits | (bits << np.uint64(2))) & np.uint64(0x09249249)
+
+            mortonCodes |= bits << np.uint64(2 - axis)
+
+        return mortonCodes
+
+class GLStateCache:
+    def __init__(self):
+        self.capabilities = [GL_DEPTH_TEST, GL_CULL_FACE, GL_BLEND, GL_TEXTURE_2D, GL_POINT_SMOOTH, GL_POLYGON_OFFSET_LINE]
+
+        self.state = {}
+        self.stateStack = []
+
+        self.numIssuedCalls = 0
+        self.numSkippedCalls = 0
+
+        self.lastNumIssuedCalls = 0
+        self.lastNumSkippedCalls = 0
+
+    def GetNumIssuedCalls(self):
+        return self.lastNumIssuedCalls
+
+    def GetNumSkippedCalls(self):
+        return self.lastNumSkippedCalls
+
+    # Anything outside the cache (imgui, loaders) may have touched GL since the last frame, so the baseline is issued unconditionally.
+    def Reset(self):
+        self.lastNumIssuedCalls = self.numIssuedCalls
+        self.lastNumSkippedCalls = self.numSkippedCalls
+
+        self.numIssuedCalls = 0
+        self.numSkippedCalls = 0
+
+        self.state.clear()
+        self.stateStack.clear()
+
+        self.UseProgram(0)
+        self.BindVertexArray(0)
+
+        for capability in self.capabilities:
+            self.Disable(capability)
+
+        self.Enable(GL_DEPTH_TEST)
+        self.Enable(GL_CULL_FACE)
+
+        self.CullFace(GL_BACK)
+        self.PolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+        self.BlendFunc(GL_ONE, GL_ZERO)
+        self.PolygonOffset(0.0, 0.0)
+        self.LineWidth(1.0)
+        self.PointSize(1.0)
+
+    def PushState(self):
+        self.stateStack.append(dict(self.state))
+
+    def PopState(self):
+        savedState = self.stateStack.pop()
+
+        for capability in self.capabilities:
+            if savedState[capability] == True:
+                self.Enable(capability)
+            else:
+                self.Disable(capability)
+
+        self.CullFace(savedState['CullFace'])
+        self.PolygonMode(GL_FRONT, savedState['PolygonModeFront'])
+        self.PolygonMode(GL_BACK, savedState['PolygonModeBack'])
+        self.BlendFunc(*savedState['BlendFunc'])
+        self.PolygonOffset(*savedState['PolygonOffset'])
+        self.LineWidth(savedState['LineWidth'])
+        self.PointSize(savedState['PointSize'])
+
+    def UseProgram(self, program):
+        if self._Change('Program', program) == True:
+            glUseProgram(program)
+
+    def BindVertexArray(self, vertexArray):
+        if self._Change('VertexArray', vertexArray) == True:
+            glBindVertexArray(vertexArray)
+
+    def Enable(self, capability):
+        if self._Change(capability, True) == True:
+            glEnable(capability)
+
+    def Disable(self, capability):
+        if self._Change(capability, False) == True:
+            glDisable(capability)
+
+    def CullFace(self, face):
+        if self._Change('CullFace', face) == True:
+            glCullFace(face)
+
+    def PolygonMode(self, face, mode):
+        if face == GL_FRONT_AND_BACK:
+            if self.state.get('PolygonModeFront') == mode and self.state.get('PolygonModeBack') == mode:
+                self.numSkippedCalls += 1
+                return
+
+            self.state['PolygonModeFront'] = mode
+            self.state['PolygonModeBack'] = mode
+            self.numIssuedCalls += 1
+
+            glPolygonMode(face, mode)
+        elif face == GL_FRONT:
+            if self._Change('PolygonModeFront', mode) == True:
+                glPolygonMode(face, mode)
+        else:
+            if self._Change('PolygonModeBack', mode) == True:
+                glPolygonMode(face, mode)
+
+    def BlendFunc(self, srcFactor, dstFactor):
+        if self._Change('BlendFunc', (srcFactor, dstFactor)) == True:
+            glBlendFunc(srcFactor, dstFactor)
+
+    def PolygonOffset(self, factor, units):
+        if self._Change('PolygonOffset', (factor, units)) == True:
+            glPolygonOffset(factor, units)
+
+    def LineWidth(self, width):
+        if self._Change('LineWidth', width) == True:
+            glLineWidth(width)
+
+    def PointSize(self, size):
+        if self._Change('PointSize', size) == True:
+            glPointSize(size)
+
+    def _Change(self, key, value):
+        if key in self.state and self.state[key] == value:
+            self.numSkippedCalls += 1
+            return False
+
+        self.state[key] = value
+        self.numIssuedCalls += 1
+
+        return True
+
+class RenderQueue:
+    def __init__(self):
+        self.items = []
+
+        self.numStateTransitions = 0
+        self.numUnsortedStateTransitions = 0
+
+    def GetNumItems(self):
+        return len(self.items)
+
+    def GetNumStateTransitions(self):
+        return self.numStateTransitions
+
+    def GetNumUnsortedStateTransitions(self):
+        return self.numUnsortedStateTransitions
+
+    def Clear(self):
+        self.items.clear()
+
+    def MakeKey(self, renderPass, shaderIndex, rasterState, vertexArray):
+        return (renderPass << 56) | (shaderIndex << 48) | (rasterState << 40) | (int(vertexArray) & 0xFFFFFFFF)
+
+    # modelMat is a column-major float32 (4, 4) row that the caller does not modify afterwards, the command list uploads it as is.
+    def Submit(self, renderPass, shaderIndex, rasterState, vertexArray, modelMat, boolUniforms, vec4Uniforms, mode, count, indexType = None, offset = None):
+        key = self.MakeKey(renderPass, shaderIndex, rasterState, vertexArray)
+
+        self.items.append((key, shaderIndex, rasterState, vertexArray, modelMat, boolUniforms, vec4Uniforms, mode, count, indexType, offset))
+
+    def GetItems(self):
+        return self.items
+
+    def Sort(self):
+        self.numUnsortedStateTransitions = self._CountStateTransitions()
+
+        # Stable, so items with equal keys keep their submission order.
+        self.items.sort(key = lambda item: item[0])
+
+        self.numStateTransitions = self._CountStateTransitions()
+
+    def _CountStateTransitions(self):
+        numStateTransitions = 0
+
+        lastItem = None
+
+        for item in self.items:
+            if lastItem == None:
+                numStateTransitions += 3
+            else:
+                for i in range(1, 4):
+                    if item[i] != lastItem[i]:
+                        numStateTransitions += 1
+
+            lastItem = item
+
+        return numStateTransitions
+
+class CommandList:
+    def __init__(self):
+        self.commands = []
+
+        self.numRecords = 0
+        self.numReplays = 0
+
+    def GetNumCommands(self):
+        return len(self.commands)
+
+    def GetNumRecords(self):
+        return self.numRecords
+
+    def GetNumReplays(self):
+        return self.numReplays
+
+    def Clear(self):
+        self.commands.clear()
+
+    # Flattens sorted render items into only the state changes and draws they need.
+    def Record(self, items):
+        self.commands.clear()
+
+        lastShaderIndex = None
+        lastRasterState = None
+        lastVertexArray = None
+
+        # Uniform values persist per program, so a draw only uploads the ones that differ from the last draw with the same shader.
+        lastUniformValues = {}
+
+        for item in items:
+            key, shaderIndex, rasterState, vertexArray, modelMat, boolUniforms, vec4Uniforms, mode, count, indexType, offset = item
+
+            if shaderIndex != lastShaderIndex:
+                shader = gSceneManager.GetShader(shaderIndex)
+                self.commands.append((Index.COMMAND_USE_PROGRAM, shader))
+                lastShaderIndex = shaderIndex
+
+            if rasterState != lastRasterState:
+                self.commands.append((Index.COMMAND_SET_RASTER_STATE, rasterState))
+                lastRasterState = rasterState
+
+            if vertexArray != lastVertexArray:
+                self.commands.append((Index.COMMAND_BIND_VERTEX_ARRAY, vertexArray))
+                lastVertexArray = vertexArray
+
+            uniformValues = lastUniformValues.setdefault(shaderIndex, {})
+            uniformUploads = []
+
+            for name, value in boolUniforms.items():
+                if uniformValues.get(name) != value:
+                    uniformUploads.append((glUniform1i, (shader.GetUniformLocation(name), value)))
+                    uniformValues[name] = value
+
+            for name, value in vec4Uniforms.items():
+                if uniformValues.get(name) != value:
+                    uniformUploads.append((glUniform4f, (shader.GetUniformLocation(name), value[0], value[1], value[2], value[3])))
+                    uniformValues[name] = value
+
+            self.commands.append((Index.COMMAND_DRAW, shader.GetUniformLocation('modelMat'), modelMat, uniformUploads, mode, count, indexType, offset))
+
+        self.numRecords += 1
+
+    def Replay(self):
+        shader = None
+        profileUniforms = False
+
+        for command in self.commands:
+            if command[0] == Index.COMMAND_DRAW:
+                _, modelMatLocation, modelMat, uniformUploads, mode, count, indexType, offset = command
+
+                if profileUniforms == True:
+                    shader.ProfileMat4Upload(modelMatLocation, modelMat)
+
+                    for uniformFunc, uniformArgs in uniformUploads:
+                        shader.ProfileUniformUpload(uniformFunc, *uniformArgs)
+                else:
+                    glUniformMatrix4fv(modelMatLocation, 1, GL_FALSE, modelMat)
+
+                    for uniformFunc, uniformArgs in uniformUploads:
+                        uniformFunc(*uniformArgs)
+
+                if indexType == None:
+                    glDrawArrays(mode, 0, count)
+                else:
+                    glDrawElements(mode, count, indexType, offset)
+            elif command[0] == Index.COMMAND_USE_PROGRAM:
+                shader = command[1]
+                shader.Use()
+
+                profileUniforms = shader.GetProfileUniforms()
+            elif command[0] == Index.COMMAND_SET_RASTER_STATE:
+                self._ApplyRasterState(command[1])
+            elif command[0] == Index.COMMAND_BIND_VERTEX_ARRAY:
+                gGLStateCache.BindVertexArray(command[1])
+
+        gGLStateCache.BindVertexArray(0)
+
+        self.numReplays += 1
+
+    def _ApplyRasterState(self, rasterState):
+        if rasterState == Index.RASTER_STATE_CULL_BACK:
+            gGLStateCache.Enable(GL_CULL_FACE)
+            gGLStateCache.CullFace(GL_BACK)
+            gGLStateCache.PolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+        elif rasterState == Index.RASTER_STATE_CULL_FRONT:
+            gGLStateCache.Enable(GL_CULL_FACE)
+            gGLStateCache.CullFace(GL_FRONT)
+            gGLStateCache.PolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+        elif rasterState == Index.RASTER_STATE_TWO_SIDED:
+            gGLStateCache.Disable(GL_CULL_FACE)
+            gGLStateCache.PolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+        elif rasterState == Index.RASTER_STATE_POINTS:
+            gGLStateCache.Enable(GL_POINT_SMOOTH)
+            gGLStateCache.PointSize(5.0)
+        elif rasterState == Index.RASTER_STATE_LINES:
+            gGLStateCache.LineWidth(1.0)
+
+class ShaderFactory:
+    def __init__(self):
+        self.vertexShaderCode = {}
+        self.fragmentShaderCode = {}
+        self.geometryShaderCode = {}
+
+        self._Initialize()
+
+    def CreateShader(self, vertexShaderCodeIndex, fragmentShaderCodeIndex, geometryShaderCodeIndex = None):
+        if geometryShaderCodeIndex == None:
+            return Shader(self.vertexShaderCode[vertexShaderCodeIndex], self.fragmentShaderCode[fragmentShaderCodeIndex])
+
+        return Shader(self.vertexShaderCode[vertexShaderCodeIndex], self.fragmentShaderCode[fragmentShaderCodeIndex], self.geometryShaderCode[geometryShaderCodeIndex])
+
+    def _Initialize(self):
+        vertexDefaultShaderCode = """
+
+        # version 330 core
+
+        layout(location = 0) in vec3 aPos;
+        layout(location = 1) in vec4 aColor;
+
+        out vec4 color;
+
+        layout(std140) uniform Camera
+        {
+            mat4 prjMat;
+            mat4 viewMat;
+        };
+
+        uniform mat4 modelMat;
+
+        void main()
+        {
+            gl_Position = prjMat * viewMat * modelMat * vec4(aPos, 1.0);
+
+            color = aColor;
+        }
+
+        """
+
+        fragmentDefaultShaderCode = """
+
+        # version 330 core
+
+        in vec4 color;
+
+        out vec4 fragColor;        
+
+        void main()
+        {
+            fragColor = color;            
+        }
+
+        """
+
+        fragmentSimpleUseUniformColorShaderCode = """
+
+        # version 330 core
+
+        in vec4 color;
+
+        out vec4 fragColor;
+
+        uniform vec4 uniformColor;
+        uniform bool useUniformColor;
+
+        uniform bool twoSided;
+        uniform vec4 backColor;
+
+        void main()
+        {
+            if (twoSided && !gl_FrontFacing)
+            {
+                fragColor = backColor;
+            }
+            else if (useUniformColor)
+            {
+                fragColor = uniformColor;
+            }
+            else
+            {
+                fragColor = color;
+            }
+        }
+
+
+        """
+
+        # Each vertex gets its screen-space height over the opposite edge, interpolated without perspective.
+        geometryWireframeShaderCode = """
+
+        # version 330 core
+
+        layout(triangles) in;
+        layout(triangle_strip, max_vertices = 3) out;
+
+        in vec4 color[];
+
+        out vec4 geometryColor;
+        noperspective out vec3 edgeDistance;
+
+        uniform vec2 viewportSize;
+
+        void main()
+        {
+            // Vertices at or behind the eye and degenerate edges would otherwise divide by zero.
+            vec2 p0 = 0.5 * viewportSize * gl_in[0].gl_Position.xy / max(gl_in[0].gl_Position.w, 1e-6);
+            vec2 p1 = 0.5 * viewportSize * gl_in[1].gl_Position.xy / max(gl_in[1].gl_Position.w, 1e-6);
+            vec2 p2 = 0.5 * viewportSize * gl_in[2].gl_Position.xy / max(gl_in[2].gl_Position.w, 1e-6);
+
+            vec2 e0 = p2 - p1;
+            vec2 e1 = p2 - p0;
+            vec2 e2 = p1 - p0;
+
+            float area = abs(e1.x * e2.y - e1.y * e2.x);
+
+            gl_Position = gl_in[0].gl_Position;
+            geometryColor = color[0];
+            edgeDistance = vec3(area / max(length(e0), 1e-6), 0.0, 0.0);
+            EmitVertex();
+
+            gl_Position = gl_in[1].gl_Position;
+            geometryColor = color[1];
+            edgeDistance = vec3(0.0, area / max(length(e1), 1e-6), 0.0);
+            EmitVertex();
+
+            gl_Position = gl_in[2].gl_Position;
+            geometryColor = color[2];
+            edgeDistance = vec3(0.0, 0.0, area / max(length(e2), 1e-6));
+            EmitVertex();
+
+            EndPrimitive();
+        }
+
+        """
+
+        fragmentWireframeShaderCode = """
+
+        # version 330 core
+
+        in vec4 geometryColor;
+        noperspective in vec3 edgeDistance;
+
+        out vec4 fragColor;
+
+        uniform vec4 uniformColor;
+        uniform bool useUniformColor;
+
+        uniform bool twoSided;
+        uniform vec4 backColor;
+
+        uniform bool drawFace;
+        uniform vec4 wireframeColor;
+        uniform float wireframeWidth;
+
+        void main()
+        {
+            float distance = min(edgeDistance.x, min(edgeDistance.y, edgeDistance.z));
+            float edge = 1.0 - smoothstep(0.5 * wireframeWidth - 0.5, 0.5 * wireframeWidth + 0.5, distance);
+
+            if (drawFace)
+            {
+                vec4 faceColor = useUniformColor ? uniformColor : geometryColor;
+
+                if (twoSided && !gl_FrontFacing)
+                {
+                    faceColor = backColor;
+                }
+
+                fragColor = mix(faceColor, wireframeColor, edge);
+            }
+            else
+            {
+                if (edge <= 0.0)
+                {
+                    discard;
+                }
+
+                fragColor = vec4(wireframeColor.rgb, wireframeColor.a * edge);
+            }
+        }
+
+        """
+
+        self.vertexShaderCode[Index.SHADER_CODE_DEFAULT] = vertexDefaultShaderCode
+        
+        self.fragmentShaderCode[Index.SHADER_CODE_DEFAULT] = fragmentDefaultShaderCode
+        self.fragmentShaderCode[Index.SHADER_FRAGMENT_CODE_SIMPLE_USE_UNIFORMCOLOR] = fragmentSimpleUseUniformColorShaderCode
+        self.fragmentShaderCode[Index.SHADER_FRAGMENT_CODE_WIREFRAME] = fragmentWireframeShaderCode
+
+        self.geometryShaderCode[Index.SHADER_GEOMETRY_CODE_WIREFRAME] = geometryWireframeShaderCode
+
+class Shader:
+    def __init__(self, vertexShaderCode, fragmentShaderCode, geometryShaderCode = None):
+        self.program = None
+
+        self.uniformLocations = {}
+
+        # Upload timing costs more than the uploads themselves, so it only runs in debug mode.
+        self.profileUniforms = False
+        self.numUniformUploads = 0
+        self.uniformUploadTime = 0.0
+        self.numMat4Uploads = 0
+        self.mat4UploadTime = 0.0
+        self.mat4CopyTime = 0.0
+
+        self._Initialize(vertexShaderCode, fragmentShaderCode, geometryShaderCode)        
+
+    def Use(self):
+        gGLStateCache.UseProgram(self.program)
+
+    def GetUniformLocation(self, name):
+        return self.uniformLocations.get(name, -1)
+
+    def GetNumUniformUploads(self):
+        return self.numUniformUploads
+
+    def GetUniformUploadTime(self):
+        return self.uniformUploadTime
+
+    def GetNumMat4Uploads(self):
+        return self.numMat4Uploads
+
+    def GetMat4UploadTime(self):
+        return self.mat4UploadTime
+
+    def GetMat4CopyTime(self):
+        return self.mat4CopyTime
+
+    def ResetUniformStats(self):
+        self.numUniformUploads = 0
+        self.uniformUploadTime = 0.0
+        self.numMat4Uploads = 0
+        self.mat4UploadTime = 0.0
+        self.mat4CopyTime = 0.0
+
+    def GetProfileUniforms(self):
+        return self.profileUniforms
+
+    def SetProfileUniforms(self, profileUniforms):
+        self.profileUniforms = profileUniforms
+
+        self.ResetUniformStats()
+
+    def SetBool(self, name, value):
+        if self.profileUniforms == True:
+            return self.ProfileUniformUpload(glUniform1i, self.uniformLocations.get(name, -1), value)
+
+        glUniform1i(self.uniformLocations.get(name, -1), value)
+
+    def SetFloat(self, name, value):
+        if self.profileUniforms == True:
+            return self.ProfileUniformUpload(glUniform1f, self.uniformLocations.get(name, -1), value)
+
+        glUniform1f(self.uniformLocations.get(name, -1), value)
+
+    def SetVec2(self, name, x, y):
+        if self.profileUniforms == True:
+            return self.ProfileUniformUpload(glUniform2f, self.uniformLocations.get(name, -1), x, y)
+
+        glUniform2f(self.uniformLocations.get(name, -1), x, y)
+
+    def SetVec3(self, name, x, y, z):
+        if self.profileUniforms == True:
+            return self.ProfileUniformUpload(glUniform3f, self.uniformLocations.get(name, -1), x, y, z)
+
+        glUniform3f(self.uniformLocations.get(name, -1), x, y, z)
+
+    def SetVec4(self, name, x, y, z, w):
+        if self.profileUniforms == True:
+            return self.ProfileUniformUpload(glUniform4f, self.uniformLocations.get(name, -1), x, y, z, w)
+
+        glUniform4f(self.uniformLocations.get(name, -1), x, y, z, w)
+
+    # value is a column-major float32 (4, 4) array such as a TransformTable.modelMats row, it is uploaded as is.
+    def SetMat4(self, name, value):
+        if self.profileUniforms == True:
+            return self.ProfileMat4Upload(self.uniformLocations.get(name, -1), value)
+
+        glUniformMatrix4fv(self.uniformLocations.get(name, -1), 1, GL_FALSE, value)
+
+    def ProfileUniformUpload(self, uniformFunc, *args):
+        startTime = time.perf_counter()
+
+        uniformFunc(*args)
+
+        self.numUniformUploads += 1
+        self.uniformUploadTime += time.perf_counter() - startTime
+
+    def ProfileMat4Upload(self, location, value):
+        # The float32 copy the upload used to make per call is timed on its own, so the stats show what skipping it saves.
+        startTime = time.perf_counter()
+
+        np.array(value, dtype = np.float32)
+
+        self.mat4CopyTime += time.perf_counter() - startTime
+
+        startTime = time.perf_counter()
+
+        glUniformMatrix4fv(location, 1, GL_FALSE, value)
+
+        uploadTime = time.perf_counter() - startTime
+
+        self.numUniformUploads += 1
+        self.uniformUploadTime += uploadTime
+        self.numMat4Uploads += 1
+        self.mat4UploadTime += uploadTime
+
+    def _Initialize(self, vertexShaderCode, fragmentShaderCode, geometryShaderCode):
+        vertexShader = compileShader(vertexShaderCode, GL_VERTEX_SHADER)
+        fragmentShader = compileShader(fragmentShaderCode, GL_FRAGMENT_SHADER)
+
+        if geometryShaderCode == None:
+            self.program = compileProgram(vertexShader, fragmentShader)
+        else:
+            geometryShader = compileShader(geometryShaderCode, GL_GEOMETRY_SHADER)
+
+            self.program = compileProgram(vertexShader, geometryShader, fragmentShader)
+
+        self._InitializeUniformLocations()
+
+        self._BindUniformBlock('Camera', Index.UNIFORM_BLOCK_BINDING_CAMERA)
+
+    def _BindUniformBlock(self, blockName, binding):
+        blockIndex = glGetUniformBlockIndex(self.program, blockName)
+
+        if blockIndex != GL_INVALID_INDEX:
+            glUniformBlockBinding(self.program, blockIndex, binding)
+
+    def _InitializeUniformLocations(self):
+        self.uniformLocations.clear()
+
+        numUniforms = glGetProgramiv(self.program, GL_ACTIVE_UNIFORMS)
+
+        for i in range(numUniforms):
+            name, size, uniformType = glGetActiveUniform(self.program, i)
+
+            if isinstance(name, bytes) == True:
+                name = name.decode()
+
+            # Arrays are reported as 'name[0]', callers use the bare name.
+            if name.endswith('[0]') == True:
+                name = name[ : -3]
+
+            self.uniformLocations[name] = glGetUniformLocation(self.program, name)
+
+class Font:
+    def __init__(self, fontPath, size):
+        self.face = ft.Face(fontPath)
+        self.face.set_char_size(size << 6)
+
+        self.charsSize = (6, 16)
+        self.charsAdvanceX = []
+
+        self.maxCharHeight = 0
+        self.charStartOffset = 32
+        self.listOffset = -1
+        self.texId = -1
+
+        numChars = self.charsSize[0] * self.charsSize[1]
+
+        self.charsAdvanceX = [0 for i in range(numChars)]
+
+        advanceX, ascender, descender = 0, 0, 0
         charEndIndex = self.charStartOffset + numChars
 
-        for c in range(self.charStartOffset, charEndIndex):
-            self.face.load_char(chr(c), ft.FT_LOAD_RENDER | ft.FT_LOAD_FORCE_AUTOHINT)
+        for c in range(self.charStartOffset, charEndIndex):
+            self.face.load_char(chr(c), ft.FT_LOAD_RENDER | ft.FT_LOAD_FORCE_AUTOHINT)
+
+            self.charsAdvanceX[c - self.charStartOffset] = self.face.glyph.advance.x >> 6
+
+            advanceX = max(advanceX, self.face.glyph.advance.x >> 6)
+            ascender = max(ascender, self.face.glyph.metrics.horiBearingY >> 6)
+            descender = max(descender, (self.face.glyph.metrics.height >> 6) - (self.face.glyph.metrics.horiBearingY >> 6))
+
+        self.maxCharHeight = ascender + descender
+        maxTotalAdvanceX = advanceX * self.charsSize[1]
+        maxTotalHeight = self.maxCharHeight * self.charsSize[0]
+
+        exponent = 0
+        bitmapDataSize = [0, 0]
+
+        while maxTotalAdvanceX > math.pow(2, exponent):
+            exponent += 1
+        bitmapDataSize[1] = int(math.pow(2, exponent))
+
+        exponent = 0
+
+        while maxTotalHeight > math.pow(2, exponent):
+            exponent += 1
+        bitmapDataSize[0] = int(math.pow(2, exponent))
+
+        self.bitmapData = np.zeros((bitmapDataSize[0], bitmapDataSize[1]), dtype = np.ubyte)
+
+        x, y, charIndex = 0, 0, 0
+
+        for r in range(self.charsSize[0]):
+            for c in range(self.charsSize[1]):
+                self.face.load_char(chr(self.charStartOffset + r * self.charsSize[1] + c), ft.FT_LOAD_RENDER | ft.FT_LOAD_FORCE_AUTOHINT)
+
+                charIndex = r * self.charsSize[1] + c
+
+                bitmap = self.face.glyph.bitmap
+                x += self.face.glyph.bitmap_left
+                y = r * self.maxCharHeight + ascender - self.face.glyph.bitmap_top
+
+                self.bitmapData[y : y + bitmap.rows, x : x + bitmap.width].flat = bitmap.buffer
+
+                x += self.charsAdvanceX[charIndex] - self.face.glyph.bitmap_left
+
+            x = 0
+
+    def GetTexId(self):
+        return self.texId
+
+    def GetListOffset(self):
+        return self.listOffset
+
+    def MakeFontTextureWithGenList(self):
+        self.texId = glGenTextures(1)
+
+        glBindTexture(GL_TEXTURE_2D, self.texId)
+        glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_BORDER)
+        glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_BORDER)
+
+        self.bitmapData = np.flipud(self.bitmapData)
+
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_ALPHA, self.bitmapData.shape[1], self.bitmapData.shape[0], 0,
+                     GL_ALPHA, GL_UNSIGNED_BYTE, self.bitmapData)
+
+        dx = 0.0
+        dy = self.maxCharHeight / float(self.bitmapData.shape[0])
+
+        listStartIndex = glGenLists(self.charsSize[0] * self.charsSize[1])
+        self.listOffset = listStartIndex - self.charStartOffset
+
+        for r in range(self.charsSize[0]):
+            for c in range(self.charsSize[1]):
+                glNewList(listStartIndex + r * self.charsSize[1] + c, GL_COMPILE)
+
+                charIndex = r * self.charsSize[1] + c
+
+                advanceX = self.charsAdvanceX[charIndex]
+                dAdvanceX = advanceX / float(self.bitmapData.shape[1])
+
+                glBegin(GL_QUADS)
+                glTexCoord2f(dx, 1.0 - r * dy), glVertex3f(0.0, 0.0, 0.0)
+                glTexCoord2f(dx + dAdvanceX, 1.0 - r * dy), glVertex3f(advanceX, 0.0, 0.0)
+                glTexCoord2f(dx + dAdvanceX, 1.0 - (r + 1) * dy), glVertex3f(advanceX, -self.maxCharHeight, 0.0)
+                glTexCoord2f(dx, 1.0 - (r + 1) * dy), glVertex3f(0.0, -self.maxCharHeight, 0.0)
+                glEnd()
+
+                glTranslate(advanceX, 0.0, 0.0)
+
+                glEndList()
+
+                dx += dAdvanceX
+
+            glTranslatef(0.0, -self.maxCharHeight, 0.0)
+            dx = 0.0
+
+class VertexFormat:
+    def __init__(self):
+        self.attributes = []
+        self.stride = 0
+
+    def GetStride(self):
+        return self.stride
+
+    def AddAttribute(self, location, numComponents, dataType, normalized = False):
+        dtype = self._GetDType(dataType)
+
+        self.attributes.append((location, numComponents, dataType, normalized, self.stride))
+
+        # Every attribute starts on a 4-byte boundary.
+        self.stride += (numComponents * dtype.itemsize + 3) & ~3
+
+        return self
+
+    def Pack(self, vertices, numVertexComponents):
+        vertices = np.asarray(vertices, dtype = np.float32).reshape(-1, numVertexComponents)
+
+        names = []
+        formats = []
+        offsets = []
+
+        for location, numComponents, dataType, normalized, offset in self.attributes:
+            names.append('Attribute' + str(location))
+            formats.append((self._GetDType(dataType), (numComponents, )))
+            offsets.append(offset)
+
+        packedVertices = np.zeros(len(vertices), dtype = np.dtype({'names' : names, 'formats' : formats, 'offsets' : offsets, 'itemsize' : self.stride}))
+
+        component = 0
+
+        for i in range(len(self.attributes)):
+            location, numComponents, dataType, normalized, offset = self.attributes[i]
+            values = vertices[:, component : component + numComponents]
+
+            if normalized == True:
+                dtypeInfo = np.iinfo(self._GetDType(dataType))
+                values = np.round(np.clip(values, -1.0 if dtypeInfo.min < 0 else 0.0, 1.0) * dtypeInfo.max)
+
+            packedVertices[names[i]] = values
+
+            component += numComponents
+
+        return packedVertices.view(np.uint8)
+
+    def PackIndices(self, indices, numVertices):
+        if numVertices <= 65536:
+            return np.asarray(indices, dtype = np.uint16), GL_UNSIGNED_SHORT
+
+        return np.asarray(indices, dtype = np.uint32), GL_UNSIGNED_INT
+
+    def Quantize(self, positions):
+        positions = np.asarray(positions, dtype = np.float32).reshape(-1, 3)
+
+        if len(positions) == 0:
+            return positions, glm.mat4()
+
+        minPosition = positions.min(axis = 0)
+        maxPosition = positions.max(axis = 0)
+
+        center = (minPosition + maxPosition) * 0.5
+        halfExtent = np.maximum((maxPosition - minPosition) * 0.5, 1e-8)
+
+        dequantizeMat = glm.translate(glm.vec3(*center.tolist())) * glm.scale(glm.vec3(*halfExtent.tolist()))
+
+        return (positions - center) / halfExtent, dequantizeMat
+
+    def Setup(self):
+        for location, numComponents, dataType, normalized, offset in self.attributes:
+            glEnableVertexAttribArray(location)
+            glVertexAttribPointer(location, numComponents, dataType, GL_TRUE if normalized == True else GL_FALSE, self.stride, ctypes.c_void_p(offset))
+
+    def _GetDType(self, dataType):
+        if dataType == GL_HALF_FLOAT:
+            return np.dtype(np.float16)
+        elif dataType == GL_SHORT:
+            return np.dtype(np.int16)
+        elif dataType == GL_UNSIGNED_SHORT:
+            return np.dtype(np.uint16)
+        elif dataType == GL_BYTE:
+            return np.dtype(np.int8)
+        elif dataType == GL_UNSIGNED_BYTE:
+            return np.dtype(np.uint8)
+
+        return np.dtype(np.float32)
+
+class BufferAllocator:
+    def __init__(self, memoryLimit = None, spillDir = None):
+        self.memoryLimit = memoryLimit
+        self.spillDir = spillDir
+
+        self.memoryUsed = 0
+        self.peakMemoryUsed = 0
+        self.spilledBytes = 0
+
+    def GetMemoryUsed(self):
+        return self.memoryUsed
+
+    def GetPeakMemoryUsed(self):
+        return self.peakMemoryUsed
+
+    def GetSpilledBytes(self):
+        return self.spilledBytes
+
+    def Allocate(self, numElements, dtype, zero = False):
+        dtype = np.dtype(dtype)
+        numBytes = numElements * dtype.itemsize
+
+        if self.memoryLimit == None or self.memoryUsed + numBytes <= self.memoryLimit:
+            self.memoryUsed += numBytes
+            self.peakMemoryUsed = max(self.peakMemoryUsed, self.memoryUsed)
+
+            if zero == True:
+                return np.zeros(numElements, dtype = dtype)
+            else:
+                return np.empty(numElements, dtype = dtype)
+
+        self.spilledBytes += numBytes
+
+        if numElements == 0:
+            return np.empty(0, dtype = dtype)
+
+        with tempfile.TemporaryFile(dir = self.spillDir) as spillFile:
+            return np.memmap(spillFile, dtype = dtype, mode = 'w+', shape = (numElements,))
+
+    def Release(self, array):
+        if isinstance(array, np.memmap) == False:
+            self.memoryUsed -= array.nbytes
+
+class GrowableArray:
+    def __init__(self, dtype, allocator, capacity = 1024):
+        self.allocator = allocator
+        self.buffer = self.allocator.Allocate(max(capacity, 1), dtype)
+        self.size = 0
+
+    def GetSize(self):
+        return self.size
+
+    def GetArray(self):
+        return self.buffer[0 : self.size]
+
+    def Append(self, values):
+        newSize = self.size + len(values)
+
+        if newSize > len(self.buffer):
+            self._Reserve(max(newSize, len(self.buffer) * 2))
+
+        self.buffer[self.size : newSize] = values
+        self.size = newSize
+
+    def _Reserve(self, capacity):
+        buffer = self.allocator.Allocate(capacity, self.buffer.dtype)
+        buffer[0 : self.size] = self.buffer[0 : self.size]
+
+        self.allocator.Release(self.buffer)
+        self.buffer = buffer
+
+class OBJParser:
+    def __init__(self):
+        self.numBytes = 0
+        self.parseTime = 0.0
+        self.throughput = 0.0
+
+    def GetNumBytes(self):
+        return self.numBytes
+
+    def GetParseTime(self):
+        return self.parseTime
+
+    def GetThroughput(self):
+        return self.throughput
+
+    def Parse(self, modelPath):
+        startTime = time.perf_counter()
+
+        with open(modelPath, mode = 'rb') as fin:
+            data = fin.read()
+
+        vertices, indices = self._ParseBuffer(np.frombuffer(data, dtype = np.uint8))
+
+        self.numBytes = len(data)
+        self.parseTime = time.perf_counter() - startTime
+
+        if self.parseTime > 0.0:
+            self.throughput = self.numBytes / (1024.0 * 1024.0) / self.parseTime
+
+        return vertices, indices
+
+    def ParseStream(self, modelPath, chunkSize, allocator):
+        startTime = time.perf_counter()
+
+        self.numBytes = 0
+
+        vertexBuffer = GrowableArray(np.float32, allocator, chunkSize // 8)
+        indexBuffer = GrowableArray(np.uint32, allocator, chunkSize // 8)
+
+        for vertices, indices in self._ParseChunks(self._ReadChunks(modelPath, chunkSize)):
+            vertexBuffer.Append(vertices)
+            indexBuffer.Append(indices)
+
+        self.parseTime = time.perf_counter() - startTime
+
+        if self.parseTime > 0.0:
+            self.throughput = self.numBytes / (1024.0 * 1024.0) / self.parseTime
+
+        return vertexBuffer.GetArray(), indexBuffer.GetArray()
+
+    def _ReadChunks(self, modelPath, chunkSize):
+        remainder = b''
+
+        with open(modelPath, mode = 'rb') as fin:
+            while True:
+                data = fin.read(chunkSize)
+
+                if len(data) == 0:
+                    break
+
+                self.numBytes += len(data)
+
+                data = remainder + data
+                lastNewLine = data.rfind(b'\n')
+
+                if lastNewLine < 0:
+                    remainder = data
+                    continue
+
+                remainder = data[lastNewLine + 1 : ]
+
+                yield data[ : lastNewLine + 1]
+
+        if len(remainder) > 0:
+            yield remainder
+
+    def _ParseChunks(self, chunks):
+        for chunk in chunks:
+            yield self._ParseBuffer(np.frombuffer(chunk, dtype = np.uint8))
+
+    def _ParseBuffer(self, buffer):
+        bufferSize = len(buffer)
+
+        if bufferSize == 0:
+            return np.zeros(0, dtype = np.float32), np.zeros(0, dtype = np.uint32)
+
+        newLines = np.flatnonzero(buffer == ord('\n'))
+
+        lineStarts = np.concatenate(([0], newLines + 1))
+        lineEnds = np.concatenate((newLines + 1, [bufferSize]))
+
+        validLines = lineStarts < bufferSize
+        lineStarts = lineStarts[validLines]
+        lineEnds = lineEnds[validLines]
+
+        firstChars = buffer[lineStarts]
+        secondChars = buffer[np.minimum(lineStarts + 1, bufferSize - 1)]
+
+        keywordLines = (lineEnds - lineStarts >= 2) & ((secondChars == ord(' ')) | (secondChars == ord('\t')))
+
+        vertexLines = keywordLines & (firstChars == ord('v'))
+        faceLines = keywordLines & (firstChars == ord('f'))
+
+        vertexText = self._SelectLines(buffer, lineStarts[vertexLines], lineEnds[vertexLines])
+        vertexText[vertexText == ord('v')] = ord(' ')
+
+        vertices = np.fromstring(vertexText.tobytes(), dtype = np.float64, sep = ' ')
+
+        numVertexLines = np.count_nonzero(vertexLines)
+
+        if numVertexLines > 0 and vertices.size > numVertexLines * 3 and vertices.size % numVertexLines == 0:
+            vertices = vertices.reshape(numVertexLines, -1)[:, 0 : 3].ravel()
+
+        faceText = self._SelectLines(buffer, lineStarts[faceLines], lineEnds[faceLines])
+        faceText[faceText == ord('f')] = ord(' ')
+
+        slashes = faceText == ord('/')
+
+        if slashes.any() == True:
+            slashCounts = np.cumsum(slashes, dtype = np.int32)
+            tokenStartSlashCounts = np.maximum.accumulate(np.where(faceText <= ord(' '), slashCounts, 0))
+
+            faceText = faceText[slashCounts == tokenStartSlashCounts]
+
+        indices = np.fromstring(faceText.tobytes(), dtype = np.int32, sep = ' ') - 1
+
+        return vertices.astype(np.float32), indices.astype(np.uint32)
+
+    def _SelectLines(self, buffer, lineStarts, lineEnds):
+        if len(lineStarts) == 0:
+            return np.zeros(0, dtype = np.uint8)
+
+        runBreaks = np.flatnonzero(lineStarts[1 : ] != lineEnds[ : -1]) + 1
+
+        runStarts = lineStarts[np.concatenate(([0], runBreaks))]
+        runEnds = lineEnds[np.concatenate((runBreaks - 1, [len(lineEnds) - 1]))]
+
+        return np.concatenate([buffer[runStarts[i] : runEnds[i]] for i in range(len(runStarts))])
+
+class MeshFile:
+    def __init__(self):
+        self.magic = b'FGMESH01'
+        self.alignment = 4096
+
+    def Write(self, filePath, arrays, attributes = None):
+        if attributes == None:
+            attributes = {}
+
+        sections = []
+
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            sections.append([name, array.dtype.str, list(array.shape), 0, array.nbytes])
+
+        sectionsOffset = self.alignment
+
+        while True:
+            offset = sectionsOffset
+
+            for section in sections:
+                section[3] = offset
+                offset = self._Align(offset + section[4])
+
+            headerData = json.dumps({'Attributes' : attributes, 'Sections' : sections}).encode()
+
+            if len(self.magic) + 4 + len(headerData) <= sectionsOffset:
+                break
+
+            sectionsOffset = self._Align(len(self.magic) + 4 + len(headerData))
+
+        with open(filePath, mode = 'wb') as fout:
+            fout.write(self.magic)
+            fout.write(np.uint32(len(headerData)).tobytes())
+            fout.write(headerData)
+
+            for section in sections:
+                fout.seek(section[3])
+                fout.write(np.ascontiguousarray(arrays[section[0]]).data)
+
+            fout.truncate(offset)
+
+    def Open(self, filePath):
+        with open(filePath, mode = 'rb') as fin:
+            magic = fin.read(len(self.magic))
+
+            if magic != self.magic:
+                raise ValueError('Invalid mesh file : ' + filePath)
+
+            headerSize = int(np.frombuffer(fin.read(4), dtype = np.uint32)[0])
+            header = json.loads(fin.read(headerSize).decode())
+
+        fileMap = np.memmap(filePath, dtype = np.uint8, mode = 'r')
+
+        arrays = {}
+
+        for name, dtype, shape, offset, nbytes in header['Sections']:
+            arrays[name] = fileMap[offset : offset + nbytes].view(np.dtype(dtype)).reshape(shape)
+
+        return arrays, header['Attributes']
+
+    def _Align(self, offset):
+        return (offset + self.alignment - 1) // self.alignment * self.alignment
+
+class ModelCache:
+    def __init__(self, cacheDir = None):
+        if cacheDir == None:
+            self.cacheDir = os.getcwd().replace('\\', '/') + '/ModelCache'
+        else:
+            self.cacheDir = cacheDir
+
+        self.enable = True
+        self.version = 11
+
+        self.meshFile = MeshFile()
+
+        self.numHits = 0
+        self.numMisses = 0
+        self.numWriteFailures = 0
+        self.savedTime = 0.0
+
+    def GetCacheDir(self):
+        return self.cacheDir
+
+    def SetCacheDir(self, cacheDir):
+        self.cacheDir = cacheDir
+
+    def GetEnable(self):
+        return self.enable
+
+    def SetEnable(self, enable):
+        self.enable = enable
+
+    def GetNumHits(self):
+        return self.numHits
+
+    def GetNumMisses(self):
+        return self.numMisses
+
+    def GetNumWriteFailures(self):
+        return self.numWriteFailures
+
+    def GetSavedTime(self):
+        return self.savedTime
+
+    def GetCachePath(self, key):
+        return self._GetCachePath(key)
+
+    def AddStats(self, numHits, numMisses, numWriteFailures, savedTime):
+        self.numHits += numHits
+        self.numMisses += numMisses
+        self.numWriteFailures += numWriteFailures
+        self.savedTime += savedTime
+
+    def MakeKey(self, modelPath, normalLineScale, meshOptions):
+        modelStat = os.stat(modelPath)
+
+        contentHash = hashlib.sha1()
+
+        with open(modelPath, mode = 'rb') as fin:
+            for chunk in iter(lambda: fin.read(1 << 20), b''):
+                contentHash.update(chunk)
+
+        keyText = '{0}|{1}|{2}|{3}|{4}|{5}|{6}'.format(os.path.abspath(modelPath), modelStat.st_size, modelStat.st_mtime_ns, contentHash.hexdigest(), repr(normalLineScale), repr(meshOptions), self.version)
+
+        return hashlib.sha1(keyText.encode()).hexdigest()
+
+    def Load(self, key):
+        if self.enable == False:
+            return None, None
+
+        startTime = time.perf_counter()
+
+        cachePath = self._GetCachePath(key)
+
+        if os.path.exists(cachePath) == False:
+            self.numMisses += 1
+            return None, None
+
+        try:
+            meshData, attributes = self.meshFile.Open(cachePath)
+        except (OSError, ValueError, KeyError):
+            self.numMisses += 1
+            return None, None
+
+        self.numHits += 1
+        self.savedTime += max(attributes['BuildTime'] - (time.perf_counter() - startTime), 0.0)
+
+        return meshData, attributes
+
+    def Save(self, key, meshData, meshAttributes, buildTime):
+        if self.enable == False:
+            return None
+
+        cachePath = self._GetCachePath(key)
+        tempPath = None
+
+        attributes = {'BuildTime' : buildTime}
+        attributes.update(meshAttributes)
+
+        # A cache that cannot be written only costs the next load its speedup, the caller keeps the arrays it built.
+        try:
+            os.makedirs(self.cacheDir, exist_ok = True)
+
+            # Every writer gets its own temp file, so viewers cold loading the same mesh never truncate each other's.
+            tempHandle, tempPath = tempfile.mkstemp(suffix = '.tmp', dir = self.cacheDir)
+            os.close(tempHandle)
+
+            self.meshFile.Write(tempPath, meshData, attributes)
+
+            try:
+                os.replace(tempPath, cachePath)
+            except OSError:
+                # Another viewer already wrote this key and may have it mapped (Windows refuses the replace then), its file is used instead.
+                self._RemoveFile(tempPath)
+
+            return self.meshFile.Open(cachePath)[0]
+        except OSError:
+            self.numWriteFailures += 1
+
+            if tempPath != None:
+                self._RemoveFile(tempPath)
+
+            return None
+
+    def _GetCachePath(self, key):
+        return self.cacheDir + '/' + key + '.mesh'
+
+    def _RemoveFile(self, filePath):
+        try:
+            os.remove(filePath)
+        except OSError:
+            pass
+
+class MeshOptimizer:
+    def __init__(self, cacheSize = 16, allocator = None, numChunkFaces = 1 << 16):
+        self.cacheSize = cacheSize
+        self.numChunkFaces = numChunkFaces
+
+        if allocator == None:
+            allocator = BufferAllocator()
+
+        self.allocator = allocator
+
+        self.optimizeTime = 0.0
+
+    def GetCacheSize(self):
+        return self.cacheSize
+
+    def GetOptimizeTime(self):
+        return self.optimizeTime
+
+    def Optimize(self, indices, numVertices, positions = None):
+        startTime = time.perf_counter()
+
+        faces = indices.reshape(-1, 3)
+
+        optimizedIndices = self.allocator.Allocate(len(indices), indices.dtype)
+        optimizedFaces = optimizedIndices.reshape(-1, 3)
+
+        # Chunks taken along a Morton curve are compact patches, so Tipsify loses little at the seams.
+        faceOrder = None
+
+        if positions is not None:
+            faceOrder = self._SortFacesSpatially(faces, positions)
+
+        # Faces are reordered one chunk at a time, so the Python side of Tipsify never grows past numChunkFaces.
+        for chunkStart in range(0, len(faces), self.numChunkFaces):
+            if faceOrder is not None:
+                chunkFaces = faces[faceOrder[chunkStart : chunkStart + self.numChunkFaces]]
+            else:
+                chunkFaces = faces[chunkStart : chunkStart + self.numChunkFaces]
+
+            optimizedFaces[chunkStart : chunkStart + len(chunkFaces)] = chunkFaces[self._ReorderFaces(chunkFaces)]
+
+        vertexOrder = self._ReorderVertices(optimizedIndices, numVertices)
+
+        self.optimizeTime = time.perf_counter() - startTime
+
+        return optimizedIndices, vertexOrder
+
+    def ComputeCacheStats(self, indices, numVertices):
+        numFaces = int(len(indices) / 3)
+
+        if numFaces == 0 or numVertices == 0:
+            return 0.0, 0.0
+
+        # A vertex is still in the FIFO cache if fewer than cacheSize misses happened since it was loaded.
+        numMisses = 0
+        missStamps = [-self.cacheSize] * numVertices
+
+        for index in indices.tolist():
+            if numMisses - missStamps[index] >= self.cacheSize:
+                missStamps[index] = numMisses
+                numMisses += 1
+
+        return numMisses / numFaces, numMisses / numVertices
+
+    def _SortFacesSpatially(self, faces, positions):
+        positions = positions.reshape(-1, 3)
+
+        if len(faces) == 0:
+            return np.empty(0, dtype = np.int64)
+
+        minPosition = positions.min(axis = 0)
+        cellScale = 1023.0 / max(float(np.max(positions.max(axis = 0) - minPosition)), 1e-8)
+
+        faceKeys = self.allocator.Allocate(len(faces), np.uint64)
+
+        for chunkStart in range(0, len(faces), self.numChunkFaces):
+            chunkFaces = faces[chunkStart : chunkStart + self.numChunkFaces]
+
+            centroids = (positions[chunkFaces[:, 0]] + positions[chunkFaces[:, 1]] + positions[chunkFaces[:, 2]]) / 3.0
+            cells = np.clip((centroids - minPosition) * cellScale, 0.0, 1023.0).astype(np.uint64)
+
+            faceKeys[chunkStart : chunkStart + len(chunkFaces)] = self._SpreadBits(cells[:, 0]) | (self._SpreadBits(cells[:, 1]) << np.uint64(1)) | (self._SpreadBits(cells[:, 2]) << np.uint64(2))
+
+        faceOrder = np.argsort(faceKeys, kind = 'stable')
+
+        self.allocator.Release(faceKeys)
+
+        return faceOrder
+
+    def _SpreadBits(self, values):
+        # Inserts two zero bits between each of the low 10 bits.
+        values = (values | (values << np.uint64(16))) & np.uint64(0x030000FF)
+        values = (values | (values << np.uint64(8))) & np.uint64(0x0300F00F)
+        values = (values | (values << np.uint64(4))) & np.uint64(0x030C30C3)
+        values = (values | (values << np.uint64(2))) & np.uint64(0x09249249)
+
+        return values
+
+    def _ReorderFaces(self, chunkFaces):
+        # Tipsify, Sander et al. 2007
+        numFaces = len(chunkFaces)
+
+        if numFaces == 0:
+            return np.empty(0, dtype = np.int64)
+
+        chunkVertices, indices = np.unique(chunkFaces, return_inverse = True)
+
+        indices = indices.reshape(-1)
+        numVertices = len(chunkVertices)
+
+        vertexFaces = (np.argsort(indices, kind = 'stable') // 3).tolist()
+        liveCounts = np.bincount(indices, minlength = numVertices)
+
+        vertexFaceOffsets = np.zeros(numVertices + 1, dtype = np.int64)
+        vertexFaceOffsets[1 : ] = np.cumsum(liveCounts)
+
+        vertexFaceOffsets = vertexFaceOffsets.tolist()
+        liveCounts = liveCounts.tolist()
+
+        faceIndices = indices.tolist()
+
+        cacheSize = self.cacheSize
+        cacheTimeStamps = [0] * numVertices
+        timeStamp = cacheSize + 1
+
+        emittedFaces = bytearray(numFaces)
+        faceOrder = []
+
+        deadEndStack = []
+        cursor = 0
+
+        fanningVertex = faceIndices[0]
+
+        while fanningVertex >= 0:
+            candidates = []
+
+            for face in vertexFaces[vertexFaceOffsets[fanningVertex] : vertexFaceOffsets[fanningVertex + 1]]:
+                if emittedFaces[face] == 1:
+                    continue
+
+                emittedFaces[face] = 1
+                faceOrder.append(face)
+
+                for vertex in faceIndices[face * 3 : face * 3 + 3]:
+                    deadEndStack.append(vertex)
+                    candidates.append(vertex)
+
+                    liveCounts[vertex] -= 1
+
+                    if timeStamp - cacheTimeStamps[vertex] > cacheSize:
+                        cacheTimeStamps[vertex] = timeStamp
+                        timeStamp += 1
+
+            fanningVertex = -1
+            bestPriority = -1
+
+            for vertex in candidates:
+                if liveCounts[vertex] > 0 and timeStamp - cacheTimeStamps[vertex] + 2 * liveCounts[vertex] <= cacheSize:
+                    priority = timeStamp - cacheTimeStamps[vertex]
+
+                    if priority > bestPriority:
+                        bestPriority = priority
+                        fanningVertex = vertex
+
+            if fanningVertex >= 0:
+                continue
+
+            while len(deadEndStack) > 0:
+                vertex = deadEndStack.pop()
+
+                if liveCounts[vertex] > 0:
+                    fanningVertex = vertex
+                    break
+
+            if fanningVertex >= 0:
+                continue
+
+            while cursor < numVertices:
+                if liveCounts[cursor] > 0:
+                    fanningVertex = cursor
+                    break
+
+                cursor += 1
+
+        return np.array(faceOrder, dtype = np.int64)
+
+    def _ReorderVertices(self, indices, numVertices):
+        unassigned = np.iinfo(np.uint32).max
+
+        vertexRemap = self.allocator.Allocate(numVertices, np.uint32)
+        vertexRemap[:] = unassigned
+
+        vertexOrder = self.allocator.Allocate(numVertices, np.uint32)
+        numOrderedVertices = 0
+
+        numChunkIndices = self.numChunkFaces * 3
+
+        # Vertices are numbered by first use, chunk by chunk, and the indices are remapped in place.
+        for chunkStart in range(0, len(indices), numChunkIndices):
+            chunkIndices = indices[chunkStart : chunkStart + numChunkIndices]
+
+            newVertices, firstUses = np.unique(chunkIndices[vertexRemap[chunkIndices] == unassigned], return_index = True)
+            newVertices = newVertices[np.argsort(firstUses, kind = 'stable')]
+
+            vertexRemap[newVertices] = np.arange(numOrderedVertices, numOrderedVertices + len(newVertices), dtype = np.uint32)
+            vertexOrder[numOrderedVertices : numOrderedVertices + len(newVertices)] = newVertices
+
+            numOrderedVertices += len(newVertices)
+
+            indices[chunkStart : chunkStart + numChunkIndices] = vertexRemap[chunkIndices]
+
+        self.allocator.Release(vertexRemap)
+
+        return vertexOrder[0 : numOrderedVertices]
+
+class MeshSimplifier:
+    def __init__(self, reduction = 0.25, minFaces = 256, allocator = None, numChunkFaces = 1 << 18):
+        self.reduction = reduction
+        self.minFaces = minFaces
+        self.numChunkFaces = numChunkFaces
+
+        if allocator == None:
+            allocator = BufferAllocator()
+
+        self.allocator = allocator
+
+        self.simplifyTime = 0.0
+
+    def GetSimplifyTime(self):
+        return self.simplifyTime
+
+    def BuildLODs(self, vertices, indices, numLODs):
+        startTime = time.perf_counter()
+
+        lods = []
+
+        positions = vertices.reshape(-1, 3)
+        faces = indices.reshape(-1, 3)
+
+        if len(faces) == 0:
+            return lods
+
+        # Quadrics are built around the mesh center, so float32 keeps enough precision for the plane offsets.
+        minPosition = positions.min(axis = 0).astype(np.float64)
+        maxPosition = positions.max(axis = 0).astype(np.float64)
+        origin = ((minPosition + maxPosition) * 0.5).astype(np.float32)
+
+        vertexQuadrics = self._ComputeVertexQuadrics(positions, faces, origin)
+
+        extent = max(float(np.max(maxPosition - minPosition)), 1e-8)
+
+        numTargetFaces = len(faces)
+        numPrevFaces = len(faces)
+
+        for level in range(numLODs):
+            numTargetFaces = int(numTargetFaces * self.reduction)
+
+            if numTargetFaces < self.minFaces:
+                break
+
+            # Cells are sized so that the surface crosses about numTargetFaces / 2 of them, then refined from the actual result.
+            cellSize = extent / math.sqrt(numTargetFaces / 2.0)
+            bestLOD = None
+
+            for i in range(3):
+                lodVertices, lodIndices = self._Simplify(positions, faces, vertexQuadrics, origin, minPosition, cellSize)
+                numLODFaces = int(len(lodIndices) / 3)
+
+                if bestLOD == None or abs(numLODFaces - numTargetFaces) < abs(int(len(bestLOD[1]) / 3) - numTargetFaces):
+                    bestLOD = (lodVertices, lodIndices, cellSize)
+
+                if numLODFaces == 0 or abs(numLODFaces - numTargetFaces) < numTargetFaces * 0.1:
+                    break
+
+                cellSize *= math.sqrt(numLODFaces / numTargetFaces)
+
+            numLODFaces = int(len(bestLOD[1]) / 3)
+
+            if numLODFaces == 0 or numLODFaces > numPrevFaces * 0.75:
+                break
+
+            lods.append(bestLOD)
+
+            numPrevFaces = numLODFaces
+
+        self.allocator.Release(vertexQuadrics)
+
+        self.simplifyTime = time.perf_counter() - startTime
+
+        return lods
+
+    def _ComputeVertexQuadrics(self, positions, faces, origin):
+        numVertices = len(positions)
+
+        # Face quadrics are summed onto their corners chunk by chunk, so only one value per vertex is kept instead of one per face.
+        vertexQuadrics = self.allocator.Allocate(numVertices * 10, np.float32, zero = True).reshape(-1, 10)
+
+        for chunkStart in range(0, len(faces), self.numChunkFaces):
+            chunkFaces = faces[chunkStart : chunkStart + self.numChunkFaces]
+
+            vecA = positions[chunkFaces[:, 0]]
+
+            faceNormals = np.cross(positions[chunkFaces[:, 1]] - vecA, positions[chunkFaces[:, 2]] - vecA)
+            doubleAreas = np.linalg.norm(faceNormals, axis = 1)
+
+            faceNormals = np.divide(faceNormals, doubleAreas[:, np.newaxis], out = np.zeros_like(faceNormals), where = doubleAreas[:, np.newaxis] > 0.0)
+            planeOffsets = -np.einsum('ij,ij->i', faceNormals, vecA - origin)
+
+            nx = faceNormals[:, 0]
+            ny = faceNormals[:, 1]
+            nz = faceNormals[:, 2]
+
+            faceAreas = doubleAreas * 0.5
+            cornerIndices = chunkFaces.reshape(-1)
+
+            # Upper triangle of the area-weighted plane quadric (A, b, c) with Q(v) = v.A.v + 2 b.v + c.
+            for k, faceQuadrics in enumerate((nx * nx, nx * ny, nx * nz, ny * ny, ny * nz, nz * nz, nx * planeOffsets, ny * planeOffsets, nz * planeOffsets, planeOffsets * planeOffsets)):
+                cornerQuadrics = np.repeat(faceQuadrics * faceAreas, 3)
+
+                vertexQuadrics[:, k] += np.bincount(cornerIndices, weights = cornerQuadrics, minlength = numVertices).astype(np.float32)
+
+        return vertexQuadrics
+
+    def _Simplify(self, positions, faces, vertexQuadrics, origin, minPosition, cellSize):
+        cellKeys = self.allocator.Allocate(len(positions), np.int64)
+
+        gridSize = np.floor((positions.max(axis = 0) - minPosition) / cellSize).astype(np.int64) + 1
+
+        for chunkStart in range(0, len(positions), self.numChunkFaces):
+            cells = np.floor((positions[chunkStart : chunkStart + self.numChunkFaces] - minPosition) / cellSize).astype(np.int64)
+            cellKeys[chunkStart : chunkStart + len(cells)] = (cells[:, 0] * gridSize[1] + cells[:, 1]) * gridSize[2] + cells[:, 2]
+
+        uniqueCellKeys, firstVertices, clusters = np.unique(cellKeys, return_index = True, return_inverse = True)
+
+        self.allocator.Release(cellKeys)
+
+        numClusters = len(uniqueCellKeys)
+        clusters = clusters.reshape(-1).astype(np.uint32)
+
+        clusterQuadrics = self.allocator.Allocate(numClusters * 10, np.float64).reshape(-1, 10)
+        clusterMeans = self.allocator.Allocate(numClusters * 3, np.float64).reshape(-1, 3)
+
+        for k in range(10):
+            clusterQuadrics[:, k] = np.bincount(clusters, weights = vertexQuadrics[:, k], minlength = numClusters)
+
+        clusterSizes = np.bincount(clusters, minlength = numClusters)
+
+        for axis in range(3):
+            clusterMeans[:, axis] = np.bincount(clusters, weights = positions[:, axis] - origin[axis], minlength = numClusters) / clusterSizes
+
+        clusterPositions = self.allocator.Allocate(numClusters * 3, np.float32).reshape(-1, 3)
+
+        for chunkStart in range(0, numClusters, self.numChunkFaces):
+            chunkQuadrics = clusterQuadrics[chunkStart : chunkStart + self.numChunkFaces]
+
+            quadricMats = chunkQuadrics[:, [0, 1, 2, 1, 3, 4, 2, 4, 5]].reshape(-1, 3, 3)
+            quadricVecs = chunkQuadrics[:, 6 : 9]
+
+            # Regularizing toward the cluster mean keeps flat and degenerate clusters solvable.
+            regularizers = (np.trace(quadricMats, axis1 = 1, axis2 = 2) * 1e-3 + 1e-12)[:, np.newaxis]
+
+            chunkPositions = np.linalg.solve(quadricMats + regularizers[:, :, np.newaxis] * np.eye(3), (regularizers * clusterMeans[chunkStart : chunkStart + len(chunkQuadrics)] - quadricVecs)[:, :, np.newaxis])[:, :, 0] + origin
+
+            cellMins = minPosition + np.floor((positions[firstVertices[chunkStart : chunkStart + len(chunkQuadrics)]] - minPosition) / cellSize) * cellSize
+            clusterPositions[chunkStart : chunkStart + len(chunkQuadrics)] = np.clip(chunkPositions, cellMins, cellMins + cellSize)
 
-            self.charsAdvanceX[c - self.charStartOffset] = self.face.glyph.advance.x >> 6
+        self.allocator.Release(clusterQuadrics)
+        self.allocator.Release(clusterMeans)
 
-            advanceX = max(advanceX, self.face.glyph.advance.x >> 6)
-            ascender = max(ascender, self.face.glyph.metrics.horiBearingY >> 6)
-            descender = max(descender, (self.face.glyph.metrics.height >> 6) - (self.face.glyph.metrics.horiBearingY >> 6))
+        # Only faces that survive the collapse are kept, so the per-face cluster lookup never covers more than one chunk.
+        lodFaces = []
 
-        self.maxCharHeight = ascender + descender
-        maxTotalAdvanceX = advanceX * self.charsSize[1]
-        maxTotalHeight = self.maxCharHeight * self.charsSize[0]
+        for chunkStart in range(0, len(faces), self.numChunkFaces):
+            faceClusters = clusters[faces[chunkStart : chunkStart + self.numChunkFaces]]
 
-        exponent = 0
-        bitmapDataSize = [0, 0]
+            validFaces = (faceClusters[:, 0] != faceClusters[:, 1]) & (faceClusters[:, 1] != faceClusters[:, 2]) & (faceClusters[:, 2] != faceClusters[:, 0])
 
-        while maxTotalAdvanceX > math.pow(2, exponent):
-            exponent += 1
-        bitmapDataSize[1] = int(math.pow(2, exponent))
+            lodFaces.append(faceClusters[validFaces])
 
-        exponent = 0
+        faceClusters = np.concatenate(lodFaces)
 
-        while maxTotalHeight > math.pow(2, exponent):
-            exponent += 1
-        bitmapDataSize[0] = int(math.pow(2, exponent))
+        _, uniqueFaces = np.unique(np.sort(faceClusters, axis = 1), axis = 0, return_index = True)
+        faceClusters = faceClusters[np.sort(uniqueFaces)]
 
-        self.bitmapData = np.zeros((bitmapDataSize[0], bitmapDataSize[1]), dtype = np.ubyte)
+        usedClusters, lodIndices = np.unique(faceClusters, return_inverse = True)
 
-        x, y, charIndex = 0, 0, 0
+        lodVertices = clusterPositions[usedClusters].reshape(-1)
+        lodIndices = lodIndices.astype(np.uint32).reshape(-1)
 
-        for r in range(self.charsSize[0]):
-            for c in range(self.charsSize[1]):
-                self.face.load_char(chr(self.charStartOffset + r * self.charsSize[1] + c), ft.FT_LOAD_RENDER | ft.FT_LOAD_FORCE_AUTOHINT)
+        self.allocator.Release(clusterPositions)
 
-                charIndex = r * self.charsSize[1] + c
+        return lodVertices, lodIndices
 
-                bitmap = self.face.glyph.bitmap
-                x += self.face.glyph.bitmap_left
-                y = r * self.maxCharHeight + ascender - self.face.glyph.bitmap_top
+class Model:
+    def __init__(self, modelPath, normalLineScale, meshData = None, meshAttributes = None):
+        self.vertices = []
+        self.indices = []
 
-                self.bitmapData[y : y + bitmap.rows, x : x + bitmap.width].flat = bitmap.buffer
+        self.normals = []
+        self.normalLineVertices = []
+        self.normalLineIndices = []
 
-                x += self.charsAdvanceX[charIndex] - self.face.glyph.bitmap_left
+        self.normalLineScale = normalLineScale
 
-            x = 0
+        self.numVertices = 0
+        self.numFaces = 0
 
-    def GetTexId(self):
-        return self.texId
+        self.parseTime = 0.0
+        self.parseThroughput = 0.0
+        self.normalTime = 0.0
 
-    def GetListOffset(self):
-        return self.listOffset
+        # ACMR and ATVR before and after optimization, zero when optimizeMesh is off.
+        self.vertexCacheStats = np.zeros(4, dtype = np.float32)
 
-    def MakeFontTextureWithGenList(self):
-        self.texId = glGenTextures(1)
+        self.boundingBox = np.zeros(6, dtype = np.float32)
+        self.boundingSphere = np.zeros(4, dtype = np.float32)
 
-        glBindTexture(GL_TEXTURE_2D, self.texId)
-        glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_BORDER)
-        glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_BORDER)
+        self.lodVertices = np.zeros(0, dtype = np.float32)
+        self.lodIndices = np.zeros(0, dtype = np.uint32)
+        self.lodInfo = np.zeros((0, 2), dtype = np.int64)
+        self.lodErrors = np.zeros(0, dtype = np.float32)
+        self.lodOffsets = []
 
-        self.bitmapData = np.flipud(self.bitmapData)
+        self.gpuVertices = np.zeros(0, dtype = np.uint8)
+        self.gpuIndices = np.zeros(0, dtype = np.uint32)
+        self.gpuDequantizeMat = np.identity(4, dtype = np.float32)
 
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_ALPHA, self.bitmapData.shape[1], self.bitmapData.shape[0], 0,
-                     GL_ALPHA, GL_UNSIGNED_BYTE, self.bitmapData)
+        self.triangleBVH = BoundingVolumeHierarchy(4)
 
-        dx = 0.0
-        dy = self.maxCharHeight / float(self.bitmapData.shape[0])
+        self.cacheHit = False
+        self.cacheKey = None
 
-        listStartIndex = glGenLists(self.charsSize[0] * self.charsSize[1])
-        self.listOffset = listStartIndex - self.charStartOffset
+        if meshData == None:
+            self._Initialize(modelPath)
+        else:
+            self._InitializeFromMeshData(meshData, meshAttributes)
 
-        for r in range(self.charsSize[0]):
-            for c in range(self.charsSize[1]):
-                glNewList(listStartIndex + r * self.charsSize[1] + c, GL_COMPILE)
+    def GetVertices(self):
+        return self.vertices
 
-                charIndex = r * self.charsSize[1] + c
+    def GetIndices(self):
+        return self.indices
 
-                advanceX = self.charsAdvanceX[charIndex]
-                dAdvanceX = advanceX / float(self.bitmapData.shape[1])
+    def GetNormalLineVertices(self):
+        return self.normalLineVertices
 
-                glBegin(GL_QUADS)
-                glTexCoord2f(dx, 1.0 - r * dy), glVertex3f(0.0, 0.0, 0.0)
-                glTexCoord2f(dx + dAdvanceX, 1.0 - r * dy), glVertex3f(advanceX, 0.0, 0.0)
-                glTexCoord2f(dx + dAdvanceX, 1.0 - (r + 1) * dy), glVertex3f(advanceX, -self.maxCharHeight, 0.0)
-                glTexCoord2f(dx, 1.0 - (r + 1) * dy), glVertex3f(0.0, -self.maxCharHeight, 0.0)
-                glEnd()
+    def GetNormalLineIndices(self):
+        return self.normalLineIndices
 
-                glTranslate(advanceX, 0.0, 0.0)
+    def GetNumVertices(self):
+        return self.numVertices
+
+    def GetNumFaces(self):
+        return self.numFaces
+
+    def GetParseTime(self):
+        return self.parseTime
+
+    def GetParseThroughput(self):
+        return self.parseThroughput
+
+    def GetNormalTime(self):
+        return self.normalTime
+
+    def GetVertexCacheStats(self):
+        return self.vertexCacheStats
+
+    def GetBoundingBox(self):
+        return self.boundingBox
+
+    def GetBoundingSphere(self):
+        return self.boundingSphere
+
+    def GetNumLODs(self):
+        return len(self.lodInfo)
+
+    def GetTriangleBVH(self):
+        return self.triangleBVH
+
+    def IntersectRay(self, origin, direction):
+        faces, entryDistances = self.triangleBVH.QueryRay(origin, direction)
+
+        if len(faces) == 0:
+            return np.inf, -1
+
+        positions = self.vertices.reshape(-1, 3)
+        faceIndices = self.indices.reshape(-1, 3)[faces]
+
+        vecA = positions[faceIndices[:, 0]].astype(np.float64)
+
+        vecAB = positions[faceIndices[:, 1]] - vecA
+        vecAC = positions[faceIndices[:, 2]] - vecA
+
+        # Moller-Trumbore
+        vecP = np.cross(direction, vecAC)
+        determinants = np.einsum('ij,ij->i', vecAB, vecP)
+
+        validFaces = np.abs(determinants) > 1e-12
+        invDeterminants = 1.0 / np.where(validFaces, determinants, 1.0)
+
+        vecT = origin - vecA
+        u = np.einsum('ij,ij->i', vecT, vecP) * invDeterminants
+
+        vecQ = np.cross(vecT, vecAB)
+        v = (vecQ @ direction) * invDeterminants
+
+        distances = np.einsum('ij,ij->i', vecAC, vecQ) * invDeterminants
+
+        hits = validFaces & (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0) & (distances > 0.0)
+
+        if np.any(hits) == False:
+            return np.inf, -1
+
+        distances = np.where(hits, distances, np.inf)
+        nearestHit = int(np.argmin(distances))
+
+        return float(distances[nearestHit]), int(faces[nearestHit])
+
+    def GetLOD(self, level):
+        vertexOffset, indexOffset = self.lodOffsets[level]
+        numVertices, numIndices = self.lodInfo[level]
+
+        return self.lodVertices[vertexOffset : vertexOffset + numVertices * 3], self.lodIndices[indexOffset : indexOffset + numIndices], float(self.lodErrors[level])
+
+    def GetGPUVertices(self):
+        return self.gpuVertices
+
+    def GetGPUIndices(self):
+        return self.gpuIndices
+
+    # Column-major like TransformTable.modelMats.
+    def GetDequantizeMat(self):
+        return np.ascontiguousarray(self.gpuDequantizeMat.T)
+
+    def GetCacheHit(self):
+        return self.cacheHit
+
+    def GetCacheKey(self):
+        return self.cacheKey
+
+    def GetMeshData(self):
+        return self._MakeMeshData()
+
+    def GetMeshAttributes(self):
+        return self._MakeMeshAttributes()
+
+    def SetLoadInfo(self, parseTime, parseThroughput, normalTime, cacheHit):
+        self.parseTime = parseTime
+        self.parseThroughput = parseThroughput
+        self.normalTime = normalTime
+        self.cacheHit = cacheHit
+
+    def _Initialize(self, modelPath):
+        startTime = time.perf_counter()
+
+        cacheKey = None
+
+        if gModelCache.GetEnable() == True:
+            cacheKey = gModelCache.MakeKey(modelPath, self.normalLineScale, gModelLoader.GetMeshOptions())
+            self.cacheKey = cacheKey
+
+            meshData, meshAttributes = gModelCache.Load(cacheKey)
+
+            if meshData != None:
+                self._InitializeFromMeshData(meshData, meshAttributes)
+                self.cacheHit = True
+                return
+
+        parser = OBJParser()
+
+        if gModelLoader.GetStreaming() == True or os.path.getsize(modelPath) > gModelLoader.GetChunkSize():
+            allocator = BufferAllocator(gModelLoader.GetMemoryLimit())
+
+            self.vertices, self.indices = parser.ParseStream(modelPath, gModelLoader.GetChunkSize(), allocator)
+        else:
+            allocator = BufferAllocator()
+
+            self.vertices, self.indices = parser.Parse(modelPath)
+
+        self.parseTime = parser.GetParseTime()
+        self.parseThroughput = parser.GetThroughput()
+
+        self._CompactVertices(allocator, max(gModelLoader.GetChunkSize() // 12, 1))
+
+        self.numVertices = int(len(self.vertices) / 3)
+        self.numFaces = int(len(self.indices) / 3)
+
+        if gModelLoader.GetOptimizeMesh() == True:
+            self._OptimizeVertexCache(allocator, max(gModelLoader.GetChunkSize() // 12, 1))
+
+        self._ComputeBounds()
+
+        self._BuildLODs(gModelLoader.GetNumLODs(), gModelLoader.GetOptimizeMesh(), allocator, max(gModelLoader.GetChunkSize() // 36, 1))
+
+        self._BuildTriangleBVH()
+
+        self.normals = allocator.Allocate(len(self.vertices), np.float32, zero = True)
+
+        normalStartTime = time.perf_counter()
+
+        self._ComputeNormals(gModelLoader.GetNormalWeighting(), max(gModelLoader.GetChunkSize() // 36, 1))
+
+        self.normalTime = time.perf_counter() - normalStartTime
+
+        # The normal line tips are placed after the vertices in the same buffer, so line i runs from vertex i to vertex numVertices + i.
+        self.normalLineVertices = allocator.Allocate(len(self.vertices), np.float32)
+        self.normalLineVertices[:] = self.vertices + self.normals * self.normalLineScale
+
+        self.normalLineIndices = np.empty((self.numVertices, 2), dtype = np.uint32)
+        self.normalLineIndices[:, 0] = np.arange(self.numVertices, dtype = np.uint32)
+        self.normalLineIndices[:, 1] = self.normalLineIndices[:, 0] + self.numVertices
+        self.normalLineIndices = self.normalLineIndices.reshape(-1)
+
+        self._PackGPUBuffers(gModelLoader.MakeVertexFormat(), gModelLoader.GetPositionFormat())
+
+        if cacheKey != None:
+            meshData = gModelCache.Save(cacheKey, self._MakeMeshData(), self._MakeMeshAttributes(), time.perf_counter() - startTime)
+
+            if meshData != None:
+                self._InitializeFromMeshData(meshData, self._MakeMeshAttributes())
+
+    def _CompactVertices(self, allocator, numChunkVertices):
+        useVertices = np.zeros(int(len(self.vertices) / 3), dtype = np.bool_)
+        useVertices[self.indices] = True
+
+        usedVertexIndices = np.flatnonzero(useVertices)
+
+        if len(usedVertexIndices) == len(useVertices):
+            return
+
+        vertexRemap = np.cumsum(useVertices, dtype = np.uint32) - 1
+
+        self.indices[:] = vertexRemap[self.indices]
+
+        vertices = self.vertices.reshape(-1, 3)
+
+        self.vertices = allocator.Allocate(len(usedVertexIndices) * 3, np.float32)
+
+        compactVertices = self.vertices.reshape(-1, 3)
+
+        for chunkStart in range(0, len(usedVertexIndices), numChunkVertices):
+            chunkIndices = usedVertexIndices[chunkStart : chunkStart + numChunkVertices]
+            compactVertices[chunkStart : chunkStart + len(chunkIndices)] = vertices[chunkIndices]
+
+    def _ComputeBounds(self):
+        positions = self.vertices.reshape(-1, 3)
+
+        if len(positions) == 0:
+            return
+
+        self.boundingBox[0 : 3] = positions.min(axis = 0)
+        self.boundingBox[3 : 6] = positions.max(axis = 0)
+
+        center = (self.boundingBox[0 : 3] + self.boundingBox[3 : 6]) * 0.5
+
+        self.boundingSphere[0 : 3] = center
+        self.boundingSphere[3] = np.sqrt(np.max(np.sum((positions - center) ** 2, axis = 1)))
+
+    def _BuildLODs(self, numLODs, optimizeMesh, allocator, numChunkFaces):
+        simplifier = MeshSimplifier(allocator = allocator, numChunkFaces = numChunkFaces)
+        optimizer = MeshOptimizer(allocator = allocator)
+
+        lods = simplifier.BuildLODs(self.vertices, self.indices, numLODs)
+
+        lodVerticesList = []
+        lodIndicesList = []
+
+        for lodVertices, lodIndices, lodError in lods:
+            if optimizeMesh == True:
+                lodIndices, vertexOrder = optimizer.Optimize(lodIndices, int(len(lodVertices) / 3), lodVertices)
+                lodVertices = lodVertices.reshape(-1, 3)[vertexOrder].reshape(-1)
+
+            lodVerticesList.append(lodVertices)
+            lodIndicesList.append(lodIndices)
+
+        if len(lods) > 0:
+            self.lodVertices = np.concatenate(lodVerticesList)
+            self.lodIndices = np.concatenate(lodIndicesList)
+
+        self.lodInfo = np.array([(int(len(lodVertices) / 3), len(lodIndices)) for lodVertices, lodIndices in zip(lodVerticesList, lodIndicesList)], dtype = np.int64).reshape(-1, 2)
+        self.lodErrors = np.array([lod[2] for lod in lods], dtype = np.float32)
+
+        self._ComputeLODOffsets()
+
+    def _PackGPUBuffers(self, vertexFormat, positionFormat):
+        # The draw buffer is packed once here and cached, so a cache hit uploads the mapped sections as they are.
+        verticesList = [self.vertices, self.normalLineVertices, self.lodVertices]
+        indicesList = [self.indices, self.normalLineIndices]
+
+        baseVertex = int((len(self.vertices) + len(self.normalLineVertices)) / 3)
+
+        for level in range(self.GetNumLODs()):
+            lodVertices, lodIndices, lodError = self.GetLOD(level)
+
+            indicesList.append(lodIndices + np.uint32(baseVertex))
+
+            baseVertex += int(len(lodVertices) / 3)
+
+        vertices = np.concatenate(verticesList)
+
+        if positionFormat != Index.VERTEX_POSITION_FLOAT:
+            vertices, dequantizeMat = vertexFormat.Quantize(vertices)
+
+            self.gpuDequantizeMat = np.array(dequantizeMat, dtype = np.float32)
+
+        self.gpuVertices = vertexFormat.Pack(vertices, 3)
+        self.gpuIndices = vertexFormat.PackIndices(np.concatenate(indicesList), baseVertex)[0]
+
+    def _BuildTriangleBVH(self):
+        positions = self.vertices.reshape(-1, 3)
+        faceIndices = self.indices.reshape(-1, 3)
+
+        boxMins = positions[faceIndices[:, 0]]
+        boxMaxs = positions[faceIndices[:, 0]]
+
+        for corner in range(1, 3):
+            boxMins = np.minimum(boxMins, positions[faceIndices[:, corner]])
+            boxMaxs = np.maximum(boxMaxs, positions[faceIndices[:, corner]])
+
+        self.triangleBVH.Build(boxMins, boxMaxs)
+        self.triangleBVH.SetNodeData(self.triangleBVH.GetNodeData())
+
+    def _ComputeLODOffsets(self):
+        self.lodOffsets = []
+
+        vertexOffset = 0
+        indexOffset = 0
+
+        for numVertices, numIndices in self.lodInfo.tolist():
+            self.lodOffsets.append((vertexOffset, indexOffset))
+
+            vertexOffset += numVertices * 3
+            indexOffset += numIndices
+
+    def _OptimizeVertexCache(self, allocator, numChunkVertices):
+        optimizer = MeshOptimizer(allocator = allocator)
+
+        # The stats cost a pass over every index, they are only taken here and kept in the cache attributes.
+        self.vertexCacheStats[0 : 2] = optimizer.ComputeCacheStats(self.indices, self.numVertices)
+
+        self.indices, vertexOrder = optimizer.Optimize(self.indices, self.numVertices, self.vertices)
+
+        self.vertexCacheStats[2 : 4] = optimizer.ComputeCacheStats(self.indices, self.numVertices)
+
+        vertices = self.vertices.reshape(-1, 3)
+
+        self.vertices = allocator.Allocate(len(vertexOrder) * 3, np.float32)
+
+        optimizedVertices = self.vertices.reshape(-1, 3)
+
+        for chunkStart in range(0, len(vertexOrder), numChunkVertices):
+            chunkIndices = vertexOrder[chunkStart : chunkStart + numChunkVertices]
+            optimizedVertices[chunkStart : chunkStart + len(chunkIndices)] = vertices[chunkIndices]
+
+    def _ComputeNormals(self, normalWeighting, numChunkFaces):
+        vertices = self.vertices.reshape(-1, 3)
+        faces = self.indices.reshape(-1, 3)
+        normals = self.normals.reshape(-1, 3)
+
+        for chunkStart in range(0, self.numFaces, numChunkFaces):
+            chunkFaces = faces[chunkStart : chunkStart + numChunkFaces]
+
+            vecA = vertices[chunkFaces[:, 0]]
+            vecB = vertices[chunkFaces[:, 1]]
+            vecC = vertices[chunkFaces[:, 2]]
+
+            vecAB = vecB - vecA
+            vecAC = vecC - vecA
+
+            # The length of the cross product is twice the face area.
+            faceNormals = np.cross(vecAB, vecAC)
+
+            if normalWeighting != Index.NORMAL_WEIGHTING_AREA:
+                faceNormals = self._Normalize(faceNormals)
+
+            if normalWeighting == Index.NORMAL_WEIGHTING_ANGLE:
+                vecBC = vecC - vecB
+
+                cornerAngles = np.empty(chunkFaces.shape, dtype = np.float32)
+                cornerAngles[:, 0] = self._ComputeAngles(vecAB, vecAC)
+                cornerAngles[:, 1] = self._ComputeAngles(vecBC, -vecAB)
+                cornerAngles[:, 2] = self._ComputeAngles(-vecAC, -vecBC)
+
+                cornerNormals = faceNormals[:, np.newaxis, :] * cornerAngles[:, :, np.newaxis]
+            else:
+                cornerNormals = np.broadcast_to(faceNormals[:, np.newaxis, :], chunkFaces.shape + (3, ))
+
+            cornerIndices = chunkFaces.reshape(-1)
+            cornerNormals = cornerNormals.reshape(-1, 3)
+
+            for axis in range(3):
+                normals[:, axis] += np.bincount(cornerIndices, weights = cornerNormals[:, axis], minlength = self.numVertices).astype(np.float32)
+
+        normals[:] = self._Normalize(normals)
+
+    def _ComputeAngles(self, vecA, vecB):
+        return np.arctan2(np.linalg.norm(np.cross(vecA, vecB), axis = 1), np.einsum('ij,ij->i', vecA, vecB))
+
+    def _Normalize(self, vectors):
+        lengths = np.linalg.norm(vectors, axis = 1, keepdims = True)
+
+        return np.divide(vectors, lengths, out = np.zeros_like(vectors), where = lengths > 0.0)
+
+    def _MakeMeshData(self):
+        meshData = {}
+
+        meshData['Vertices'] = self.vertices
+        meshData['Indices'] = self.indices
+        meshData['Normals'] = self.normals
+        meshData['NormalLineVertices'] = self.normalLineVertices
+        meshData['NormalLineIndices'] = self.normalLineIndices
+        meshData['BoundingBox'] = self.boundingBox
+        meshData['BoundingSphere'] = self.boundingSphere
+        meshData['LODVertices'] = self.lodVertices
+        meshData['LODIndices'] = self.lodIndices
+        meshData['LODInfo'] = self.lodInfo
+        meshData['LODErrors'] = self.lodErrors
+        meshData['GPUVertices'] = self.gpuVertices
+        meshData['GPUIndices'] = self.gpuIndices
+        meshData['GPUDequantizeMat'] = self.gpuDequantizeMat
+
+        for name, array in self.triangleBVH.GetNodeData().items():
+            meshData['BVH' + name] = array
+
+        return meshData
+
+    def _MakeMeshAttributes(self):
+        meshAttributes = {}
+
+        meshAttributes['VertexCacheStats'] = self.vertexCacheStats.tolist()
+
+        return meshAttributes
+
+    def _InitializeFromMeshData(self, meshData, meshAttributes):
+        self.vertices = meshData['Vertices']
+        self.indices = meshData['Indices']
+        self.normals = meshData['Normals']
+        self.normalLineVertices = meshData['NormalLineVertices']
+        self.normalLineIndices = meshData['NormalLineIndices']
+        self.boundingBox = meshData['BoundingBox']
+        self.boundingSphere = meshData['BoundingSphere']
+        self.lodVertices = meshData['LODVertices']
+        self.lodIndices = meshData['LODIndices']
+        self.lodInfo = meshData['LODInfo']
+        self.lodErrors = meshData['LODErrors']
+        self.gpuVertices = meshData['GPUVertices']
+        self.gpuIndices = meshData['GPUIndices']
+        self.gpuDequantizeMat = meshData['GPUDequantizeMat']
+
+        self.vertexCacheStats = np.array(meshAttributes['VertexCacheStats'], dtype = np.float32)
+
+        self._ComputeLODOffsets()
+
+        self.triangleBVH.SetNodeData({'SlotItems' : meshData['BVHSlotItems'], 'NodeMins' : meshData['BVHNodeMins'], 'NodeMaxs' : meshData['BVHNodeMaxs']})
+
+        self.numVertices = int(len(self.vertices) / 3)
+        self.numFaces = int(len(self.indices) / 3)
+
+class ModelLoader:
+    def __init__(self):
+        self.numWorkers = os.cpu_count() or 1
+        self.loadTime = 0.0
+
+        self.streaming = False
+        self.chunkSize = 64 << 20
+        self.memoryLimit = None
+
+        self.normalWeighting = Index.NORMAL_WEIGHTING_UNIFORM
+        self.optimizeMesh = False
+        self.numLODs = 3
+        self.positionFormat = Index.VERTEX_POSITION_QUANTIZED
+
+    def GetNumWorkers(self):
+        return self.numWorkers
+
+    def SetNumWorkers(self, numWorkers):
+        self.numWorkers = max(numWorkers, 1)
+
+    def GetLoadTime(self):
+        return self.loadTime
+
+    def GetStreaming(self):
+        return self.streaming
+
+    def SetStreaming(self, streaming):
+        self.streaming = streaming
+
+    def GetChunkSize(self):
+        return self.chunkSize
+
+    def SetChunkSize(self, chunkSize):
+        self.chunkSize = max(chunkSize, 1 << 16)
+
+    def GetMemoryLimit(self):
+        return self.memoryLimit
+
+    def SetMemoryLimit(self, memoryLimit):
+        self.memoryLimit = memoryLimit
+
+    def GetNormalWeighting(self):
+        return self.normalWeighting
+
+    def SetNormalWeighting(self, normalWeighting):
+        self.normalWeighting = normalWeighting
+
+    def GetOptimizeMesh(self):
+        return self.optimizeMesh
+
+    def SetOptimizeMesh(self, optimizeMesh):
+        self.optimizeMesh = optimizeMesh
+
+    def GetNumLODs(self):
+        return self.numLODs
+
+    def SetNumLODs(self, numLODs):
+        self.numLODs = numLODs
+
+    def GetPositionFormat(self):
+        return self.positionFormat
+
+    def SetPositionFormat(self, positionFormat):
+        self.positionFormat = positionFormat
+
+    def GetMeshOptions(self):
+        return (self.normalWeighting, self.optimizeMesh, self.numLODs, self.positionFormat)
+
+    def MakeVertexFormat(self):
+        vertexFormat = VertexFormat()
+
+        if self.positionFormat == Index.VERTEX_POSITION_QUANTIZED:
+            vertexFormat.AddAttribute(0, 3, GL_SHORT, True)
+        elif self.positionFormat == Index.VERTEX_POSITION_HALF_FLOAT:
+            vertexFormat.AddAttribute(0, 3, GL_HALF_FLOAT)
+        else:
+            vertexFormat.AddAttribute(0, 3, GL_FLOAT)
+
+        return vertexFormat
+
+    def GetSettings(self):
+        settings = {}
+
+        settings['Streaming'] = self.streaming
+        settings['ChunkSize'] = self.chunkSize
+        settings['MemoryLimit'] = self.memoryLimit
+        settings['NormalWeighting'] = self.normalWeighting
+        settings['OptimizeMesh'] = self.optimizeMesh
+        settings['NumLODs'] = self.numLODs
+        settings['PositionFormat'] = self.positionFormat
+
+        return settings
+
+    def SetSettings(self, settings):
+        self.streaming = settings['Streaming']
+        self.chunkSize = settings['ChunkSize']
+        self.memoryLimit = settings['MemoryLimit']
+        self.normalWeighting = settings['NormalWeighting']
+        self.optimizeMesh = settings['OptimizeMesh']
+        self.numLODs = settings['NumLODs']
+        self.positionFormat = settings['PositionFormat']
+
+    def LoadModels(self, modelEntries):
+        startTime = time.perf_counter()
 
-                glEndList()
+        numWorkers = min(self.numWorkers, len(modelEntries))
 
-                dx += dAdvanceX
+        if numWorkers <= 1:
+            models = [Model(modelPath, normalLineScale) for key, modelPath, normalLineScale in modelEntries]
+        else:
+            models = self._LoadModelsParallel(modelEntries, numWorkers)
 
-            glTranslatef(0.0, -self.maxCharHeight, 0.0)
-            dx = 0.0
+        self.loadTime = time.perf_counter() - startTime
 
-class Model:
-    def __init__(self, modelPath, normalLineScale):
-        self.vertices = []
-        self.indices = []
-        self.verticesExceptNoUse = []
+        return models
 
-        self.normals = []
-        self.normalLineVertices = []
-        self.normalLineIndices = []
+    def _LoadModelsParallel(self, modelEntries, numWorkers):
+        models = [None for i in range(len(modelEntries))]
 
-        self.normalLineScale = normalLineScale
+        entryOrder = sorted(range(len(modelEntries)), key = lambda i: os.path.getsize(modelEntries[i][1]), reverse = True)
 
-        self.numVertices = 0
-        self.numVerticesExceptNoUse = 0
-        self.numFaces = 0
+        resource_tracker.ensure_running()
 
-        self._Initialize(modelPath)
+        with ProcessPoolExecutor(max_workers = numWorkers, mp_context = multiprocessing.get_context('spawn')) as executor:
+            futures = {}
 
-    def GetVertices(self):
-        return self.vertices
+            for i in entryOrder:
+                key, modelPath, normalLineScale = modelEntries[i]
+                futures[i] = executor.submit(LoadModelProcess, modelPath, normalLineScale, gModelCache.GetCacheDir(), gModelCache.GetEnable(), self.GetSettings())
 
-    def GetVerticesExceptNoUse(self):
-        return self.verticesExceptNoUse
+            # Workers hold their shared memory handles until the pool shuts down at the end of this block, after every segment is attached here.
+            for i in entryOrder:
+                key, modelPath, normalLineScale = modelEntries[i]
+                result = futures[i].result()
 
-    def GetIndices(self):
-        return self.indices
+                if result['CachePath'] != None:
+                    meshData, meshAttributes = MeshFile().Open(result['CachePath'])
+                else:
+                    meshData = self._ReceiveSharedArrays(result['SharedArrays'])
+                    meshAttributes = result['MeshAttributes']
 
-    def GetNormalLineVertices(self):
-        return self.normalLineVertices
+                models[i] = Model(modelPath, normalLineScale, meshData, meshAttributes)
+                models[i].SetLoadInfo(result['ParseTime'], result['ParseThroughput'], result['NormalTime'], result['CacheHit'])
 
-    def GetNormalLineIndices(self):
-        return self.normalLineIndices
+                gModelCache.AddStats(*result['CacheStats'])
 
-    def GetNumVertices(self):
-        return self.numVertices
+        return models
 
-    def GetNumVerticesExceptNoUse(self):
-        return self.numVerticesExceptNoUse
+    def _ReceiveSharedArrays(self, sharedArrays):
+        meshData = {}
 
-    def _Initialize(self, modelPath):
-        with open(modelPath, mode = 'r') as fin:
-            for line in fin:
-                sl = line.split()
+        for name, (sharedMemoryName, dtype, shape) in sharedArrays.items():
+            sharedMemory = shared_memory.SharedMemory(name = sharedMemoryName)
 
-                if len(sl) == 0:
-                    continue
-                elif sl[0] in ['#']:
-                    continue
-                elif sl[0] == 'v':
-                    for v in sl[1 : len(sl)]:
-                        self.vertices.append(float(v))
-                elif sl[0] == 'f':
-                    for s in sl[1 : len(sl)]:
-                        il = s.split('/')
-                        self.indices.append(int(il[0]) - 1)
+            meshData[name] = np.ndarray(shape, dtype = np.dtype(dtype), buffer = sharedMemory.buf).copy()
 
-        self.numVertices = int(len(self.vertices) / 3)
-        self.numFaces = int(len(self.indices) / 3)
+            sharedMemory.close()
+            sharedMemory.unlink()
 
-        self.normals = np.zeros(len(self.vertices), dtype = np.float32)
+        return meshData
 
-        for i in range(self.numFaces):
-            vertexAIndex = self.indices[i * 3 + 0]
-            vertexBIndex = self.indices[i * 3 + 1]
-            vertexCIndex = self.indices[i * 3 + 2]
+def LoadModelProcess(modelPath, normalLineScale, cacheDir, enableCache, loadSettings):
+    gModelCache.SetCacheDir(cacheDir)
+    gModelCache.SetEnable(enableCache)
 
-            vecA = glm.vec3(self.vertices[vertexAIndex * 3 + 0], self.vertices[vertexAIndex * 3 + 1], self.vertices[vertexAIndex * 3 + 2])
-            vecB = glm.vec3(self.vertices[vertexBIndex * 3 + 0], self.vertices[vertexBIndex * 3 + 1], self.vertices[vertexBIndex * 3 + 2])
-            vecC = glm.vec3(self.vertices[vertexCIndex * 3 + 0], self.vertices[vertexCIndex * 3 + 1], self.vertices[vertexCIndex * 3 + 2])
+    gModelLoader.SetSettings(loadSettings)
 
-            vecAB = vecB - vecA
-            vecAC = vecC - vecA
+    cacheStats = (gModelCache.GetNumHits(), gModelCache.GetNumMisses(), gModelCache.GetNumWriteFailures(), gModelCache.GetSavedTime())
 
-            faceNormal = glm.normalize(glm.cross(vecAB, vecAC))
+    model = Model(modelPath, normalLineScale)
 
-            self.normals[vertexAIndex * 3 + 0] += faceNormal.x
-            self.normals[vertexAIndex * 3 + 1] += faceNormal.y
-            self.normals[vertexAIndex * 3 + 2] += faceNormal.z
+    result = {}
 
-            self.normals[vertexBIndex * 3 + 0] += faceNormal.x
-            self.normals[vertexBIndex * 3 + 1] += faceNormal.y
-            self.normals[vertexCIndex * 3 + 2] += faceNormal.z
+    result['ParseTime'] = model.GetParseTime()
+    result['ParseThroughput'] = model.GetParseThroughput()
+    result['NormalTime'] = model.GetNormalTime()
+    result['CacheHit'] = model.GetCacheHit()
+    result['CacheStats'] = (gModelCache.GetNumHits() - cacheStats[0], gModelCache.GetNumMisses() - cacheStats[1], gModelCache.GetNumWriteFailures() - cacheStats[2], gModelCache.GetSavedTime() - cacheStats[3])
+    result['CachePath'] = None
+    result['SharedArrays'] = None
+    result['MeshAttributes'] = model.GetMeshAttributes()
 
-            self.normals[vertexCIndex * 3 + 0] += faceNormal.x
-            self.normals[vertexCIndex * 3 + 1] += faceNormal.y
-            self.normals[vertexCIndex * 3 + 2] += faceNormal.z
+    if model.GetCacheKey() != None and os.path.exists(gModelCache.GetCachePath(model.GetCacheKey())) == True:
+        result['CachePath'] = gModelCache.GetCachePath(model.GetCacheKey())
+        return result
 
-        useVertices = np.zeros(self.numVertices, dtype = np.bool8)
+    sharedArrays = {}
 
-        for i in range(len(self.indices)):
-            index = self.indices[i]
-            useVertices[index] = True
+    for name, array in model.GetMeshData().items():
+        sharedMemory = shared_memory.SharedMemory(create = True, size = max(array.nbytes, 1))
 
-        for i in range(self.numVertices):
-            if useVertices[i] == True:
-                vertexNormal = glm.vec3(self.normals[i * 3 + 0], self.normals[i * 3 + 1], self.normals[i * 3 + 2])
-                vertexNormal = glm.normalize(vertexNormal)
+        np.ndarray(array.shape, dtype = array.dtype, buffer = sharedMemory.buf)[...] = array
 
-                self.normals[i * 3 + 0] = vertexNormal.x
-                self.normals[i * 3 + 1] = vertexNormal.y
-                self.normals[i * 3 + 2] = vertexNormal.z
+        sharedArrays[name] = (sharedMemory.name, array.dtype.str, array.shape)
 
-        for i in range(self.numVertices):
-            if useVertices[i] == True:
-                self.verticesExceptNoUse.append(self.vertices[i * 3 + 0])
-                self.verticesExceptNoUse.append(self.vertices[i * 3 + 1])
-                self.verticesExceptNoUse.append(self.vertices[i * 3 + 2])
-                
-        self.numVerticesExceptNoUse = int(len(self.verticesExceptNoUse) / 3)
+        # On Windows a named mapping is destroyed with its last handle, so the worker keeps its handle until the pool shuts down after the parent attached.
+        gWorkerSharedMemories.append(sharedMemory)
 
-        for i in range(self.numVertices):
-            if useVertices[i] == True:
-                self.normalLineVertices.append(self.vertices[i * 3 + 0])
-                self.normalLineVertices.append(self.vertices[i * 3 + 1])
-                self.normalLineVertices.append(self.vertices[i * 3 + 2])
+    result['SharedArrays'] = sharedArrays
 
-                self.normalLineVertices.append(self.vertices[i * 3 + 0] + self.normals[i * 3 + 0] * self.normalLineScale)
-                self.normalLineVertices.append(self.vertices[i * 3 + 1] + self.normals[i * 3 + 1] * self.normalLineScale)
-                self.normalLineVertices.append(self.vertices[i * 3 + 2] + self.normals[i * 3 + 2] * self.normalLineScale)
-        
-                self.normalLineIndices.append(i * 2 + 0)
-                self.normalLineIndices.append(i * 2 + 1)
+    return result
         
 
 gSceneManager = SceneManager(True)
 gInputManager = InputManager()
 
 gShaderFactory = ShaderFactory()
+gGLStateCache = GLStateCache()
+
+gModelCache = ModelCache()
+gModelLoader = ModelLoader()
+
+gWorkerSharedMemories = []
 
 
 class TestProgram:
@@ -1375,6 +4219,7 @@ class TestProgram:
 
         self.GUIStuffVerticesList = []
         self.GUIStuffIndicesList = []
+        self.GUIStuffIndexTypes = []
 
         self.backgroundVertices = []
         self.backgroundIndices = []
@@ -1388,13 +4233,41 @@ class TestProgram:
         self.rotDegree = 0.0
         self.rotSpeed = 20.0        
         
-        self.GUIModelMat = glm.mat4()
+        self.GUIModelMat = np.identity(4, dtype = np.float32)
 
         self.imguiTabItemFlags = imgui.TAB_ITEM_SET_SELECTED        
         
-        self.numVertexComponentsInModel = 3
         self.numVertexComponents = 7
         self.numVertexComponentsWithTexCoord = 9        
+
+        self.lodPixelError = 1.0
+
+        self.wireframeWidth = 1.0
+        self.wireframeColor = [1.0, 1.0, 1.0, 1.0]
+
+        self.renderQueue = RenderQueue()
+
+        self.commandList = CommandList()
+        self.commandListDirty = True
+        self.commandListViewVersion = -1
+        self.statsArgsIndex = 0
+
+        self.frustum = Frustum()
+
+        self.sceneBVH = BoundingVolumeHierarchy()
+        self.sceneItemKeys = []
+
+        self.pickTime = 0.0
+
+        self.numDrawnModels = 0
+        self.numCulledModels = 0
+
+        self.transformTable = TransformTable()
+        self.numTransformRecomputes = 0
+
+        # Transforms of the items considered by the last record, drawn or culled.
+        self.recordedTransformIndices = []
+        self.recordedTransformsChanged = False
         
         self.numObjects = 0
 
@@ -1408,13 +4281,6 @@ class TestProgram:
         self.modelsVBO = None
         self.modelsEBO = None
 
-        self.modelsVerticesExceptNoUseVAO = None
-        self.modelsVerticesExceptNoUseVBO = None
-
-        self.modelsNormalVAO = None
-        self.modelsNormalVBO = None
-        self.modelsNormalEBO = None
-
         self.numGUIStuff = 0
 
         self.GUIVAO = None
@@ -1429,6 +4295,21 @@ class TestProgram:
     def GetModelsDataDict(self):
         return self.modelsDataDict
 
+    def GetNumDrawnModels(self):
+        return self.numDrawnModels
+
+    def GetNumCulledModels(self):
+        return self.numCulledModels
+
+    def GetTransformTable(self):
+        return self.transformTable
+
+    def GetNumTransformRecomputes(self):
+        return self.numTransformRecomputes
+
+    def GetSceneBVH(self):
+        return self.sceneBVH
+
     def RegistTestExample(self, key, testExampleFunc):
         self.testExamplesDict[key] = testExampleFunc
         self.imguiInspector['TestExample'][key] = False
@@ -1436,44 +4317,140 @@ class TestProgram:
     def Restart(self):
         self._Initialize()        
 
+    # Visible objects spin with rotDegree, so they keep the viewer animating unless paused.
+    def GetNeedsRedraw(self):
+        if gSceneManager.GetView3D() != True or gSceneManager.GetPause() == True:
+            return False
+
+        for key, value in self.imguiInspector['Object'].items():
+            if value == True:
+                return True
+
+        return False
+
+    # Culling, LOD selection and sorting only depend on the view, the transforms and the Inspector.
+    def GetNeedsSceneRedraw(self):
+        if gSceneManager.GetView3D() != True:
+            return False
+
+        return self.commandListDirty == True or self.recordedTransformsChanged == True or self.commandListViewVersion != gSceneManager.GetViewVersion()
+
     def UpdateAboutKeyInput(self, key, value = True):
         pass
 
     def UpdateAboutMouseInput(self, button, pos):
-        pass            
+        if button != glfw.MOUSE_BUTTON_LEFT:
+            return
+
+        startTime = time.perf_counter()
+
+        origin, direction = self._UnprojectMousePos(pos)
+
+        items, entryDistances = self.sceneBVH.QueryRay(origin, direction)
+
+        pickedKey = "None"
+        nearestDistance = np.inf
+
+        for item, entryDistance in zip(items.tolist(), entryDistances.tolist()):
+            if entryDistance > nearestDistance:
+                break
+
+            key = self.sceneItemKeys[item]
+
+            if self.imguiInspector['Model'][key] == False:
+                continue
+
+            modelDataDict = self.modelsDataDict[key]
+
+            invModelMat = np.array(glm.inverse(modelDataDict['Transform'].GetModelMat()), dtype = np.float64)
+
+            distance, face = self.models[modelDataDict['Index']].IntersectRay(invModelMat[0 : 3, 0 : 3] @ origin + invModelMat[0 : 3, 3], invModelMat[0 : 3, 0 : 3] @ direction)
+
+            if distance < nearestDistance:
+                nearestDistance = distance
+                pickedKey = key
+
+        self.selectedModelKey = pickedKey
+        self.pickTime = time.perf_counter() - startTime
+
+        gSceneManager.SetSpecificProgramArgs(self.statsArgsIndex, Index.SPECIFIC_PROGRAM_INFO_TEXT_START + 3, 'Pick : {0} ({1: 0.2f} ms)'.format(pickedKey, self.pickTime * 1000.0))
+
+    def _UnprojectMousePos(self, pos):
+        displaySize = gSceneManager.GetDisplaySize()
+        screenPos = gSceneManager.GetScreenPos()
+        screenSize = gSceneManager.GetScreenSize()
+
+        # Cursor positions are measured from the top of the window, the viewport from the bottom.
+        ndcX = (pos[0] - screenPos[0][0]) / screenSize[0] * 2.0 - 1.0
+        ndcY = 1.0 - (pos[1] - (displaySize[1] - screenPos[1][1])) / screenSize[1] * 2.0
+
+        invPrjViewMat = glm.inverse(gSceneManager.GetPerspectivePrjMat() * gSceneManager.GetView3DMat())
+
+        nearPos = invPrjViewMat * glm.vec4(ndcX, ndcY, -1.0, 1.0)
+        farPos = invPrjViewMat * glm.vec4(ndcX, ndcY, 1.0, 1.0)
+
+        origin = np.array(nearPos.xyz / nearPos.w, dtype = np.float64)
+        direction = np.array(farPos.xyz / farPos.w, dtype = np.float64) - origin
+
+        return origin, direction / np.linalg.norm(direction)
 
     def Update(self, deltaTime):
         if gSceneManager.GetView3D() != True:
             return
 
-        self.rotDegree += deltaTime * self.rotSpeed
+        # Only visible objects spin, hidden ones keep their transforms clean.
+        visibleObjectKeys = [key for key, value in self.imguiInspector['Object'].items() if value == True]
+
+        if len(visibleObjectKeys) > 0:
+            self.rotDegree += deltaTime * self.rotSpeed
+
+            if self.rotDegree > 360.0:
+                self.rotDegree -= 360.0
 
-        if self.rotDegree > 360.0:
-            self.rotDegree -= 360.0
+        for key in visibleObjectKeys:
+            self.objectsDataDict[key]['Transform'].SetRotation([self.rotDegree, self.rotDegree, self.rotDegree])
 
         self._UpdateNewFrameImgui(deltaTime)
 
+        self._UpdateTransforms()
+
+    def _UpdateTransforms(self):
+        self.transformTable.Update()
+
+        changedItems = self.transformTable.GetChangedItems()
+
+        self.numTransformRecomputes = len(changedItems)
+
+        # A culled model that moves may come into view, so every recorded item counts.
+        self.recordedTransformsChanged = bool(np.any(np.isin(changedItems, self.recordedTransformIndices)))
+
+        self.transformTable.ResetChanges()
+
     def Draw(self):
         if gSceneManager.GetView3D() != True:
             return
         
         self._DrawDrawingStuff()
 
+    def DrawOverlay(self):
+        if gSceneManager.GetView3D() != True:
+            return
+
         displaySize = gSceneManager.GetDisplaySize()                
             
         glViewport(0, 0, displaySize[0], displaySize[1])    
         
-        shader = gSceneManager.GetShader(Index.SHADER_DEFAULT)
-        
-        shader.Use()
-        shader.SetMat4('prjMat', gSceneManager.GetGUIPrjMat())
-        shader.SetMat4('viewMat', gSceneManager.GetView2DMat())
+        gSceneManager.BindCameraPass(Index.CAMERA_PASS_GUI)
 
         self._DrawGUI()
 
+        self._UpdateFrameStats()
+
     def _Initialize(self):
         gSceneManager.SetView3D(True)
 
+        self.commandListDirty = True
+
         self.rotDegree = 0.0
         self.drawingModelMat = glm.mat4()        
         
@@ -1552,9 +4529,7 @@ class TestProgram:
         cubeDataDict['Index'] = objectIndex
         cubeDataDict['Vertices'] = np.array(cubeVerticesData, dtype = np.float32)
         cubeDataDict['Indices'] = np.array(cubeIndicesData, dtype = np.uint32)
-        cubeDataDict['Position'] = [0.0, 0.0, 0.0]
-        cubeDataDict['Rotation'] = [0.0, 0.0, 0.0]
-        cubeDataDict['Scale'] = 2.0
+        cubeDataDict['Transform'] = self.transformTable.Add([0.0, 0.0, 0.0], [0.0, 0.0, 0.0], 2.0)
         
         self.objectsDataDict['Cube'] = cubeDataDict
 
@@ -1564,12 +4539,17 @@ class TestProgram:
         self.objectsVBO = glGenBuffers(self.numObjects)
         self.objectsEBO = glGenBuffers(self.numObjects)
 
+        vertexFormat = VertexFormat()
+        vertexFormat.AddAttribute(0, 3, GL_FLOAT)
+        vertexFormat.AddAttribute(1, 4, GL_UNSIGNED_BYTE, True)
+        vertexFormat.AddAttribute(2, 2, GL_HALF_FLOAT)
+
         for key, value in self.objectsDataDict.items():
             objectDataDict = value
 
             i = objectDataDict['Index']
-            vertices = objectDataDict['Vertices']
-            indices = objectDataDict['Indices']
+            vertices = vertexFormat.Pack(objectDataDict['Vertices'], self.numVertexComponentsWithTexCoord)
+            indices, objectDataDict['IndexType'] = vertexFormat.PackIndices(objectDataDict['Indices'], int(len(objectDataDict['Vertices']) / self.numVertexComponentsWithTexCoord))
 
             glBindVertexArray(self.objectsVAO[i])
 
@@ -1579,14 +4559,7 @@ class TestProgram:
             glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.objectsEBO[i])
             glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
 
-            glEnableVertexAttribArray(0)
-            glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, vertices.itemsize * self.numVertexComponentsWithTexCoord, ctypes.c_void_p(0))
-
-            glEnableVertexAttribArray(1)
-            glVertexAttribPointer(1, 4, GL_FLOAT, GL_FALSE, vertices.itemsize * self.numVertexComponentsWithTexCoord, ctypes.c_void_p(vertices.itemsize * 3))
-
-            glEnableVertexAttribArray(2)
-            glVertexAttribPointer(2, 2, GL_FLOAT, GL_FALSE, vertices.itemsize * self.numVertexComponentsWithTexCoord, ctypes.c_void_p(vertices.itemsize * 7))
+            vertexFormat.Setup()
 
         glBindVertexArray(0)
         glBindBuffer(GL_ARRAY_BUFFER, 0)        
@@ -1600,23 +4573,18 @@ class TestProgram:
             glDeleteBuffers(self.numModels, self.modelsVBO)
             glDeleteBuffers(self.numModels, self.modelsEBO)
 
-            glDeleteVertexArrays(self.numModels, self.modelsVerticesExceptNoUseVAO)
-            glDeleteBuffers(self.numModels, self.modelsVerticesExceptNoUseVBO)
-
-            glDeleteVertexArrays(self.numModels, self.modelsNormalVAO)
-            glDeleteBuffers(self.numModels, self.modelsNormalVBO)
-            glDeleteBuffers(self.numModels, self.modelsNormalEBO)
-
         if self.selectedTestExampleKey != "None":
             self.testExamplesDict[self.selectedTestExampleKey](self)
             self.numModels = len(self.models)
         else:
             self.numModels = 0
 
-            modelKeys = []
+            modelEntries = []
 
-            modelKeys.append('StanfordBunny')
-            self.models.append(Model('../../Resource/Object/stanford-bunny.obj', 0.001))
+            modelEntries.append(('StanfordBunny', '../../Resource/Object/stanford-bunny.obj', 0.001))
+
+            modelKeys = [modelEntry[0] for modelEntry in modelEntries]
+            self.models.extend(gModelLoader.LoadModels(modelEntries))
             
             self.numModels = len(self.models)
 
@@ -1624,20 +4592,17 @@ class TestProgram:
                 modelDataDict = {}
 
                 modelDataDict['Index'] = i
-                modelDataDict['Vertices'] = np.array(self.models[i].GetVertices(), dtype = np.float32)
-                modelDataDict['Indices'] = np.array(self.models[i].GetIndices(), dtype = np.uint32)
-                modelDataDict['VerticesExceptNoUse'] = np.array(self.models[i].GetVerticesExceptNoUse(), dtype = np.float32)
-                modelDataDict['NormalVertices'] = np.array(self.models[i].GetNormalLineVertices(), dtype = np.float32)
-                modelDataDict['NormalIndices'] = np.array(self.models[i].GetNormalLineIndices(), dtype = np.uint32)
-                modelDataDict['Position'] = [0.0, 0.0, 0.0]
-                modelDataDict['Rotation'] = [0.0, 0.0, 0.0]
-                modelDataDict['Scale'] = 1.0
+                modelDataDict['Vertices'] = self.models[i].GetVertices()
+                modelDataDict['Indices'] = self.models[i].GetIndices()
+                modelDataDict['NormalVertices'] = self.models[i].GetNormalLineVertices()
+                modelDataDict['NormalIndices'] = self.models[i].GetNormalLineIndices()
+                modelDataDict['Transform'] = self.transformTable.Add()
 
                 self.modelsDataDict[modelKeys[i]] = modelDataDict
             
-            self.modelsDataDict['StanfordBunny']['Position'] = [0.5, -2.0, 6.0]
-            self.modelsDataDict['StanfordBunny']['Rotation'] = [0.0, 0.0, 0.0]
-            self.modelsDataDict['StanfordBunny']['Scale'] = 20.0
+            self.modelsDataDict['StanfordBunny']['Transform'].SetPosition([0.5, -2.0, 6.0])
+            self.modelsDataDict['StanfordBunny']['Transform'].SetRotation([0.0, 0.0, 0.0])
+            self.modelsDataDict['StanfordBunny']['Transform'].SetScale(20.0)
             
             self.numModels += 1
 
@@ -1645,22 +4610,34 @@ class TestProgram:
         self.modelsVBO = glGenBuffers(self.numModels)
         self.modelsEBO = glGenBuffers(self.numModels)
 
-        self.modelsVerticesExceptNoUseVAO = glGenVertexArrays(self.numModels)
-        self.modelsVerticesExceptNoUseVBO = glGenBuffers(self.numModels)
-
-        self.modelsNormalVAO = glGenVertexArrays(self.numModels)
-        self.modelsNormalVBO = glGenBuffers(self.numModels)
-        self.modelsNormalEBO = glGenBuffers(self.numModels)
+        vertexFormat = gModelLoader.MakeVertexFormat()
 
         for key, value in self.modelsDataDict.items():
             modelDataDict = value
 
             i = modelDataDict['Index']
-            vertices = modelDataDict['Vertices']
-            indices = modelDataDict['Indices']
-            verticesExceptNoUse = modelDataDict['VerticesExceptNoUse']
-            normalVertices = modelDataDict['NormalVertices']
-            normalIndices = modelDataDict['NormalIndices']
+            model = self.models[i]
+
+            # The buffers were quantized and packed when the model was built, so cached models upload straight from the mapped file.
+            vertices = model.GetGPUVertices()
+            indices = model.GetGPUIndices()
+
+            modelDataDict['DequantizeMat'] = model.GetDequantizeMat()
+            modelDataDict['IndexType'] = GL_UNSIGNED_SHORT if indices.dtype == np.uint16 else GL_UNSIGNED_INT
+
+            modelDataDict['NormalIndexOffset'] = ctypes.c_void_p(indices.itemsize * len(modelDataDict['Indices']))
+
+            modelDataDict['LODs'] = [(len(modelDataDict['Indices']), ctypes.c_void_p(0), 0.0)]
+
+            indexOffset = len(modelDataDict['Indices']) + len(modelDataDict['NormalIndices'])
+
+            for level in range(model.GetNumLODs()):
+                lodVertices, lodIndices, lodError = model.GetLOD(level)
+
+                modelDataDict['LODs'].append((len(lodIndices), ctypes.c_void_p(indices.itemsize * indexOffset), lodError))
+
+                indexOffset += len(lodIndices)
+            modelDataDict['GPUMemorySize'] = vertices.nbytes + indices.nbytes
 
             glBindVertexArray(self.modelsVAO[i])
 
@@ -1670,32 +4647,42 @@ class TestProgram:
             glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.modelsEBO[i])
             glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
 
-            glEnableVertexAttribArray(0)
-            glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, vertices.itemsize * self.numVertexComponentsInModel, ctypes.c_void_p(0))
+            vertexFormat.Setup()
 
-            glBindVertexArray(self.modelsVerticesExceptNoUseVAO[i])
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)        
 
-            glBindBuffer(GL_ARRAY_BUFFER, self.modelsVerticesExceptNoUseVBO[i])
-            glBufferData(GL_ARRAY_BUFFER, verticesExceptNoUse.nbytes, verticesExceptNoUse, GL_STATIC_DRAW)
+        self._BuildSceneBVH()
 
-            glEnableVertexAttribArray(0)
-            glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, verticesExceptNoUse.itemsize * self.numVertexComponentsInModel, ctypes.c_void_p(0))
+    def _BuildSceneBVH(self):
+        self.sceneItemKeys = list(self.modelsDataDict.keys())
 
-            glBindVertexArray(self.modelsNormalVAO[i])
+        boxMins = np.zeros((len(self.sceneItemKeys), 3), dtype = np.float64)
+        boxMaxs = np.zeros((len(self.sceneItemKeys), 3), dtype = np.float64)
 
-            glBindBuffer(GL_ARRAY_BUFFER, self.modelsNormalVBO[i])
-            glBufferData(GL_ARRAY_BUFFER, normalVertices.nbytes, normalVertices, GL_STATIC_DRAW)
+        for item in range(len(self.sceneItemKeys)):
+            modelDataDict = self.modelsDataDict[self.sceneItemKeys[item]]
+            modelDataDict['SceneItem'] = item
 
-            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.modelsNormalEBO[i])
-            glBufferData(GL_ELEMENT_ARRAY_BUFFER, normalIndices.nbytes, normalIndices, GL_STATIC_DRAW)
+            boxMins[item], boxMaxs[item] = self._ComputeModelWorldBox(modelDataDict)
 
-            glEnableVertexAttribArray(0)
-            glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, normalVertices.itemsize * self.numVertexComponentsInModel, ctypes.c_void_p(0))            
+        self.sceneBVH.Build(boxMins, boxMaxs)
 
-        glBindVertexArray(0)
-        glBindBuffer(GL_ARRAY_BUFFER, 0)        
+    def _RefitSceneBVH(self, key):
+        modelDataDict = self.modelsDataDict[key]
+
+        boxMin, boxMax = self._ComputeModelWorldBox(modelDataDict)
+
+        self.sceneBVH.Refit([modelDataDict['SceneItem']], boxMin, boxMax)
+
+    def _ComputeModelWorldBox(self, modelDataDict):
+        boundingCenter, boundingExtents = self.frustum.TransformBox(self.models[modelDataDict['Index']].GetBoundingBox(), modelDataDict['Transform'].GetModelMat())
+
+        return boundingCenter - boundingExtents, boundingCenter + boundingExtents
 
     def _InitializeDrawingStuff(self):
+        self.transformTable.Clear()
+
         self._InitializeObjects()
 
         self._InitializeModels()
@@ -1723,7 +4710,7 @@ class TestProgram:
             'Object' : {},
             'Model' : {},            
             'RenderElement' : {'Vertex' : False, 'Edge' : True, 'Face' : True, 'Normal' : False},
-            'RenderViewType' : {'BackFace' : True, 'Lighting' : False},
+            'RenderViewType' : {'BackFace' : True, 'Lighting' : False, 'LOD' : True},
             'TestExample' : {},
             'TestThing' : {}
             }
@@ -1819,26 +4806,37 @@ class TestProgram:
         self.GUIVBO = glGenBuffers(self.numGUIStuff)
         self.GUIEBO = glGenBuffers(self.numGUIStuff)
 
+        vertexFormat = VertexFormat()
+        vertexFormat.AddAttribute(0, 3, GL_FLOAT)
+        vertexFormat.AddAttribute(1, 4, GL_UNSIGNED_BYTE, True)
+
+        self.GUIStuffIndexTypes.clear()
+
         for i in range(self.numGUIStuff):
+            vertices = vertexFormat.Pack(self.GUIStuffVerticesList[i], self.numVertexComponents)
+            indices, indexType = vertexFormat.PackIndices(self.GUIStuffIndicesList[i], int(len(self.GUIStuffVerticesList[i]) / self.numVertexComponents))
+
+            self.GUIStuffIndexTypes.append(indexType)
+
             glBindVertexArray(self.GUIVAO[i])
 
             glBindBuffer(GL_ARRAY_BUFFER, self.GUIVBO[i])
-            glBufferData(GL_ARRAY_BUFFER, self.GUIStuffVerticesList[i].nbytes, self.GUIStuffVerticesList[i], GL_STATIC_DRAW)
+            glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
 
             glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.GUIEBO[i])
-            glBufferData(GL_ELEMENT_ARRAY_BUFFER, self.GUIStuffIndicesList[i].nbytes, self.GUIStuffIndicesList[i], GL_STATIC_DRAW)
-
-            glEnableVertexAttribArray(0)
-            glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, self.GUIStuffVerticesList[i].itemsize * self.numVertexComponents, ctypes.c_void_p(0))
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
 
-            glEnableVertexAttribArray(1)
-            glVertexAttribPointer(1, 4, GL_FLOAT, GL_FALSE, self.GUIStuffVerticesList[i].itemsize * self.numVertexComponents, ctypes.c_void_p(self.GUIStuffVerticesList[i].itemsize * 3))
+            vertexFormat.Setup()
 
         glBindVertexArray(0)
         glBindBuffer(GL_ARRAY_BUFFER, 0)        
 
         gSceneManager.AddSpecificProgramArgs(gSceneManager.GetColor('DefaultColor_', 7), [1105, 17], 0, 1, 'Medium', '# ' + self.programName)
 
+        self.statsArgsIndex = gSceneManager.GetNumSpecificProgramArgs()
+
+        gSceneManager.AddSpecificProgramArgs(gSceneManager.GetColor('DefaultColor_', 7), [screenPos[0][0] + 10, screenPos[0][1] + 70], 15, 9, 'Medium', '', '', '', '', '', '', '', '', '')
+
     def _ImguiTextPreOrderRecursively(self, hierarchyDict, key, value, numSpace = 0):
         if isinstance(value, dict) == True:
             for sKey, sValue in hierarchyDict[key].items():
@@ -1892,6 +4890,7 @@ class TestProgram:
                             clicked, value = imgui.checkbox(key, value)
                             self.imguiInspector['Object'][key] = value
                             if clicked == True:
+                                self.commandListDirty = True
                                 if value == True:
                                     self.selectedObjectKey = key
                                 else:
@@ -1899,20 +4898,20 @@ class TestProgram:
                         imgui.tree_pop()
                     if self.selectedObjectKey != "None":
                         if imgui.tree_node('Transformation (' + self.selectedObjectKey + ')', flags = imgui.TREE_NODE_DEFAULT_OPEN):
-                            values = self.objectsDataDict[self.selectedObjectKey]['Position']
+                            values = self.objectsDataDict[self.selectedObjectKey]['Transform'].GetPosition()
                             _, values = imgui.slider_float3('Position', *values, min_value = -20.0, max_value = 20.0, format = '%0.2f')
-                            self.objectsDataDict[self.selectedObjectKey]['Position'] = values
+                            self.objectsDataDict[self.selectedObjectKey]['Transform'].SetPosition(values)
 
-                            values = self.objectsDataDict[self.selectedObjectKey]['Rotation']
+                            values = self.objectsDataDict[self.selectedObjectKey]['Transform'].GetRotation()
                             _, values = imgui.slider_float3('Rotation', *values, min_value = 0.0, max_value = 360.0, format = '%0.2f')
-                            self.objectsDataDict[self.selectedObjectKey]['Rotation'] = values
+                            self.objectsDataDict[self.selectedObjectKey]['Transform'].SetRotation(values)
 
-                            value = self.objectsDataDict[self.selectedObjectKey]['Scale']
+                            value = self.objectsDataDict[self.selectedObjectKey]['Transform'].GetScale()
                             _, value = imgui.slider_float(' ', value, min_value = 0.01, max_value = 100.0, format = '%0.2f')
-                            self.objectsDataDict[self.selectedObjectKey]['Scale'] = value
-                            value = self.objectsDataDict[self.selectedObjectKey]['Scale']
+                            self.objectsDataDict[self.selectedObjectKey]['Transform'].SetScale(value)
+                            value = self.objectsDataDict[self.selectedObjectKey]['Transform'].GetScale()
                             _, value = imgui.input_float('Scale', value, step = 0.01, format = '%0.2f')
-                            self.objectsDataDict[self.selectedObjectKey]['Scale'] = value
+                            self.objectsDataDict[self.selectedObjectKey]['Transform'].SetScale(value)
                             imgui.tree_pop()
                     imgui.end_tab_item()
                 if imgui.begin_tab_item('Model', flags = self.imguiTabItemFlags).selected:
@@ -1921,6 +4920,7 @@ class TestProgram:
                             clicked, value = imgui.checkbox(key, value)
                             self.imguiInspector['Model'][key] = value
                             if clicked == True:
+                                self.commandListDirty = True
                                 if value == True:
                                     self.selectedModelKey = key
                                 else:
@@ -1928,33 +4928,62 @@ class TestProgram:
                         imgui.tree_pop()
                     if self.selectedModelKey != "None":
                         if imgui.tree_node('Transformation (' + self.selectedModelKey + ')', flags = imgui.TREE_NODE_DEFAULT_OPEN):
-                            values = self.modelsDataDict[self.selectedModelKey]['Position']
-                            _, values = imgui.slider_float3('Position', *values, min_value = -20.0, max_value = 20.0, format = '%0.2f')
-                            self.modelsDataDict[self.selectedModelKey]['Position'] = values
-
-                            values = self.modelsDataDict[self.selectedModelKey]['Rotation']
-                            _, values = imgui.slider_float3('Rotation', *values, min_value = 0.0, max_value = 360.0, format = '%0.2f')
-                            self.modelsDataDict[self.selectedModelKey]['Rotation'] = values
-
-                            value = self.modelsDataDict[self.selectedModelKey]['Scale']
-                            _, value = imgui.slider_float(' ', value, min_value = 0.01, max_value = 100.0, format = '%0.2f')
-                            self.modelsDataDict[self.selectedModelKey]['Scale'] = value
-                            value = self.modelsDataDict[self.selectedModelKey]['Scale']
-                            _, value = imgui.input_float('Scale', value, step = 0.01, format = '%0.2f')
-                            self.modelsDataDict[self.selectedModelKey]['Scale'] = value
+                            values = self.modelsDataDict[self.selectedModelKey]['Transform'].GetPosition()
+                            positionChanged, values = imgui.slider_float3('Position', *values, min_value = -20.0, max_value = 20.0, format = '%0.2f')
+                            self.modelsDataDict[self.selectedModelKey]['Transform'].SetPosition(values)
+
+                            values = self.modelsDataDict[self.selectedModelKey]['Transform'].GetRotation()
+                            rotationChanged, values = imgui.slider_float3('Rotation', *values, min_value = 0.0, max_value = 360.0, format = '%0.2f')
+                            self.modelsDataDict[self.selectedModelKey]['Transform'].SetRotation(values)
+
+                            value = self.modelsDataDict[self.selectedModelKey]['Transform'].GetScale()
+                            scaleSliderChanged, value = imgui.slider_float(' ', value, min_value = 0.01, max_value = 100.0, format = '%0.2f')
+                            self.modelsDataDict[self.selectedModelKey]['Transform'].SetScale(value)
+                            value = self.modelsDataDict[self.selectedModelKey]['Transform'].GetScale()
+                            scaleInputChanged, value = imgui.input_float('Scale', value, step = 0.01, format = '%0.2f')
+                            self.modelsDataDict[self.selectedModelKey]['Transform'].SetScale(value)
+
+                            if positionChanged == True or rotationChanged == True or scaleSliderChanged == True or scaleInputChanged == True:
+                                self._RefitSceneBVH(self.selectedModelKey)
+                            imgui.tree_pop()
+                        if imgui.tree_node('Loading (' + self.selectedModelKey + ')', flags = imgui.TREE_NODE_DEFAULT_OPEN):
+                            model = self.models[self.modelsDataDict[self.selectedModelKey]['Index']]
+                            if model.GetCacheHit() == True:
+                                imgui.text('Parse : Cached')
+                            else:
+                                imgui.text('Parse : {0: 0.3f} s ({1: 0.2f} MB/s)'.format(model.GetParseTime(), model.GetParseThroughput()))
+                                imgui.text('Normal : {0: 0.3f} s'.format(model.GetNormalTime()))
+                            imgui.text('Cache : {0} Hit, {1} Miss, {2} Write Failed ({3: 0.2f} s Saved)'.format(gModelCache.GetNumHits(), gModelCache.GetNumMisses(), gModelCache.GetNumWriteFailures(), gModelCache.GetSavedTime()))
+                            imgui.text('Load : {0: 0.3f} s ({1} Workers)'.format(gModelLoader.GetLoadTime(), gModelLoader.GetNumWorkers()))
+                            imgui.text('Mesh : {0} Vertices, {1} Faces ({2: 0.2f} MB)'.format(model.GetNumVertices(), model.GetNumFaces(), self.modelsDataDict[self.selectedModelKey]['GPUMemorySize'] / (1024.0 * 1024.0)))
+                            vertexCacheStats = model.GetVertexCacheStats()
+                            if vertexCacheStats[0] > 0.0:
+                                imgui.text('ACMR : {0: 0.3f} -> {1: 0.3f}'.format(vertexCacheStats[0], vertexCacheStats[2]))
+                                imgui.text('ATVR : {0: 0.3f} -> {1: 0.3f}'.format(vertexCacheStats[1], vertexCacheStats[3]))
                             imgui.tree_pop()
                     self.imguiTabItemFlags = 0
                     imgui.end_tab_item()
                 if imgui.begin_tab_item('Render').selected:
                     if imgui.tree_node('Elememt', flags = imgui.TREE_NODE_DEFAULT_OPEN):
                         for key, value in self.imguiInspector['RenderElement'].items():
-                            _, value = imgui.checkbox(key, value)
+                            clicked, value = imgui.checkbox(key, value)
                             self.imguiInspector['RenderElement'][key] = value
+                            if clicked == True:
+                                self.commandListDirty = True
                         imgui.tree_pop()
                     if imgui.tree_node('ViewType', flags = imgui.TREE_NODE_DEFAULT_OPEN):
                         for key, value in self.imguiInspector['RenderViewType'].items():
-                            _, value = imgui.checkbox(key, value)
+                            clicked, value = imgui.checkbox(key, value)
                             self.imguiInspector['RenderViewType'][key] = value
+                            if clicked == True:
+                                self.commandListDirty = True
+                        imgui.tree_pop()
+                    if imgui.tree_node('Wireframe', flags = imgui.TREE_NODE_DEFAULT_OPEN):
+                        widthChanged, self.wireframeWidth = imgui.slider_float('Width', self.wireframeWidth, min_value = 0.5, max_value = 5.0, format = '%0.1f')
+                        colorChanged, values = imgui.color_edit4('Color', *self.wireframeColor)
+                        self.wireframeColor = list(values)
+                        if (widthChanged == True or colorChanged == True) and self.imguiInspector['RenderElement']['Edge'] == True:
+                            self.commandListDirty = True
                         imgui.tree_pop()
                     imgui.end_tab_item()
                 if imgui.begin_tab_item('Test').selected:
@@ -1986,157 +5015,215 @@ class TestProgram:
 
         self._UpdateNewFrameImguiInspector(deltaTime)
 
-    def _DrawObjects(self):
-        glPushAttrib(GL_COLOR_BUFFER_BIT | GL_ENABLE_BIT)
+    def _SubmitObjects(self):
+        objectKeys = [key for key, value in self.imguiInspector['Object'].items() if value == True]
 
-        glEnable(GL_BLEND)
+        transformIndices = [self.objectsDataDict[key]['Transform'].GetIndex() for key in objectKeys]
 
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        self.recordedTransformIndices.extend(transformIndices)
 
-        for key, value in self.imguiInspector['Object'].items():
-            if value == True:
-                objectDataDict = self.objectsDataDict[key]
+        # The gather copies the rows, so the recorded matrices keep their values while later frames update the table.
+        modelMats = self.transformTable.GetModelMats()[transformIndices]
 
-                i = objectDataDict['Index']
-                indices = objectDataDict['Indices']
-                position = objectDataDict['Position']
-                rotation = objectDataDict['Rotation']
-                scale = objectDataDict['Scale']
+        for key, modelMat in zip(objectKeys, modelMats):
+            objectDataDict = self.objectsDataDict[key]
 
-                transMat = glm.translate(glm.vec3(position[0], position[1], position[2]))
+            i = objectDataDict['Index']
+            indices = objectDataDict['Indices']
 
-                #rotXMat = glm.rotate(glm.radians(rotation[0]), glm.vec3(1.0, 0.0, 0.0))
-                #rotYMat = glm.rotate(glm.radians(rotation[1]), glm.vec3(0.0, 1.0, 0.0))
-                #rotZMat = glm.rotate(glm.radians(rotation[2]), glm.vec3(0.0, 0.0, 1.0))
+            self.renderQueue.Submit(Index.RENDER_PASS_OPAQUE, Index.SHADER_DEFAULT, Index.RASTER_STATE_CULL_BACK, self.objectsVAO[i], modelMat, {}, {}, GL_TRIANGLES, len(indices), objectDataDict['IndexType'], None)
         
-                rotXMat = glm.rotate(glm.radians(self.rotDegree), glm.vec3(1.0, 0.0, 0.0))
-                rotYMat = glm.rotate(glm.radians(self.rotDegree), glm.vec3(0.0, 1.0, 0.0))
-                rotZMat = glm.rotate(glm.radians(self.rotDegree), glm.vec3(0.0, 0.0, 1.0))
+    def _SubmitModels(self):
+        numDrawnFaces = 0
+        numFullFaces = 0
 
-                #rotMat = glm.mat4()
-                rotMat = rotZMat * rotYMat * rotXMat                
-       
-                scaleMat = glm.scale(glm.vec3(scale, scale, scale))
+        self.frustum.Update(gSceneManager.GetPerspectivePrjMat() * gSceneManager.GetView3DMat())
 
-                modelMat = transMat * rotMat * scaleMat
+        visibleItems = set(self.sceneBVH.QueryFrustum(self.frustum.GetPlanes()).tolist())
 
-                shader = gSceneManager.GetShader(Index.SHADER_DEFAULT)
+        screenSize = gSceneManager.GetScreenSize()
 
-                shader.Use()
-                shader.SetMat4('modelMat', modelMat)         
+        wireframeShader = gSceneManager.GetShader(Index.SHADER_WIREFRAME)
 
-                glBindVertexArray(self.objectsVAO[i])
-                glDrawElements(GL_TRIANGLES, len(indices), GL_UNSIGNED_INT, None)
+        wireframeShader.Use()
+        wireframeShader.SetVec2('viewportSize', screenSize[0], screenSize[1])
+        wireframeShader.SetBool('useUniformColor', True)
+        wireframeShader.SetVec4('uniformColor', 1.0, 0.0, 0.0, 1.0)
+        wireframeShader.SetVec4('backColor', 0.0, 1.0, 0.0, 1.0)
+        wireframeShader.SetVec4('wireframeColor', *self.wireframeColor)
+        wireframeShader.SetFloat('wireframeWidth', self.wireframeWidth)
 
-        glBindVertexArray(0)
+        modelKeys = [key for key, value in self.imguiInspector['Model'].items() if value == True]
 
-        glPopAttrib()
-        
-    def _DrawModels(self):
-        glPushAttrib(GL_COLOR_BUFFER_BIT | GL_ENABLE_BIT | GL_POINT_BIT | GL_LINE_BIT | GL_POLYGON_BIT)
+        # A culled model that moves may come into view, so culled models are recorded too.
+        self.recordedTransformIndices.extend([self.modelsDataDict[key]['Transform'].GetIndex() for key in modelKeys])
 
-        glEnable(GL_BLEND)
+        visibleModelKeys = [key for key in modelKeys if self.modelsDataDict[key]['SceneItem'] in visibleItems]
 
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        self.numDrawnModels = len(visibleModelKeys)
+        self.numCulledModels = len(modelKeys) - len(visibleModelKeys)
 
-        for key, value in self.imguiInspector['Model'].items():
-            if value == True:
-                modelDataDict = self.modelsDataDict[key]
+        transformIndices = [self.modelsDataDict[key]['Transform'].GetIndex() for key in visibleModelKeys]
 
-                i = modelDataDict['Index']                
-                indices = modelDataDict['Indices']
-                verticesExceptNoUse = modelDataDict['VerticesExceptNoUse']
-                normalIndices = modelDataDict['NormalIndices']
-                position = modelDataDict['Position']
-                rotation = modelDataDict['Rotation']
-                scale = modelDataDict['Scale']
+        modelMats = self.transformTable.GetModelMats()[transformIndices]
 
-                transMat = glm.translate(glm.vec3(position[0], position[1], position[2]))
+        # Rows are stored transposed, so modelMat * DequantizeMat is DequantizeMat @ modelMat here, for every model in one call.
+        dequantizeMats = np.array([self.modelsDataDict[key]['DequantizeMat'] for key in visibleModelKeys], dtype = np.float32).reshape(-1, 4, 4)
+        drawMats = dequantizeMats @ modelMats
 
-                rotXMat = glm.rotate(glm.radians(rotation[0]), glm.vec3(1.0, 0.0, 0.0))
-                rotYMat = glm.rotate(glm.radians(rotation[1]), glm.vec3(0.0, 1.0, 0.0))
-                rotZMat = glm.rotate(glm.radians(rotation[2]), glm.vec3(0.0, 0.0, 1.0))
-                
-                #rotMat = glm.mat4()
-                rotMat = rotZMat * rotYMat * rotXMat
+        if self.imguiInspector['RenderViewType']['LOD'] == True:
+            boundingSpheres = np.array([self.models[self.modelsDataDict[key]['Index']].GetBoundingSphere() for key in visibleModelKeys], dtype = np.float32).reshape(-1, 4)
+            worldCenters = np.einsum('ki,kij->kj', boundingSpheres[:, 0 : 3], modelMats[:, 0 : 3, 0 : 3]) + modelMats[:, 3, 0 : 3]
 
-                scaleMat = glm.scale(glm.vec3(scale, scale, scale))
+            viewMat = np.array(gSceneManager.GetView3DMat(), dtype = np.float32)
 
-                modelMat = transMat * rotMat * scaleMat
+            # Distance from the camera to the nearest point of each bounding sphere.
+            lodDepths = -(worldCenters @ viewMat[2, 0 : 3] + viewMat[2, 3]) - boundingSpheres[:, 3] * self.transformTable.GetScales()[transformIndices]
 
-                shader = gSceneManager.GetShader(Index.SHADER_SIMPLE_USE_UNIFORMCOLOR)
-        
-                shader.Use()
-                shader.SetMat4('modelMat', modelMat)        
-                shader.SetBool('useUniformColor', True)        
+        for k in range(len(visibleModelKeys)):
+            modelDataDict = self.modelsDataDict[visibleModelKeys[k]]
+
+            i = modelDataDict['Index']                
+            indices = modelDataDict['Indices']
+            normalIndices = modelDataDict['NormalIndices']
+            scale = modelDataDict['Transform'].GetScale()
 
-                if self.imguiInspector['RenderElement']['Face'] == True:
-                    glCullFace(GL_BACK)
+            lodLevel = 0
 
-                    shader.SetVec4('uniformColor', 1.0, 0.0, 0.0, 1.0)
-                    glPolygonMode(GL_FRONT, GL_FILL)
+            if self.imguiInspector['RenderViewType']['LOD'] == True:
+                lodLevel = self._SelectLOD(modelDataDict, float(lodDepths[k]), scale)
 
-                    glBindVertexArray(self.modelsVAO[i])
-                    glDrawElements(GL_TRIANGLES, len(indices), GL_UNSIGNED_INT, None)
+            numLODIndices, lodIndexOffset, lodError = modelDataDict['LODs'][lodLevel]
 
-                if self.imguiInspector['RenderViewType']['BackFace'] == True:
-                    glCullFace(GL_FRONT)
+            numDrawnFaces += int(numLODIndices / 3)
+            numFullFaces += int(len(indices) / 3)
 
-                    shader.SetVec4('uniformColor', 0.0, 1.0, 0.0, 1.0)
-                    glPolygonMode(GL_BACK, GL_FILL)
+            modelMat = drawMats[k]
 
-                    glBindVertexArray(self.modelsVAO[i])
-                    glDrawElements(GL_TRIANGLES, len(indices), GL_UNSIGNED_INT, None)
+            drawFace = self.imguiInspector['RenderElement']['Face']
+            drawEdge = self.imguiInspector['RenderElement']['Edge']
+            drawBackFace = self.imguiInspector['RenderViewType']['BackFace']
 
-                if self.imguiInspector['RenderElement']['Edge'] == True:
-                    glDisable(GL_CULL_FACE)
+            # Front and back faces share one unculled draw, gl_FrontFacing picks the color.
+            twoSided = drawFace == True and drawBackFace == True
+
+            if twoSided == True:
+                faceRasterState = Index.RASTER_STATE_TWO_SIDED
+            else:
+                faceRasterState = Index.RASTER_STATE_CULL_BACK
 
-                    glEnable(GL_POLYGON_OFFSET_LINE)
-                    #glPolygonOffset(self.imguiTest['factor'], self.imguiTest['units'])
-                    glPolygonOffset(-0.5, 0.0)
+            # Face and Edge share one draw, the wireframe shader blends edges in from barycentric distances.
+            if drawEdge == True:
+                if drawFace == True:
+                    self.renderQueue.Submit(Index.RENDER_PASS_OPAQUE, Index.SHADER_WIREFRAME, faceRasterState, self.modelsVAO[i], modelMat, {'drawFace' : True, 'twoSided' : twoSided}, {}, GL_TRIANGLES, numLODIndices, modelDataDict['IndexType'], lodIndexOffset)
+                else:
+                    self.renderQueue.Submit(Index.RENDER_PASS_OVERLAY, Index.SHADER_WIREFRAME, Index.RASTER_STATE_TWO_SIDED, self.modelsVAO[i], modelMat, {'drawFace' : False, 'twoSided' : False}, {}, GL_TRIANGLES, numLODIndices, modelDataDict['IndexType'], lodIndexOffset)
 
-                    shader.SetVec4('uniformColor', 1.0, 1.0, 1.0, 1.0)
-                    glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
+            if drawFace == True and drawEdge == False:
+                self.renderQueue.Submit(Index.RENDER_PASS_OPAQUE, Index.SHADER_SIMPLE_USE_UNIFORMCOLOR, faceRasterState, self.modelsVAO[i], modelMat, {'useUniformColor' : True, 'twoSided' : twoSided}, {'uniformColor' : (1.0, 0.0, 0.0, 1.0), 'backColor' : (0.0, 1.0, 0.0, 1.0)}, GL_TRIANGLES, numLODIndices, modelDataDict['IndexType'], lodIndexOffset)
 
-                    glLineWidth(1.0)
+            if drawBackFace == True and drawFace == False:
+                self.renderQueue.Submit(Index.RENDER_PASS_OPAQUE, Index.SHADER_SIMPLE_USE_UNIFORMCOLOR, Index.RASTER_STATE_CULL_FRONT, self.modelsVAO[i], modelMat, {'useUniformColor' : True, 'twoSided' : False}, {'uniformColor' : (0.0, 1.0, 0.0, 1.0)}, GL_TRIANGLES, numLODIndices, modelDataDict['IndexType'], lodIndexOffset)
 
-                    glBindVertexArray(self.modelsVAO[i])
-                    glDrawElements(GL_TRIANGLES, len(indices), GL_UNSIGNED_INT, None)
+            if self.imguiInspector['RenderElement']['Vertex'] == True:
+                self.renderQueue.Submit(Index.RENDER_PASS_OVERLAY, Index.SHADER_SIMPLE_USE_UNIFORMCOLOR, Index.RASTER_STATE_POINTS, self.modelsVAO[i], modelMat, {'useUniformColor' : True}, {'uniformColor' : (0.0, 0.0, 1.0, 1.0)}, GL_POINTS, self.models[i].GetNumVertices())
 
-                if self.imguiInspector['RenderElement']['Vertex'] == True:
-                    glEnable(GL_POINT_SMOOTH)
-                    glPointSize(5.0)
+            if self.imguiInspector['RenderElement']['Normal'] == True:
+                self.renderQueue.Submit(Index.RENDER_PASS_OVERLAY, Index.SHADER_SIMPLE_USE_UNIFORMCOLOR, Index.RASTER_STATE_LINES, self.modelsVAO[i], modelMat, {'useUniformColor' : True}, {'uniformColor' : (1.0, 1.0, 0.0, 1.0)}, GL_LINES, len(normalIndices), modelDataDict['IndexType'], modelDataDict['NormalIndexOffset'])
 
-                    shader.SetVec4('uniformColor', 0.0, 0.0, 1.0, 1.0)
+        if numFullFaces > 0:
+            gSceneManager.SetSpecificProgramArgs(self.statsArgsIndex, Index.SPECIFIC_PROGRAM_INFO_TEXT_START, 'LOD Triangles : {0} / {1} ({2: 0.1f}%)'.format(numDrawnFaces, numFullFaces, numDrawnFaces * 100.0 / numFullFaces))
+        else:
+            gSceneManager.SetSpecificProgramArgs(self.statsArgsIndex, Index.SPECIFIC_PROGRAM_INFO_TEXT_START, '')
 
-                    glBindVertexArray(self.modelsVerticesExceptNoUseVAO[i])
-                    glDrawArrays(GL_POINTS, 0, self.models[i].GetNumVerticesExceptNoUse())
+        gSceneManager.SetSpecificProgramArgs(self.statsArgsIndex, Index.SPECIFIC_PROGRAM_INFO_TEXT_START + 2, 'Models : {0} Drawn, {1} Culled'.format(self.numDrawnModels, self.numCulledModels))
 
-                if self.imguiInspector['RenderElement']['Normal'] == True:
-                    shader.SetVec4('uniformColor', 1.0, 1.0, 0.0, 1.0)
+    def _SelectLOD(self, modelDataDict, depth, scale):
+        if depth <= 0.0:
+            return 0
 
-                    glLineWidth(1.0)
+        pixelsPerUnit = gSceneManager.GetPerspectivePrjMat()[1][1] * gSceneManager.GetScreenSize()[1] * 0.5 / depth
 
-                    glBindVertexArray(self.modelsNormalVAO[i])
-                    glDrawElements(GL_LINES, len(normalIndices), GL_UNSIGNED_INT, None)
+        lodLevel = 0
+        lods = modelDataDict['LODs']
 
-        glBindVertexArray(0)
+        # The coarsest level whose simplification error still projects below lodPixelError is used.
+        for level in range(1, len(lods)):
+            if lods[level][2] * scale * pixelsPerUnit <= self.lodPixelError:
+                lodLevel = level
 
-        glPopAttrib()
+        return lodLevel
         
     def _DrawDrawingStuff(self):
-        self._DrawObjects()
+        if self.GetNeedsSceneRedraw() == True:
+            self.renderQueue.Clear()
+
+            self.recordedTransformIndices.clear()
+
+            # Submissions read the table rows directly, so edits made since Update are applied first.
+            self.transformTable.Update()
+
+            self._SubmitObjects()
         
-        self._DrawModels()
+            self._SubmitModels()
+
+            self.renderQueue.Sort()
+
+            self.commandList.Record(self.renderQueue.GetItems())
+
+            self.commandListDirty = False
+            self.recordedTransformsChanged = False
+            self.commandListViewVersion = gSceneManager.GetViewVersion()
+
+        gGLStateCache.PushState()
+
+        gGLStateCache.Enable(GL_BLEND)
+
+        gGLStateCache.BlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+        self.commandList.Replay()
+
+        gGLStateCache.PopState()
+
+    def _UpdateFrameStats(self):
+        deltaTime = gSceneManager.GetDeltaTime()
+
+        if deltaTime > 0.0:
+            sceneText = 'Redrawn'
+
+            if gSceneManager.GetSceneCached() == True:
+                sceneText = 'Cached'
+
+            framePacer = gSceneManager.GetFramePacer()
+
+            gSceneManager.SetSpecificProgramArgs(self.statsArgsIndex, Index.SPECIFIC_PROGRAM_INFO_TEXT_START + 1, 'Frame Time : {0: 0.2f} ms (Max {1: 0.2f}, Wait {2: 0.2f}, Scene {3})'.format(deltaTime * 1000.0, framePacer.GetMaxFrameTime() * 1000.0, framePacer.GetLastWaitTime() * 1000.0, sceneText))
+
+        gSceneManager.SetSpecificProgramArgs(self.statsArgsIndex, Index.SPECIFIC_PROGRAM_INFO_TEXT_START + 4, 'Transforms : {0} Recomputed'.format(self.numTransformRecomputes))
+
+        if gSceneManager.GetDebug() == True:
+            numMat4Uploads = max(gSceneManager.GetNumMat4Uploads(), 1)
+
+            mat4UploadTime = gSceneManager.GetMat4UploadTime() / numMat4Uploads
+            mat4CopyTime = gSceneManager.GetMat4CopyTime() / numMat4Uploads
+
+            gSceneManager.SetSpecificProgramArgs(self.statsArgsIndex, Index.SPECIFIC_PROGRAM_INFO_TEXT_START + 5, 'Uniforms : {0} Uploads ({1: 0.3f} ms), Mat4 {2: 0.2f} us (Was {3: 0.2f} us With Copy)'.format(gSceneManager.GetNumUniformUploads(), gSceneManager.GetUniformUploadTime() * 1000.0, mat4UploadTime * 1000000.0, (mat4UploadTime + mat4CopyTime) * 1000000.0))
+        else:
+            gSceneManager.SetSpecificProgramArgs(self.statsArgsIndex, Index.SPECIFIC_PROGRAM_INFO_TEXT_START + 5, 'Uniforms : Profiled In Debug(B)')
+
+        gSceneManager.SetSpecificProgramArgs(self.statsArgsIndex, Index.SPECIFIC_PROGRAM_INFO_TEXT_START + 6, 'GL State : {0} Issued, {1} Skipped'.format(gGLStateCache.GetNumIssuedCalls(), gGLStateCache.GetNumSkippedCalls()))
+
+        gSceneManager.SetSpecificProgramArgs(self.statsArgsIndex, Index.SPECIFIC_PROGRAM_INFO_TEXT_START + 7, 'Render Queue : {0} Items, {1} State Changes ({2} Unsorted)'.format(self.renderQueue.GetNumItems(), self.renderQueue.GetNumStateTransitions(), self.renderQueue.GetNumUnsortedStateTransitions()))
+
+        gSceneManager.SetSpecificProgramArgs(self.statsArgsIndex, Index.SPECIFIC_PROGRAM_INFO_TEXT_START + 8, 'Command List : {0} Commands, {1} Replays / {2} Records'.format(self.commandList.GetNumCommands(), self.commandList.GetNumReplays(), self.commandList.GetNumRecords()))
 
     def _DrawGUI(self):
-        glPushAttrib(GL_COLOR_BUFFER_BIT | GL_ENABLE_BIT | GL_LINE_BIT)
+        gGLStateCache.PushState()
 
-        glDisable(GL_DEPTH_TEST)
+        gGLStateCache.Disable(GL_DEPTH_TEST)
 
-        glEnable(GL_BLEND)
+        gGLStateCache.Enable(GL_BLEND)
 
-        glBlendFunc(GL_SRC_ALPHA, GL_ZERO)
+        gGLStateCache.BlendFunc(GL_SRC_ALPHA, GL_ZERO)
 
         shader = gSceneManager.GetShader(Index.SHADER_DEFAULT)
 
@@ -2146,25 +5233,29 @@ class TestProgram:
 
         GUIStuffIndex = 0
         
-        glBindVertexArray(self.GUIVAO[GUIStuffIndex])
-        glDrawElements(GL_TRIANGLES, len(self.GUIStuffIndicesList[GUIStuffIndex]), GL_UNSIGNED_INT, None)        
+        gGLStateCache.BindVertexArray(self.GUIVAO[GUIStuffIndex])
+        glDrawElements(GL_TRIANGLES, len(self.GUIStuffIndicesList[GUIStuffIndex]), self.GUIStuffIndexTypes[GUIStuffIndex], None)        
         
         GUIStuffIndex += 1
 
-        glLineWidth(2.0)
+        gGLStateCache.LineWidth(2.0)
 
-        glBindVertexArray(self.GUIVAO[GUIStuffIndex])
-        glDrawElements(GL_LINES, len(self.GUIStuffIndicesList[GUIStuffIndex]), GL_UNSIGNED_INT, None)
+        gGLStateCache.BindVertexArray(self.GUIVAO[GUIStuffIndex])
+        glDrawElements(GL_LINES, len(self.GUIStuffIndicesList[GUIStuffIndex]), self.GUIStuffIndexTypes[GUIStuffIndex], None)
         
-        glBindVertexArray(0)
+        gGLStateCache.BindVertexArray(0)
 
-        glPopAttrib()
+        gGLStateCache.PopState()
 
 
 def HandleWindowSizeCallback(glfwWindow, width, height):
     glViewport(0, 0, width, height)    
 
+    gSceneManager.RequestRedraw()
+
 def HandleKeyCallback(glfwWindow, key, scanCode, action, modes):
+    gSceneManager.RequestRedraw()
+
     if action == glfw.PRESS:
         if key == glfw.KEY_ESCAPE:
             glfw.set_window_should_close(glfwWindow, glfw.TRUE)
@@ -2183,6 +5274,8 @@ def HandleKeyCallback(glfwWindow, key, scanCode, action, modes):
             gInputManager.SetKeyState(glfw.KEY_5, True)
         elif key == glfw.KEY_6:
             gInputManager.SetKeyState(glfw.KEY_6, True)
+        elif key == glfw.KEY_7:
+            gInputManager.SetKeyState(glfw.KEY_7, True)
         elif key == glfw.KEY_8:
             gInputManager.SetKeyState(glfw.KEY_8, True)
         elif key == glfw.KEY_9:
@@ -2206,6 +5299,8 @@ def HandleKeyCallback(glfwWindow, key, scanCode, action, modes):
             gInputManager.SetKeyState(glfw.KEY_V, True)
         elif key == glfw.KEY_X:
             gInputManager.SetKeyState(glfw.KEY_X, True)
+        elif key == glfw.KEY_O:
+            gInputManager.SetKeyState(glfw.KEY_O, True)
 
         if key == glfw.KEY_W:
             gInputManager.SetKeyState(glfw.KEY_W, True)
@@ -2253,10 +5348,19 @@ def HandleKeyCallback(glfwWindow, key, scanCode, action, modes):
             gInputManager.SetKeyState(glfw.KEY_DOWN, False)
 
 def HandleMouseButtonCallback(glfwWindow, button, action, mod):
+    gSceneManager.RequestRedraw()
+
     if button == glfw.MOUSE_BUTTON_LEFT:
         if action == glfw.PRESS:            
             gInputManager.SetMouseButtonClick(glfw.MOUSE_BUTTON_LEFT, True)
             gInputManager.SetLastMousePosOnClick(glfw.get_cursor_pos(glfwWindow))
+
+            screenPos = gSceneManager.GetScreenPos()
+            mousePos = glfw.get_cursor_pos(glfwWindow)
+
+            if gSceneManager.GetView3D() == True and imgui.get_io().want_capture_mouse == False:
+                if screenPos[0][0] <= mousePos[0] and mousePos[0] <= screenPos[1][0] and screenPos[0][1] <= mousePos[1] and mousePos[1] <= screenPos[1][1]:
+                    gInputManager.SetMouseButtonPress(glfw.MOUSE_BUTTON_LEFT, True)
         elif action == glfw.RELEASE:            
             gInputManager.SetMouseButtonClick(glfw.MOUSE_BUTTON_LEFT, False)
 
@@ -2285,6 +5389,8 @@ def HandleMouseButtonCallback(glfwWindow, button, action, mod):
             gInputManager.SetMouseButtonClick(glfw.MOUSE_BUTTON_RIGHT, False)            
 
 def HandleCursorPosCallback(glfwWindow, xPos, yPos):
+    gSceneManager.RequestRedraw()
+
     screenPos = gSceneManager.GetScreenPos()
 
     if xPos < screenPos[0][0] or screenPos[1][0] < xPos:
@@ -2377,22 +5483,16 @@ def InitializeGLFW(projectName):
 def TestExampleCircularArrangement(testProgram):    
     models = testProgram.GetModels()
     modelsDataDict = testProgram.GetModelsDataDict()
-    modelKeys = []
+    modelEntries = []
 
-    modelKeys.append('Armadillo')
-    models.append(Model('../../Resource/Object/armadillo.obj', 1.0))
-        
-    modelKeys.append('Spot')
-    models.append(Model('../../Resource/Object/spot.obj', 0.01))
-        
-    modelKeys.append('StanfordBunny')
-    models.append(Model('../../Resource/Object/stanford-bunny.obj', 0.001))
-        
-    modelKeys.append('Teapot')
-    models.append(Model('../../Resource/Object/teapot.obj', 0.05))
-        
-    modelKeys.append('XYZDragon')
-    models.append(Model('../../Resource/Object/xyzrgb_dragon.obj', 1.0))
+    modelEntries.append(('Armadillo', '../../Resource/Object/armadillo.obj', 1.0))
+    modelEntries.append(('Spot', '../../Resource/Object/spot.obj', 0.01))
+    modelEntries.append(('StanfordBunny', '../../Resource/Object/stanford-bunny.obj', 0.001))
+    modelEntries.append(('Teapot', '../../Resource/Object/teapot.obj', 0.05))
+    modelEntries.append(('XYZDragon', '../../Resource/Object/xyzrgb_dragon.obj', 1.0))
+
+    modelKeys = [modelEntry[0] for modelEntry in modelEntries]
+    models.extend(gModelLoader.LoadModels(modelEntries))
 
     numModels = len(models)
 
@@ -2400,77 +5500,54 @@ def TestExampleCircularArrangement(testProgram):
         modelDataDict = {}
 
         modelDataDict['Index'] = i
-        modelDataDict['Vertices'] = np.array(models[i].GetVertices(), dtype = np.float32)
-        modelDataDict['Indices'] = np.array(models[i].GetIndices(), dtype = np.uint32)
-        modelDataDict['VerticesExceptNoUse'] = np.array(models[i].GetVerticesExceptNoUse(), dtype = np.float32)
-        modelDataDict['NormalVertices'] = np.array(models[i].GetNormalLineVertices(), dtype = np.float32)
-        modelDataDict['NormalIndices'] = np.array(models[i].GetNormalLineIndices(), dtype = np.uint32)
-        modelDataDict['Position'] = [0.0, 0.0, 0.0]
-        modelDataDict['Rotation'] = [0.0, 0.0, 0.0]
-        modelDataDict['Scale'] = 1.0
+        modelDataDict['Vertices'] = models[i].GetVertices()
+        modelDataDict['Indices'] = models[i].GetIndices()
+        modelDataDict['NormalVertices'] = models[i].GetNormalLineVertices()
+        modelDataDict['NormalIndices'] = models[i].GetNormalLineIndices()
+        modelDataDict['Transform'] = testProgram.GetTransformTable().Add()
 
         modelsDataDict[modelKeys[i]] = modelDataDict
 
-    modelsDataDict['Armadillo']['Position'] = [-2.0, 0.0, 5.5]
-    modelsDataDict['Armadillo']['Rotation'] = [0.0, 190.5, 0.0]
-    modelsDataDict['Armadillo']['Scale'] = 0.02
+    modelsDataDict['Armadillo']['Transform'].SetPosition([-2.0, 0.0, 5.5])
+    modelsDataDict['Armadillo']['Transform'].SetRotation([0.0, 190.5, 0.0])
+    modelsDataDict['Armadillo']['Transform'].SetScale(0.02)
 
-    modelsDataDict['Spot']['Position'] = [3.5, 0.0, 5.0]
-    modelsDataDict['Spot']['Rotation'] = [0.0, 170.5, 0.0]
-    modelsDataDict['Spot']['Scale'] = 2.0
+    modelsDataDict['Spot']['Transform'].SetPosition([3.5, 0.0, 5.0])
+    modelsDataDict['Spot']['Transform'].SetRotation([0.0, 170.5, 0.0])
+    modelsDataDict['Spot']['Transform'].SetScale(2.0)
 
-    modelsDataDict['StanfordBunny']['Position'] = [1.3, 0.0, -9.5]
-    modelsDataDict['StanfordBunny']['Rotation'] = [0.0, 30.5, 0.0]
-    modelsDataDict['StanfordBunny']['Scale'] = 20.0
+    modelsDataDict['StanfordBunny']['Transform'].SetPosition([1.3, 0.0, -9.5])
+    modelsDataDict['StanfordBunny']['Transform'].SetRotation([0.0, 30.5, 0.0])
+    modelsDataDict['StanfordBunny']['Transform'].SetScale(20.0)
 
-    modelsDataDict['Teapot']['Position'] = [6.5, 0.0, -3.0]
-    modelsDataDict['Teapot']['Rotation'] = [0.0, 185.0, 16.0]
-    modelsDataDict['Teapot']['Scale'] = 0.7
+    modelsDataDict['Teapot']['Transform'].SetPosition([6.5, 0.0, -3.0])
+    modelsDataDict['Teapot']['Transform'].SetRotation([0.0, 185.0, 16.0])
+    modelsDataDict['Teapot']['Transform'].SetScale(0.7)
 
-    modelsDataDict['XYZDragon']['Position'] = [-7.4, 0.0, -5.0]
-    modelsDataDict['XYZDragon']['Rotation'] = [31.5, 330.5, 0.0]
-    modelsDataDict['XYZDragon']['Scale'] = 0.03
+    modelsDataDict['XYZDragon']['Transform'].SetPosition([-7.4, 0.0, -5.0])
+    modelsDataDict['XYZDragon']['Transform'].SetRotation([31.5, 330.5, 0.0])
+    modelsDataDict['XYZDragon']['Transform'].SetScale(0.03)
 
 def TestExamplePlaceAll(testProgram):
     models = testProgram.GetModels()
     modelsDataDict = testProgram.GetModelsDataDict()
-    modelKeys = []
-
-    modelKeys.append('Armadillo')
-    models.append(Model('../../Resource/Object/armadillo.obj', 1.0))
-        
-    modelKeys.append('Cheburashka')
-    models.append(Model('../../Resource/Object/cheburashka.obj', 0.01))
-        
-    modelKeys.append('Ogre')
-    models.append(Model('../../Resource/Object/Ogre.obj', 0.5))
-        
-    modelKeys.append('Homer')
-    models.append(Model('../../Resource/Object/homer.obj', 0.01))
-
-    modelKeys.append('XYZDragon')
-    models.append(Model('../../Resource/Object/xyzrgb_dragon.obj', 1.0))
-
-    modelKeys.append('Horse')
-    models.append(Model('../../Resource/Object/horse.obj', 0.001))
-
-    modelKeys.append('Spot')
-    models.append(Model('../../Resource/Object/spot.obj', 0.01))
-        
-    modelKeys.append('StanfordBunny')
-    models.append(Model('../../Resource/Object/stanford-bunny.obj', 0.001))
-
-    modelKeys.append('Igea')
-    models.append(Model('../../Resource/Object/igea.obj', 0.001))
-
-    modelKeys.append('MaxPlanck')
-    models.append(Model('../../Resource/Object/max-planck.obj', 5.0))
-
-    modelKeys.append('Nefertiti')
-    models.append(Model('../../Resource/Object/nefertiti.obj', 5.0))        
-
-    modelKeys.append('Suzanne')
-    models.append(Model('../../Resource/Object/suzanne.obj', 0.1))
+    modelEntries = []
+
+    modelEntries.append(('Armadillo', '../../Resource/Object/armadillo.obj', 1.0))
+    modelEntries.append(('Cheburashka', '../../Resource/Object/cheburashka.obj', 0.01))
+    modelEntries.append(('Ogre', '../../Resource/Object/Ogre.obj', 0.5))
+    modelEntries.append(('Homer', '../../Resource/Object/homer.obj', 0.01))
+    modelEntries.append(('XYZDragon', '../../Resource/Object/xyzrgb_dragon.obj', 1.0))
+    modelEntries.append(('Horse', '../../Resource/Object/horse.obj', 0.001))
+    modelEntries.append(('Spot', '../../Resource/Object/spot.obj', 0.01))
+    modelEntries.append(('StanfordBunny', '../../Resource/Object/stanford-bunny.obj', 0.001))
+    modelEntries.append(('Igea', '../../Resource/Object/igea.obj', 0.001))
+    modelEntries.append(('MaxPlanck', '../../Resource/Object/max-planck.obj', 5.0))
+    modelEntries.append(('Nefertiti', '../../Resource/Object/nefertiti.obj', 5.0))
+    modelEntries.append(('Suzanne', '../../Resource/Object/suzanne.obj', 0.1))
+
+    modelKeys = [modelEntry[0] for modelEntry in modelEntries]
+    models.extend(gModelLoader.LoadModels(modelEntries))
 
     numModels = len(models)
 
@@ -2478,64 +5555,61 @@ def TestExamplePlaceAll(testProgram):
         modelDataDict = {}
 
         modelDataDict['Index'] = i
-        modelDataDict['Vertices'] = np.array(models[i].GetVertices(), dtype = np.float32)
-        modelDataDict['Indices'] = np.array(models[i].GetIndices(), dtype = np.uint32)
-        modelDataDict['VerticesExceptNoUse'] = np.array(models[i].GetVerticesExceptNoUse(), dtype = np.float32)
-        modelDataDict['NormalVertices'] = np.array(models[i].GetNormalLineVertices(), dtype = np.float32)
-        modelDataDict['NormalIndices'] = np.array(models[i].GetNormalLineIndices(), dtype = np.uint32)
-        modelDataDict['Position'] = [0.0, 0.0, 0.0]
-        modelDataDict['Rotation'] = [0.0, 0.0, 0.0]
-        modelDataDict['Scale'] = 1.0
+        modelDataDict['Vertices'] = models[i].GetVertices()
+        modelDataDict['Indices'] = models[i].GetIndices()
+        modelDataDict['NormalVertices'] = models[i].GetNormalLineVertices()
+        modelDataDict['NormalIndices'] = models[i].GetNormalLineIndices()
+        modelDataDict['Transform'] = testProgram.GetTransformTable().Add()
 
         modelsDataDict[modelKeys[i]] = modelDataDict
 
-    modelsDataDict['Armadillo']['Position'] = [-3.0, 0.0, 6.0]
-    modelsDataDict['Armadillo']['Rotation'] = [0.0, 190.5, 0.0]
-    modelsDataDict['Armadillo']['Scale'] = 0.02
+    modelsDataDict['Armadillo']['Transform'].SetPosition([-3.0, 0.0, 6.0])
+    modelsDataDict['Armadillo']['Transform'].SetRotation([0.0, 190.5, 0.0])
+    modelsDataDict['Armadillo']['Transform'].SetScale(0.02)
 
-    modelsDataDict['Cheburashka']['Position'] = [-0.85, 0.0, 6.5]
-    modelsDataDict['Cheburashka']['Rotation'] = [0.0, 350.0, 0.0]
-    modelsDataDict['Cheburashka']['Scale'] = 2.5
+    modelsDataDict['Cheburashka']['Transform'].SetPosition([-0.85, 0.0, 6.5])
+    modelsDataDict['Cheburashka']['Transform'].SetRotation([0.0, 350.0, 0.0])
+    modelsDataDict['Cheburashka']['Transform'].SetScale(2.5)
 
-    modelsDataDict['Ogre']['Position'] = [2.5, 0.0, 8.5]
-    modelsDataDict['Ogre']['Rotation'] = [0.0, 335.5, 0.0]
-    modelsDataDict['Ogre']['Scale'] = 0.07
+    modelsDataDict['Ogre']['Transform'].SetPosition([2.5, 0.0, 8.5])
+    modelsDataDict['Ogre']['Transform'].SetRotation([0.0, 335.5, 0.0])
+    modelsDataDict['Ogre']['Transform'].SetScale(0.07)
 
-    modelsDataDict['Homer']['Position'] = [4.0, 0.0, 7.8]
-    modelsDataDict['Homer']['Rotation'] = [0.0, 335.0, 7.5]
-    modelsDataDict['Homer']['Scale'] = 2.2
+    modelsDataDict['Homer']['Transform'].SetPosition([4.0, 0.0, 7.8])
+    modelsDataDict['Homer']['Transform'].SetRotation([0.0, 335.0, 7.5])
+    modelsDataDict['Homer']['Transform'].SetScale(2.2)
 
-    modelsDataDict['XYZDragon']['Position'] = [-4.0, 0.0, -3.0]
-    modelsDataDict['XYZDragon']['Rotation'] = [31.5, 330.5, 0.0]
-    modelsDataDict['XYZDragon']['Scale'] = 0.03
+    modelsDataDict['XYZDragon']['Transform'].SetPosition([-4.0, 0.0, -3.0])
+    modelsDataDict['XYZDragon']['Transform'].SetRotation([31.5, 330.5, 0.0])
+    modelsDataDict['XYZDragon']['Transform'].SetScale(0.03)
 
-    modelsDataDict['Horse']['Position'] = [1.75, 0.0, 0.5]
-    modelsDataDict['Horse']['Rotation'] = [275.0, 150.0, 0.0]
-    modelsDataDict['Horse']['Scale'] = 20.0
+    modelsDataDict['Horse']['Transform'].SetPosition([1.75, 0.0, 0.5])
+    modelsDataDict['Horse']['Transform'].SetRotation([275.0, 150.0, 0.0])
+    modelsDataDict['Horse']['Transform'].SetScale(20.0)
 
-    modelsDataDict['Spot']['Position'] = [5.2, 0.0, 2.5]
-    modelsDataDict['Spot']['Rotation'] = [0.0, 156.5, 0.0]
-    modelsDataDict['Spot']['Scale'] = 2.0
+    modelsDataDict['Spot']['Transform'].SetPosition([5.2, 0.0, 2.5])
+    modelsDataDict['Spot']['Transform'].SetRotation([0.0, 156.5, 0.0])
+    modelsDataDict['Spot']['Transform'].SetScale(2.0)
 
-    modelsDataDict['StanfordBunny']['Position'] = [8.0, 0.0, 4.35]
-    modelsDataDict['StanfordBunny']['Rotation'] = [0.0, 30.5, 0.0]
-    modelsDataDict['StanfordBunny']['Scale'] = 15.0
+    modelsDataDict['StanfordBunny']['Transform'].SetPosition([8.0, 0.0, 4.35])
+    modelsDataDict['StanfordBunny']['Transform'].SetRotation([0.0, 30.5, 0.0])
+    modelsDataDict['StanfordBunny']['Transform'].SetScale(15.0)
 
-    modelsDataDict['Igea']['Position'] = [-1.0, 0.0, -10.0]
-    modelsDataDict['Igea']['Rotation'] = [0.0, 0.0, 0.0]
-    modelsDataDict['Igea']['Scale'] = 40.0
+    modelsDataDict['Igea']['Transform'].SetPosition([-1.0, 0.0, -10.0])
+    modelsDataDict['Igea']['Transform'].SetRotation([0.0, 0.0, 0.0])
+    modelsDataDict['Igea']['Transform'].SetScale(40.0)
 
-    modelsDataDict['MaxPlanck']['Position'] = [4.35, 0.0, -6.95]
-    modelsDataDict['MaxPlanck']['Rotation'] = [0.0, 172.0, 0.0]
-    modelsDataDict['MaxPlanck']['Scale'] = 0.01
+    modelsDataDict['MaxPlanck']['Transform'].SetPosition([4.35, 0.0, -6.95])
+    modelsDataDict['MaxPlanck']['Transform'].SetRotation([0.0, 172.0, 0.0])
+    modelsDataDict['MaxPlanck']['Transform'].SetScale(0.01)
 
-    modelsDataDict['Nefertiti']['Position'] = [10.0, 0.0, -6.5]
-    modelsDataDict['Nefertiti']['Rotation'] = [270.0, 328.5, 0.0]
-    modelsDataDict['Nefertiti']['Scale'] = 0.01
+    modelsDataDict['Nefertiti']['Transform'].SetPosition([10.0, 0.0, -6.5])
+    modelsDataDict['Nefertiti']['Transform'].SetRotation([270.0, 328.5, 0.0])
+    modelsDataDict['Nefertiti']['Transform'].SetScale(0.01)
 
-    modelsDataDict['Suzanne']['Position'] = [13.0, 0.0, -2.5]
-    modelsDataDict['Suzanne']['Rotation'] = [0.0, 321.0, 0.0]
-    modelsDataDict['Suzanne']['Scale'] = 1.5
+    modelsDataDict['Suzanne']['Transform'].SetPosition([13.0, 0.0, -2.5])
+    modelsDataDict['Suzanne']['Transform'].SetRotation([0.0, 321.0, 0.0])
+    modelsDataDict['Suzanne']['Transform'].SetScale(1.5)
 
 def Main():    
     projectName = "TEST Project"
@@ -2554,6 +5628,7 @@ def Main():
 
     shaders.append(gShaderFactory.CreateShader(Index.SHADER_CODE_DEFAULT, Index.SHADER_CODE_DEFAULT))
     shaders.append(gShaderFactory.CreateShader(Index.SHADER_CODE_DEFAULT, Index.SHADER_FRAGMENT_CODE_SIMPLE_USE_UNIFORMCOLOR))
+    shaders.append(gShaderFactory.CreateShader(Index.SHADER_CODE_DEFAULT, Index.SHADER_FRAGMENT_CODE_WIREFRAME, Index.SHADER_GEOMETRY_CODE_WIREFRAME))
 
     testProgram = TestProgram(programName)
 
@@ -2565,11 +5640,25 @@ def Main():
     gSceneManager.MakeFont(imguiNewFont)    
     gSceneManager.AddObject(testProgram)
     
-    lastElapsedTime = glfw.get_time()
+    framePacer = gSceneManager.GetFramePacer()
+    framePacer.Reset()
+
     deltaTime = 0.0
 
     while glfw.window_should_close(glfwWindow) == False:
-        glfw.poll_events()        
+        framePacer.ApplySwapInterval()
+
+        if gSceneManager.GetOnDemandRender() == True and gSceneManager.NeedsRedraw() == False:
+            glfw.wait_events_timeout(gSceneManager.GetIdleTimeout())
+
+            # The idle gap is not a frame, the next deltaTime and frame time are measured from here.
+            framePacer.Reset()
+
+            if gSceneManager.NeedsRedraw() == False:
+                continue
+        else:
+            glfw.poll_events()        
+
         imguiRenderer.process_inputs()
 
         gSceneManager.Update(deltaTime)        
@@ -2583,14 +5672,97 @@ def Main():
 
         gSceneManager.PostUpdate(deltaTime)        
 
-        deltaTime = glfw.get_time() - lastElapsedTime
-        lastElapsedTime = glfw.get_time()
+        deltaTime = framePacer.Wait()
 
     gSceneManager.Finish()
 
     imguiRenderer.shutdown()
     glfw.terminate()
 
+def BenchmarkSceneBVH(numInstances = 10000, numQueries = 100):
+    random.seed(0)
+
+    frustum = Frustum()
+    frustum.Update(glm.perspective(glm.radians(45.0), 1.0, 0.1, 100.0) * glm.lookAt(glm.vec3(0.0, 0.0, 0.0), glm.vec3(0.0, 0.0, -1.0), glm.vec3(0.0, 1.0, 0.0)))
+
+    centers = np.array([[random.uniform(-200.0, 200.0) for axis in range(3)] for i in range(numInstances)], dtype = np.float64)
+    extents = np.array([[random.uniform(0.1, 2.0)] * 3 for i in range(numInstances)], dtype = np.float64)
+
+    bvh = BoundingVolumeHierarchy()
+    bvh.Build(centers - extents, centers + extents)
+
+    print('Instances : {0}, Nodes : {1}, Build : {2: 0.3f} ms'.format(numInstances, bvh.GetNumNodes(), bvh.GetBuildTime() * 1000.0))
+
+    startTime = time.perf_counter()
+
+    for i in range(numQueries):
+        items = random.sample(range(numInstances), 10)
+        bvh.Refit(items, centers[items] - extents[items] + 0.5, centers[items] + extents[items] + 0.5)
+
+    print('Refit (10 Instances) : {0: 0.3f} ms'.format((time.perf_counter() - startTime) * 1000.0 / numQueries))
+
+    startTime = time.perf_counter()
+
+    for i in range(numQueries):
+        visibleItems = bvh.QueryFrustum(frustum.GetPlanes())
+
+    bvhTime = (time.perf_counter() - startTime) / numQueries
+
+    startTime = time.perf_counter()
+
+    for i in range(numQueries):
+        linearItems = [item for item in range(numInstances) if frustum.TestBox(centers[item], extents[item]) == True]
+
+    linearTime = (time.perf_counter() - startTime) / numQueries
+
+    print('Frustum : {0} Visible, BVH {1: 0.3f} ms ({2} Nodes), Linear {3: 0.3f} ms'.format(len(visibleItems), bvhTime * 1000.0, bvh.GetNumVisitedNodes(), linearTime * 1000.0))
+
+    startTime = time.perf_counter()
+
+    for i in range(numQueries):
+        items, distances = bvh.QueryRay(np.zeros(3), np.array([random.uniform(-1.0, 1.0) for axis in range(3)]))
+
+    print('Ray : BVH {0: 0.3f} ms ({1} Nodes)'.format((time.perf_counter() - startTime) * 1000.0 / numQueries, bvh.GetNumVisitedNodes()))
+
+    startTime = time.perf_counter()
+
+    for i in range(numQueries):
+        items = bvh.QueryOverlap(centers[i] - 10.0, centers[i] + 10.0)
+
+    print('Overlap : BVH {0: 0.3f} ms ({1} Nodes)'.format((time.perf_counter() - startTime) * 1000.0 / numQueries, bvh.GetNumVisitedNodes()))
+
+def BenchmarkMeshOptimizer(gridSize = 500):
+    # A shuffled grid, the worst case order for the vertex cache.
+    gridVertices = np.arange((gridSize + 1) * (gridSize + 1), dtype = np.uint32).reshape(gridSize + 1, gridSize + 1)
+
+    quadCorners = [gridVertices[: -1, : -1].ravel(), gridVertices[: -1, 1 :].ravel(), gridVertices[1 :, : -1].ravel(), gridVertices[1 :, 1 :].ravel()]
+
+    faces = np.concatenate((np.stack((quadCorners[0], quadCorners[1], quadCorners[2]), axis = 1), np.stack((quadCorners[1], quadCorners[3], quadCorners[2]), axis = 1)))
+    faces = faces[np.random.default_rng(0).permutation(len(faces))]
+
+    positions = np.zeros((gridVertices.size, 3), dtype = np.float32)
+    positions[:, 0] = np.arange(gridVertices.size) % (gridSize + 1)
+    positions[:, 1] = np.arange(gridVertices.size) // (gridSize + 1)
+
+    indices = faces.reshape(-1)
+    numVertices = len(positions)
+
+    optimizer = MeshOptimizer()
+
+    acmr, atvr = optimizer.ComputeCacheStats(indices, numVertices)
+
+    print('Faces : {0}, ACMR : {1: 0.3f}, ATVR : {2: 0.3f}'.format(len(faces), acmr, atvr))
+
+    indices, vertexOrder = optimizer.Optimize(indices.copy(), numVertices, positions)
+
+    acmr, atvr = optimizer.ComputeCacheStats(indices, numVertices)
+
+    print('Optimize : {0: 0.3f} s, ACMR : {1: 0.3f}, ATVR : {2: 0.3f}'.format(optimizer.GetOptimizeTime(), acmr, atvr))
 
 if __name__ == "__main__":
-    Main()    
\ No newline at end of file
+    if '--benchmark-bvh' in sys.argv:
+        BenchmarkSceneBVH()
+    elif '--benchmark-mesh-optimizer' in sys.argv:
+        BenchmarkMeshOptimizer()
+    else:
+        Main()    
\ No newline at end of file